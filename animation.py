@@ -0,0 +1,197 @@
+"""
+动画模块：精灵表只加载一次并切分为共享的图集，朝左的帧在加载时预先翻转
+每个动画实体只保存一个很小的 Animator（当前动画、帧号、计时），
+每帧只是在预先生成的帧列表中取出一张图片，不调用 transform、不创建新表面
+没有精灵表时由单张角色图片生成一套简单的动画帧
+礼物的旋转、上下浮动和闪光同样预先生成一圈帧（SpinFrames），所有礼物共享，每个礼物只保存相位
+"""
+import math
+import pygame
+from constants import *
+from assets import load_image
+
+# 动画名称
+ANIM_IDLE = "idle"
+ANIM_RUN = "run"
+ANIM_JUMP = "jump"
+ANIM_FALL = "fall"
+
+# 精灵表布局：每个动画占一行，每帧宽高相同
+# 动画名 -> (行号, 帧数, 每帧持续的游戏帧数, 是否循环)
+PLAYER_SHEET = "player_sheet.png"
+PLAYER_FRAME_SIZE = (40, 40)
+PLAYER_ANIMATIONS = {
+    ANIM_IDLE: (0, 2, 30, True),
+    ANIM_RUN: (1, 4, 6, True),
+    ANIM_JUMP: (2, 1, 1, False),
+    ANIM_FALL: (3, 1, 1, False),
+}
+
+# 礼物动画：一圈的帧数、每帧持续的游戏帧数、左右摆动角度、上下浮动幅度（像素）
+GEM_SPIN_FRAMES = 24
+GEM_FRAME_TICKS = 3
+GEM_TILT = 10
+GEM_BOB_HEIGHT = 4
+
+_atlases = {}
+_spin_frames = {}
+
+
+class SpriteAtlas:
+    """
+    图集：由精灵表切分出的所有帧（子表面，与精灵表共享像素）
+    朝左的帧从整张翻转后的精灵表切分：翻转后第 c 列位于第 (列数-1-c) 列
+    """
+    def __init__(self, sheet, frame_size, animations):
+        self.sheet = sheet
+        self.flipped_sheet = pygame.transform.flip(sheet, True, False)
+        self.frame_size = frame_size
+        self.animations = animations
+        width, height = frame_size
+        columns = sheet.get_width() // width
+        self.frames = {}
+        for name, (row, count, _, _) in animations.items():
+            right = [sheet.subsurface((col * width, row * height, width, height))
+                     for col in range(count)]
+            left = [self.flipped_sheet.subsurface(((columns - 1 - col) * width, row * height, width, height))
+                    for col in range(count)]
+            # frames[动画名][0 朝左 / 1 朝右] -> 帧列表
+            self.frames[name] = (left, right)
+
+    def frame(self, name, index=0, facing_right=True):
+        return self.frames[name][facing_right][index]
+
+
+def build_player_sheet(image):
+    """
+    由单张角色图片生成精灵表（只在没有 player_sheet.png 时调用一次）
+    待机轻微压缩、跑动前后倾斜并上下起伏、起跳拉长、下落压扁
+    """
+    width, height = image.get_size()
+    rows = max(row for row, _, _, _ in PLAYER_ANIMATIONS.values()) + 1
+    columns = max(count for _, count, _, _ in PLAYER_ANIMATIONS.values())
+    sheet = pygame.Surface((width * columns, height * rows), pygame.SRCALPHA)
+
+    def put(frame, row, col, dy=0):
+        # 帧底部对齐格子底部，超出部分裁掉，保证所有帧尺寸一致
+        rect = frame.get_rect(midbottom=(col * width + width // 2, (row + 1) * height + dy))
+        sheet.set_clip((col * width, row * height, width, height))
+        sheet.blit(frame, rect)
+        sheet.set_clip(None)
+
+    idle_row, run_row = PLAYER_ANIMATIONS[ANIM_IDLE][0], PLAYER_ANIMATIONS[ANIM_RUN][0]
+    put(image, idle_row, 0)
+    put(pygame.transform.smoothscale(image, (width, height - 2)), idle_row, 1)
+    for col, (angle, dy) in enumerate(((-6, 0), (0, -2), (6, 0), (0, -2))):
+        put(pygame.transform.rotate(image, angle), run_row, col, dy)
+    put(pygame.transform.smoothscale(image, (width - 6, height)), PLAYER_ANIMATIONS[ANIM_JUMP][0], 0)
+    put(pygame.transform.smoothscale(image, (width + 4, height - 4)), PLAYER_ANIMATIONS[ANIM_FALL][0], 0)
+    return sheet
+
+
+def get_player_atlas():
+    """玩家图集（所有玩家实例共享）：优先读取精灵表，否则由 player.png 生成"""
+    atlas = _atlases.get(PLAYER_SHEET)
+    if atlas is None:
+        try:
+            sheet = load_image(PLAYER_SHEET)
+            frame_size = PLAYER_FRAME_SIZE
+        except (pygame.error, FileNotFoundError):
+            image = load_image("player.png")
+            sheet = build_player_sheet(image)
+            frame_size = image.get_size()
+        atlas = SpriteAtlas(sheet, frame_size, PLAYER_ANIMATIONS)
+        _atlases[PLAYER_SHEET] = atlas
+    return atlas
+
+
+def player_animation(on_ground, vel_y, is_jumping, moving):
+    """状态机：根据玩家状态选择动画"""
+    if not on_ground:
+        return ANIM_JUMP if is_jumping or vel_y < 0 else ANIM_FALL
+    return ANIM_RUN if moving else ANIM_IDLE
+
+
+class Animator:
+    """
+    单个实体的动画状态：当前动画、帧号和计时，图片从共享图集中取
+    play 切换动画时从第一帧开始；update 每帧调用一次，返回当前帧图片
+    """
+    __slots__ = ("atlas", "name", "index", "ticks", "facing_right", "image")
+
+    def __init__(self, atlas, name=ANIM_IDLE):
+        self.atlas = atlas
+        self.facing_right = True
+        self.play(name)
+
+    def play(self, name):
+        self.name = name
+        self.index = 0
+        self.ticks = 0
+        self.image = self.atlas.frames[name][self.facing_right][0]
+
+    def update(self, name, facing_right):
+        if name != self.name:
+            self.facing_right = facing_right
+            self.play(name)
+            return self.image
+        _, count, duration, loop = self.atlas.animations[name]
+        self.ticks += 1
+        if self.ticks >= duration:
+            self.ticks = 0
+            if self.index + 1 < count:
+                self.index += 1
+            elif loop:
+                self.index = 0
+        self.facing_right = facing_right
+        self.image = self.atlas.frames[name][facing_right][self.index]
+        return self.image
+
+
+def draw_sparkle(surface, center, size, color=WHITE):
+    """四角星形的闪光"""
+    x, y = center
+    thin = max(1, size // 4)
+    pygame.draw.polygon(surface, color, [(x, y - size), (x + thin, y - thin), (x + size, y),
+                                         (x + thin, y + thin), (x, y + size), (x - thin, y + thin),
+                                         (x - size, y), (x - thin, y - thin)])
+
+
+class SpinFrames:
+    """
+    一张图片的旋转动画：加载时生成一圈 count 帧（水平缩放模拟转动 + 左右摆动，正面朝前时闪光），
+    所有帧填充到相同尺寸并居中，绘制位置只需加上固定偏移和浮动高度 bob[帧号]
+    """
+    def __init__(self, image, count=GEM_SPIN_FRAMES, tilt=GEM_TILT, bob_height=GEM_BOB_HEIGHT):
+        width, height = image.get_size()
+        turned = []
+        for k in range(count):
+            t = 2 * math.pi * k / count
+            # 转到侧面时最窄，保留四分之一宽度避免消失
+            scaled_width = max(1, round(width * max(0.25, abs(math.cos(t)))))
+            frame = pygame.transform.smoothscale(image, (scaled_width, height))
+            turned.append(pygame.transform.rotate(frame, tilt * math.sin(t)))
+        size = (max(frame.get_width() for frame in turned), max(frame.get_height() for frame in turned))
+        sparkle = max(3, min(width, height) // 5)
+        self.frames = []
+        for k, frame in enumerate(turned):
+            padded = pygame.Surface(size, pygame.SRCALPHA)
+            padded.blit(frame, frame.get_rect(center=(size[0] // 2, size[1] // 2)))
+            # 正面朝前的前几帧在右上角闪光，逐帧变小
+            if k < 3:
+                draw_sparkle(padded, (size[0] * 3 // 4, size[1] // 4), sparkle - k)
+            self.frames.append(padded.convert_alpha())
+        self.size = size
+        # 帧左上角相对原图左上角的偏移
+        self.offset = ((width - size[0]) // 2, (height - size[1]) // 2)
+        self.bob = [round(-bob_height * math.sin(2 * math.pi * k / count)) for k in range(count)]
+        self.count = count
+
+
+def get_spin_frames(image):
+    """图片的旋转动画（按图片对象缓存，使用同一张图片的礼物共享）"""
+    frames = _spin_frames.get(image)
+    if frames is None:
+        frames = SpinFrames(image)
+        _spin_frames[image] = frames
+    return frames
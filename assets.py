@@ -0,0 +1,159 @@
+"""
+资源加载模块：优先读取 bake_assets.py 预先生成的已缩放原始像素文件，
+找不到（或原图更新过）时才解码 PNG 并在运行时缩放
+同一资源同一尺寸只加载一次，之后直接复用缓存
+"""
+import json
+import os
+import pygame
+from constants import *
+
+BAKED_DIR = "baked"
+MANIFEST_FILE = os.path.join(BAKED_DIR, "manifest.json")
+
+# 需要预处理的图片：(文件名, 逻辑尺寸, 缩放方式)
+# 尺寸为 None 表示保持原尺寸；"fit" 按比例缩放并居中，"stretch" 直接拉伸
+ASSET_SPECS = [
+    ("background.png", (SCREEN_WIDTH, SCREEN_HEIGHT), "stretch"),
+    ("menu_bg.png", (SCREEN_WIDTH, SCREEN_HEIGHT), "fit"),
+    ("door_closed.png", (100, 100), "stretch"),
+    ("door_open.png", (100, 100), "stretch"),
+    ("player.png", None, "stretch"),
+    ("player_sheet.png", None, "stretch"),
+    ("bg_hills.png", None, "stretch"),
+    ("bg_trees.png", None, "stretch"),
+    ("gem.png", None, "stretch"),
+]
+
+_cache = {}
+_origin = {}      # id(已加载图片) -> (文件名, 尺寸, 缩放方式)，用于查找其它分辨率的版本
+_manifest = None
+
+
+def asset_key(name, size):
+    """资源在清单和缓存中的键，例如 background.png@1200x700"""
+    if size is None:
+        return name
+    return f"{name}@{size[0]}x{size[1]}"
+
+
+def scale_keep_ratio(image, target_width, target_height):
+    """按比例缩放图片并居中放到目标尺寸的透明画布上"""
+    original_width = image.get_width()
+    original_height = image.get_height()
+
+    width_ratio = target_width / original_width
+    height_ratio = target_height / original_height
+    scale = min(width_ratio, height_ratio)
+
+    new_width = int(original_width * scale)
+    new_height = int(original_height * scale)
+
+    scaled_image = pygame.transform.scale(image, (new_width, new_height))
+
+    result = pygame.Surface((target_width, target_height), pygame.SRCALPHA)
+    x = (target_width - new_width) // 2
+    y = (target_height - new_height) // 2
+    result.blit(scaled_image, (x, y))
+
+    return result
+
+
+def is_opaque(image):
+    """图片是否完全不透明（不透明图片可以用 convert() 省去逐像素混合）"""
+    if not image.get_flags() & pygame.SRCALPHA:
+        return True
+    width, height = image.get_size()
+    return pygame.mask.from_surface(image, 254).count() == width * height
+
+
+def decode(name, size=None, mode="stretch"):
+    """解码原图并缩放到指定尺寸（未转换显示格式）"""
+    image = pygame.image.load(name)
+    if size is not None and image.get_size() != tuple(size):
+        if mode == "fit":
+            image = scale_keep_ratio(image.convert_alpha(), size[0], size[1])
+        else:
+            image = pygame.transform.scale(image, size)
+    return image
+
+
+def load_manifest():
+    """读取预处理清单（只读一次），不存在时返回空清单"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_FILE, encoding="utf-8") as f:
+                _manifest = json.load(f).get("assets", {})
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def _load_baked(name, size):
+    entry = load_manifest().get(asset_key(name, size))
+    if entry is None:
+        return None
+    # 原图比预处理结果更新时，说明需要重新预处理，退回运行时解码
+    try:
+        if os.stat(name).st_mtime > entry["source_mtime"]:
+            return None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(BAKED_DIR, entry["file"]), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    image = pygame.image.frombytes(data, tuple(entry["size"]), entry["format"])
+    return image.convert() if entry["opaque"] else image.convert_alpha()
+
+
+def load_image(name, size=None, mode="stretch"):
+    """
+    加载图片并转换为显示格式
+    size: 目标尺寸，None 表示原尺寸；mode: "stretch" 或 "fit"
+    加载失败时抛出 pygame.error / FileNotFoundError，由调用方决定替代图形
+    """
+    key = asset_key(name, size)
+    image = _cache.get(key)
+    if image is not None:
+        return image
+
+    image = _load_baked(name, size)
+    if image is None:
+        image = decode(name, size, mode)
+        image = image.convert() if is_opaque(image) else image.convert_alpha()
+    _cache[key] = image
+    _origin[id(image)] = (name, size, mode)
+    return image
+
+
+def scale_surface(image, size):
+    """缩放任意图片（平滑缩放，不支持的像素格式退回普通缩放）"""
+    if image.get_width() == 0 or image.get_height() == 0:
+        # 空文本等零尺寸图片不需要缩放（smoothscale 不接受零尺寸）
+        return image
+    try:
+        return pygame.transform.smoothscale(image, size)
+    except ValueError:
+        return pygame.transform.scale(image, size)
+
+
+def scaled_image(image, scale):
+    """
+    返回按 scale 缩放后的图片
+    由 load_image 加载的资源按对应尺寸重新加载（可直接使用预处理结果，画质也更好），
+    其它图片（文字、程序绘制的图形）直接缩放
+    """
+    width, height = image.get_size()
+    if width == 0 or height == 0:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    origin = _origin.get(id(image))
+    if origin is not None and _cache.get(asset_key(origin[0], origin[1])) is image:
+        try:
+            return load_image(origin[0], size, origin[2])
+        except (pygame.error, OSError):
+            pass
+    return scale_surface(image, size)
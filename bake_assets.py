@@ -0,0 +1,61 @@
+"""
+资源预处理工具：把图片预先缩放到每个目标分辨率，保存为原始像素文件并生成清单
+运行时 assets.load_image 直接读取这些文件，启动时不再解码 PNG 和缩放
+用法：python bake_assets.py            （按 constants.BAKE_SCALES 处理所有资源）
+      python bake_assets.py 1.0 0.5    （指定缩放比例）
+"""
+import json
+import os
+import sys
+import pygame
+from constants import *
+from assets import ASSET_SPECS, BAKED_DIR, MANIFEST_FILE, asset_key, decode, is_opaque
+
+
+def bake(scales=BAKE_SCALES):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    os.makedirs(BAKED_DIR, exist_ok=True)
+
+    manifest = {}
+    for name, size, mode in ASSET_SPECS:
+        if not os.path.exists(name):
+            print(f"跳过 {name}：文件不存在")
+            continue
+        native = pygame.image.load(name).get_size()
+        for scale in scales:
+            base = size or native
+            target = (max(1, round(base[0] * scale)), max(1, round(base[1] * scale)))
+            image = decode(name, target, mode)
+            opaque = is_opaque(image)
+            pixel_format = "RGB" if opaque else "RGBA"
+
+            stem = os.path.splitext(name)[0]
+            file_name = f"{stem}_{target[0]}x{target[1]}.raw"
+            with open(os.path.join(BAKED_DIR, file_name), "wb") as f:
+                f.write(pygame.image.tobytes(image, pixel_format))
+
+            # 原尺寸资源在 1 倍缩放下按文件名查找，其余按 名称@宽x高 查找
+            key = asset_key(name, None if size is None and scale == 1 else target)
+            manifest[key] = {
+                "file": file_name,
+                "size": list(target),
+                "format": pixel_format,
+                "opaque": opaque,
+                "source": name,
+                "source_mtime": os.stat(name).st_mtime,
+            }
+            print(f"{key} -> {file_name} ({pixel_format})")
+
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "assets": manifest}, f, ensure_ascii=False, indent=2)
+    print(f"已生成 {len(manifest)} 个资源，清单: {MANIFEST_FILE}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        bake([float(arg) for arg in sys.argv[1:]])
+    else:
+        bake()
@@ -0,0 +1,463 @@
+"""
+端到端基准测试：无窗口运行真实的 Game 状态机，按脚本输入走完整个流程
+（菜单 → 关卡选择 → 关卡 1 → 死亡复活 → 收集礼物 → 暂停/继续 → 胜利界面 → 下一关 → 游戏结束），
+记录总耗时、帧时间分位数、内存峰值和各阶段耗时，与保存的基准文件比较，超出容差的指标标记为回归
+- python bench.py                  运行并与基准比较（基准不存在时只输出结果），有回归时退出码为 1
+- python bench.py --save           运行并把结果保存为新的基准
+- python bench.py --repeat 5 --tolerance 0.2
+点击和按键作为事件放入事件队列，由 Game.handle_event 处理；方向键和跳跃通过 Game.step(keys) 传入；
+收集礼物和到达大门直接把玩家放到目标位置，不依赖具体的关卡路线，修改关卡后脚本仍然有效
+每帧按最快速度运行（不等待帧率、不跳过绘制），成绩、游戏数据和缩略图写入临时目录，不影响本地记录，也不依赖已有的缩略图缓存
+基准与机器有关，只应与同一台机器上的结果比较
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from constants import *
+from display import from_logical
+from records import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, REPLAY_KEYS
+from memprof import STATE_NAMES, format_bytes
+
+BENCH_BASELINE = "bench_baseline.json"
+BENCH_VERSION = 1
+BENCH_TOLERANCE = 0.15          # 比基准慢 / 多占用超过 15% 视为回归
+# 差值小于这些值时不判断回归（避免极小的数值因为计时抖动被误报）
+MIN_DELTA_MS = 0.1
+MIN_DELTA_BYTES = 64 * 1024
+
+# 脚本：(阶段名, 步骤)；每个步骤至少运行一帧
+#   ("frames", n[, 按键])   运行 n 帧，按键为 records 中 INPUT_* 的组合
+#   ("click", action)       点击当前界面中 action 对应的按钮
+#   ("key", key)            按下一个键（KEYDOWN 事件）
+#   ("fall",)               把玩家放到屏幕下方（掉落死亡）
+#   ("gems", n)             依次把玩家放到每个未收集的礼物上，各停留 n 帧，然后回到出生点
+#   ("door",)               把玩家放到大门处
+#   ("expect", state)       检查当前状态（不运行帧），不符合时停止，避免测量走错的流程
+SCENARIO = (
+    ("menu", (
+        ("frames", 60),
+        ("click", "start"),
+        ("expect", LEVEL_SELECT),
+    )),
+    ("level_select", (
+        ("frames", 60),
+        ("click", 1),
+        ("expect", PLAYING),
+    )),
+    # 在出生平台上走动和跳跃（平台较短，移动距离保持在平台内）
+    ("level1", (
+        ("frames", 10, INPUT_RIGHT),
+        ("frames", 20, INPUT_JUMP),
+        ("frames", 40),
+        ("frames", 10, INPUT_LEFT | INPUT_JUMP),
+        ("frames", 40),
+        ("expect", PLAYING),
+    )),
+    ("respawn", (
+        ("fall",),
+        ("frames", 30),
+        ("fall",),
+        ("frames", 30),
+        ("expect", PLAYING),
+    )),
+    ("gems", (
+        ("gems", 4),
+        ("frames", 30),
+    )),
+    ("pause", (
+        ("key", pygame.K_ESCAPE),
+        ("expect", PAUSED),
+        ("frames", 60),
+        ("key", pygame.K_ESCAPE),
+        ("expect", PLAYING),
+        ("frames", 20),
+    )),
+    ("win", (
+        ("door",),
+        ("expect", WIN_SCREEN),
+        ("frames", 90),
+    )),
+    ("level2", (
+        ("click", "next"),
+        ("expect", PLAYING),
+        ("frames", 20, INPUT_JUMP),
+        ("frames", 40),
+        ("frames", 6, INPUT_LEFT),
+        ("gems", 4),
+        ("door",),
+        ("expect", WIN_SCREEN),
+        ("frames", 60),
+    )),
+    ("game_over", (
+        ("click", "menu"),
+        ("expect", MENU),
+        ("click", "start"),
+        ("click", 2),
+        ("expect", PLAYING),
+        ("fall",),
+        ("fall",),
+        ("fall",),
+        ("expect", GAME_OVER),
+        ("frames", 60),
+        ("click", "restart"),
+        ("expect", PLAYING),
+        ("frames", 30),
+        ("key", pygame.K_ESCAPE),
+        ("click", "menu"),
+        ("expect", MENU),
+    )),
+)
+
+
+class ScenarioError(RuntimeError):
+    """脚本没有按预期进行（状态不对、找不到按钮）"""
+
+
+def percentile(values, fraction):
+    """最近秩分位数（values 已排序）"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def screen_for(game):
+    """当前状态下可以点击的界面"""
+    if game.state == WIN_SCREEN:
+        return game.current_win_screen()
+    return {
+        MENU: game.menu_screen,
+        LEVEL_SELECT: game.level_select_screen,
+        INSTRUCTIONS: game.instructions_screen,
+        PAUSED: game.pause_screen,
+        GAME_OVER: game.game_over_screen,
+    }.get(game.state)
+
+
+class ScenarioRunner:
+    """
+    按脚本驱动一个 Game：frame() 与 Game.run 的一次循环相同（取出事件交给 handle_event，再 step），
+    记录每帧耗时（秒）、各阶段的帧时间和内存峰值，以及用于确认流程相同的签名
+    """
+    def __init__(self, game, trace_memory=False):
+        self.game = game
+        self.trace_memory = trace_memory
+        self.frame_times = []
+        self.phases = {}            # 阶段名 -> {"times": [...], "peak": 字节}
+        self.states = [STATE_NAMES[game.state]]
+        self.runs = []
+        self._last_run = game.last_run
+        self._times = self.frame_times
+
+    def frame(self, keys=0):
+        game = self.game
+        start = time.perf_counter()
+        for event in pygame.event.get():
+            game.handle_event(event)
+        game.step(REPLAY_KEYS[keys], paced=False)
+        elapsed = time.perf_counter() - start
+        self.frame_times.append(elapsed)
+        self._times.append(elapsed)
+        # 流程签名：状态变化和每局结果
+        name = STATE_NAMES[game.state]
+        if name != self.states[-1]:
+            self.states.append(name)
+        if game.last_run is not self._last_run:
+            self._last_run = game.last_run
+            run = game.last_run[0]
+            self.runs.append([run.level, run.completed, run.deaths, run.gems])
+
+    def run_phase(self, name, steps):
+        phase = self.phases[name] = {"times": [], "peak": 0}
+        self._times = phase["times"]
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        for step in steps:
+            self.run_step(name, step)
+        if self.trace_memory:
+            phase["peak"] = tracemalloc.get_traced_memory()[1]
+        self._times = self.frame_times
+
+    def run_step(self, phase, step):
+        game = self.game
+        kind = step[0]
+        if kind == "frames":
+            keys = step[2] if len(step) > 2 else 0
+            for _ in range(step[1]):
+                self.frame(keys)
+        elif kind == "click":
+            screen = screen_for(game)
+            button = None
+            if screen is not None:
+                button = next((b for b in screen.buttons if b.action == step[1]), None)
+            if button is None:
+                raise ScenarioError(f"{phase}: 状态 {STATE_NAMES[game.state]} 中没有按钮 {step[1]!r}")
+            pos = from_logical(button.rect.center)
+            pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+            pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos))
+            self.frame()
+        elif kind == "key":
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=step[1], mod=0, unicode=""))
+            self.frame()
+        elif kind == "fall":
+            self.require(phase, PLAYING)
+            game.player.set_position(game.player.rect.x, SCREEN_HEIGHT + 100)
+            self.frame()
+        elif kind == "gems":
+            self.require(phase, PLAYING)
+            entities = game.entities
+            player = game.player
+            while len(entities.gem_ids) and game.state == PLAYING:
+                i = entities.gem_ids[0]
+                player.set_position(entities.x[i] + entities.w[i] // 2 - player.rect.width // 2,
+                                    entities.y[i] + entities.h[i] // 2 - player.rect.height // 2)
+                for _ in range(step[1]):
+                    self.frame()
+                if i in entities.gem_ids:
+                    raise ScenarioError(f"{phase}: 没有收集到礼物 {i}")
+            # 回到出生点（礼物可能在平台外或移动平台上，停留在那里会掉落）
+            game.level_start.restore_player(player)
+        elif kind == "door":
+            self.require(phase, PLAYING)
+            game.player.set_position(game.door.rect.x, game.door.rect.y)
+            self.frame()
+        elif kind == "expect":
+            self.require(phase, step[1])
+        else:
+            raise ScenarioError(f"{phase}: 未知的步骤 {kind!r}")
+
+    def require(self, phase, state):
+        if self.game.state != state:
+            raise ScenarioError(f"{phase}: 期望状态 {STATE_NAMES[state]}，实际为 "
+                                f"{STATE_NAMES[self.game.state]}")
+
+    def signature(self):
+        return {"frames": len(self.frame_times), "states": self.states, "runs": self.runs}
+
+
+def run_once(scenario=SCENARIO, trace_memory=False):
+    """新建一个 Game 运行一遍脚本，返回 (启动耗时秒, ScenarioRunner)"""
+    from game import Game
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as data_dir:
+        start = time.perf_counter()
+        game = Game(records_db=os.path.join(data_dir, "records.db"),
+                    telemetry_dir=os.path.join(data_dir, "telemetry"),
+                    thumbnails_dir=os.path.join(data_dir, "thumbnails"))
+        startup = time.perf_counter() - start
+        try:
+            runner = ScenarioRunner(game, trace_memory)
+            for name, steps in scenario:
+                runner.run_phase(name, steps)
+        finally:
+            game.close()
+    return startup, runner
+
+
+def peak_rss():
+    """进程的最高常驻内存（字节），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KiB，macOS 上为字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_benchmark(repeat=3, scenario=SCENARIO, memory=True, warmup=1):
+    """
+    先运行 warmup 遍不计时（生成缩略图等磁盘缓存、预热各模块的图片缓存），
+    再运行 repeat 遍计时（总耗时和各阶段耗时取最快的一遍，受其他进程干扰最小；帧时间分位数按所有帧统计），
+    memory 为 True 时再用 tracemalloc 运行一遍统计内存峰值（这一遍不计时）
+    返回可保存为 JSON 的结果
+    """
+    for _ in range(warmup):
+        run_once(scenario)
+    startups, totals, frame_times, signature = [], [], [], None
+    phase_totals = {name: [] for name, _ in scenario}
+    phase_frames = {name: [] for name, _ in scenario}
+    for _ in range(repeat):
+        startup, runner = run_once(scenario)
+        if signature is None:
+            signature = runner.signature()
+        elif runner.signature() != signature:
+            raise ScenarioError("多次运行的流程不一致")
+        startups.append(startup)
+        totals.append(startup + sum(runner.frame_times))
+        frame_times.extend(runner.frame_times)
+        for name, phase in runner.phases.items():
+            phase_totals[name].append(sum(phase["times"]))
+            phase_frames[name].extend(phase["times"])
+
+    frame_times.sort()
+    result = {
+        "version": BENCH_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}"
+                   f" / pygame {pygame.version.ver}",
+        "repeat": repeat,
+        "signature": signature,
+        "total_ms": min(totals) * 1000,
+        "startup_ms": min(startups) * 1000,
+        "frame_ms": {
+            "p50": percentile(frame_times, 0.50) * 1000,
+            "p90": percentile(frame_times, 0.90) * 1000,
+            "p99": percentile(frame_times, 0.99) * 1000,
+            "max": frame_times[-1] * 1000 if frame_times else 0.0,
+        },
+        "phases": {},
+    }
+    for name, _ in scenario:
+        times = sorted(phase_frames[name])
+        result["phases"][name] = {
+            "frames": len(times) // repeat,
+            "total_ms": min(phase_totals[name]) * 1000,
+            "p99_ms": percentile(times, 0.99) * 1000,
+        }
+
+    if memory:
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            _, runner = run_once(scenario, trace_memory=True)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            for name, phase in runner.phases.items():
+                result["phases"][name]["peak_bytes"] = phase["peak"]
+        finally:
+            if started_here:
+                tracemalloc.stop()
+    result["peak_rss_bytes"] = peak_rss()
+    return result
+
+
+def metrics(result):
+    """参与比较的指标：[(名称, 数值, 是否为字节)]；帧时间最大值抖动太大，只显示不比较"""
+    items = [("总耗时", result["total_ms"], False),
+             ("启动", result["startup_ms"], False)]
+    for key in ("p50", "p90", "p99"):
+        items.append((f"帧时间 {key}", result["frame_ms"][key], False))
+    if result.get("peak_bytes") is not None:
+        items.append(("Python 内存峰值", result["peak_bytes"], True))
+    for name, phase in result["phases"].items():
+        items.append((f"{name} 耗时", phase["total_ms"], False))
+        if phase.get("peak_bytes") is not None:
+            items.append((f"{name} 内存峰值", phase["peak_bytes"], True))
+    return items
+
+
+def compare(result, baseline, tolerance=BENCH_TOLERANCE):
+    """
+    与基准比较，返回 [(名称, 基准值, 当前值, 变化比例, 标记, 是否为字节)]
+    标记为 "回归"（超出容差）、"改进" 或 ""；流程签名不同时抛出 ScenarioError
+    """
+    if baseline.get("version") != BENCH_VERSION:
+        raise ScenarioError(f"基准文件版本为 {baseline.get('version')}，需要 {BENCH_VERSION}，请用 --save 重新生成")
+    if baseline.get("signature") != result["signature"]:
+        raise ScenarioError("脚本流程与基准不同（帧数、状态变化或每局结果），请用 --save 重新生成基准")
+    old = {name: value for name, value, _ in metrics(baseline)}
+    rows = []
+    for name, value, is_bytes in metrics(result):
+        base = old.get(name)
+        if base is None:
+            continue
+        change = (value - base) / base if base else 0.0
+        floor = MIN_DELTA_BYTES if is_bytes else MIN_DELTA_MS
+        mark = ""
+        if abs(value - base) >= floor:
+            if change > tolerance:
+                mark = "回归"
+            elif change < -tolerance:
+                mark = "改进"
+        rows.append((name, base, value, change, mark, is_bytes))
+    return rows
+
+
+def _format_value(value, is_bytes):
+    return format_bytes(value) if is_bytes else f"{value:.2f} ms"
+
+
+def format_result(result):
+    lines = [f"端到端基准（{result['machine']}，{result['repeat']} 遍）",
+             f"  总耗时 {result['total_ms']:.1f} ms（启动 {result['startup_ms']:.1f} ms），"
+             f"{result['signature']['frames']} 帧",
+             "  帧时间 p50 / p90 / p99 / 最大: " + " / ".join(
+                 f"{result['frame_ms'][key]:.2f}" for key in ("p50", "p90", "p99", "max")) + " ms"]
+    memory = []
+    if result.get("peak_bytes") is not None:
+        memory.append(f"Python 峰值 {format_bytes(result['peak_bytes'])}")
+    if result.get("peak_rss_bytes"):
+        memory.append(f"进程峰值 {format_bytes(result['peak_rss_bytes'])}")
+    if memory:
+        lines.append("  内存: " + "，".join(memory))
+    lines.append("  各阶段（帧数 / 耗时 / p99 帧时间 / 内存峰值）:")
+    for name, phase in result["phases"].items():
+        peak = phase.get("peak_bytes")
+        lines.append(f"    {name:<13} {phase['frames']:5d} 帧  {phase['total_ms']:9.1f} ms  "
+                     f"{phase['p99_ms']:7.2f} ms  {format_bytes(peak) if peak is not None else '-':>10}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows, tolerance):
+    lines = [f"与基准比较（容差 {tolerance:.0%}）:"]
+    for name, base, value, change, mark, is_bytes in rows:
+        lines.append(f"  {name:<22} {_format_value(base, is_bytes):>12} -> "
+                     f"{_format_value(value, is_bytes):>12}  {change:+7.1%}  {mark}")
+    regressions = [row[0] for row in rows if row[4] == "回归"]
+    lines.append(f"回归 {len(regressions)} 项" + (f": {', '.join(regressions)}" if regressions else ""))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无窗口按脚本运行完整游戏流程，与基准比较性能")
+    parser.add_argument("--repeat", type=int, default=3, help="计时运行的遍数")
+    parser.add_argument("--warmup", type=int, default=1, help="计时前不计时运行的遍数")
+    parser.add_argument("--baseline", default=BENCH_BASELINE, help="基准文件")
+    parser.add_argument("--save", action="store_true", help="把本次结果保存为基准")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE, help="回归容差（比例）")
+    parser.add_argument("--no-memory", action="store_true", help="不运行内存统计")
+    parser.add_argument("--json", help="把本次结果另存到文件")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    try:
+        result = run_benchmark(max(1, args.repeat), memory=not args.no_memory,
+                               warmup=max(0, args.warmup))
+    except ScenarioError as e:
+        sys.exit(f"脚本运行失败: {e}")
+    print(format_result(result))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"已保存基准 -> {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"没有基准文件 {args.baseline}（用 --save 保存本次结果作为基准）")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    try:
+        rows = compare(result, baseline, args.tolerance)
+    except ScenarioError as e:
+        sys.exit(str(e))
+    print()
+    print(format_comparison(rows, args.tolerance))
+    if any(row[4] == "回归" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,13 @@ SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 700
 FPS = 60
 
+# 内部渲染分辨率相对窗口逻辑分辨率的比例（如 0.5、2/3），
+# 较低的比例可减少绘制像素数，由 pygame.SCALED 硬件放大到窗口
+RENDER_SCALE = 1.0
+
+# 资源预处理（bake_assets.py）生成的缩放比例，与可选的 RENDER_SCALE 对应
+BAKE_SCALES = (1.0, 2 / 3, 0.5)
+
 # 颜色定义 - 确保颜色值在0-255范围内
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -28,6 +35,34 @@ FROST_BLUE = (200, 230, 255)    # 霜蓝色
 GLACIER_BLUE = (160, 200, 240)  # 冰川蓝
 ICICLE_BLUE = (140, 180, 220)   # 冰柱蓝
 
+# 下雪效果默认画质档位（0=关闭, 1=低, 2=中, 3=高），负载过高时自动降档
+SNOW_DEFAULT_TIER = 2
+
+# 游戏数据记录（死亡位置、通关用时等，写入 TELEMETRY_DIR 下的 JSONL 文件）
+TELEMETRY_ENABLED = True
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_BUFFER_SIZE = 8192   # 环形缓冲区容量（事件数）
+
+# 关卡包（python level_pack.py 生成；不存在或比 levels.py 旧时直接读取 levels.py）
+LEVEL_PACK = "levels.pack"
+
+# 跳跃落点预览（游戏中按 F3 切换）
+JUMP_PREVIEW = False
+
+# 本地成绩记录（SQLite 数据库，后台线程写入）
+RECORDS_ENABLED = True
+RECORDS_DB = "records.db"
+RECORDS_SAVE_REPLAYS = True    # 同时保存压缩的按键录像
+
+# 背景音乐（流式播放，文件放在 MUSIC_DIR 目录下，缺少的曲目会跳过）
+MUSIC_DIR = "music"
+MUSIC_VOLUME = 0.5
+MUSIC_FADE_MS = 1000           # 切换播放列表时先淡出、再淡入（依次进行，不重叠）的总时长，两段各占一半
+
+# 关卡选择界面：关卡按钮按列排列，每页 LEVEL_SELECT_ROWS x LEVEL_SELECT_COLUMNS 个，更多的关卡分页显示
+LEVEL_SELECT_ROWS = 2
+LEVEL_SELECT_COLUMNS = 3
+
 # 游戏状态
 MENU = 0
 LEVEL_SELECT = 1
@@ -37,6 +72,28 @@ WIN_SCREEN = 4
 GAME_OVER = 5
 PAUSED = 6  
 
+# 各状态的目标帧率：游戏中满帧，菜单和暂停降低帧率以节省 CPU
+MENU_FPS = 30
+PAUSED_FPS = 15
+STATE_FPS = {
+    MENU: MENU_FPS,
+    LEVEL_SELECT: MENU_FPS,
+    INSTRUCTIONS: MENU_FPS,
+    PLAYING: FPS,
+    WIN_SCREEN: MENU_FPS,
+    GAME_OVER: MENU_FPS,
+    PAUSED: PAUSED_FPS,
+}
+
+# 各界面的背景音乐播放列表（关卡内的播放列表见 levels.py 的 "music"）
+MUSIC_PLAYLISTS = {
+    MENU: ("menu.ogg",),
+    LEVEL_SELECT: ("menu.ogg",),
+    INSTRUCTIONS: ("menu.ogg",),
+    WIN_SCREEN: ("win.ogg",),
+    GAME_OVER: (),
+}
+
 # 工具函数：确保颜色值在有效范围内
 def clamp_color(value):
     return max(0, min(255, value))
\ No newline at end of file
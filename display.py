@@ -0,0 +1,121 @@
+"""
+显示模块：以较低的内部分辨率绘制，再由 pygame.SCALED 硬件放大到窗口
+游戏逻辑和所有 draw_* 仍使用逻辑坐标（SCREEN_WIDTH x SCREEN_HEIGHT），
+Canvas 负责把坐标和图片换算到内部分辨率；鼠标坐标通过 to_logical 换算回逻辑坐标
+"""
+import weakref
+import pygame
+from constants import *
+from assets import scaled_image
+
+# 当前内部分辨率相对逻辑分辨率的比例（Button 等换算鼠标坐标时使用）
+_scale = 1.0
+
+
+def render_size(scale):
+    """内部分辨率"""
+    return (max(1, round(SCREEN_WIDTH * scale)), max(1, round(SCREEN_HEIGHT * scale)))
+
+
+def to_logical(pos):
+    """把内部分辨率下的坐标（鼠标事件、mouse.get_pos）换算为逻辑坐标"""
+    if _scale == 1.0:
+        return pos
+    return (int(pos[0] / _scale), int(pos[1] / _scale))
+
+
+def from_logical(pos):
+    """逻辑坐标 -> 内部分辨率下的坐标（生成模拟的鼠标事件时使用）"""
+    if _scale == 1.0:
+        return pos
+    return (round(pos[0] * _scale), round(pos[1] * _scale))
+
+
+def get_mouse_pos():
+    return to_logical(pygame.mouse.get_pos())
+
+
+def create_display(scale=RENDER_SCALE):
+    """
+    创建窗口并返回绘制目标
+    - 使用 SCALED | RESIZABLE：内部分辨率固定，窗口可以任意缩放或全屏，由显卡放大显示
+    - scale 为 1 时直接返回显示表面；否则返回包装它的 Canvas
+    """
+    global _scale
+    size = render_size(scale)
+    try:
+        surface = pygame.display.set_mode(size, pygame.SCALED | pygame.RESIZABLE)
+    except pygame.error as e:
+        print(f"无法使用硬件缩放显示 ({e})，使用普通窗口")
+        surface = pygame.display.set_mode(size)
+    _scale = scale
+    if scale == 1.0:
+        return surface
+    return Canvas(surface, scale)
+
+
+def toggle_fullscreen():
+    """切换全屏（SCALED 模式下不会重新创建表面，也不需要重新加载资源）"""
+    try:
+        pygame.display.toggle_fullscreen()
+    except pygame.error as e:
+        print(f"切换全屏失败: {e}")
+
+
+class Canvas:
+    """
+    逻辑坐标画布
+    提供 Surface 的常用绘制接口（blit / blits / fill / get_size / get_rect），
+    坐标按比例换算，图片在第一次绘制时缩放并缓存（图片被释放后缓存自动失效）
+    资源图片优先使用对应尺寸的预处理结果（见 assets.scaled_image）
+    """
+    def __init__(self, surface, scale):
+        self.surface = surface
+        self.scale = scale
+        self._scaled = weakref.WeakKeyDictionary()
+
+    def get_size(self):
+        return (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def get_width(self):
+        return SCREEN_WIDTH
+
+    def get_height(self):
+        return SCREEN_HEIGHT
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def scaled(self, source):
+        """返回按内部分辨率缩放后的图片（带缓存）"""
+        image = self._scaled.get(source)
+        if image is None:
+            image = scaled_image(source, self.scale)
+            self._scaled[source] = image
+        return image
+
+    def _point(self, dest):
+        scale = self.scale
+        return (round(dest[0] * scale), round(dest[1] * scale))
+
+    def _rect(self, rect):
+        rect = pygame.Rect(rect)
+        return pygame.Rect(self._point(rect.topleft), self._point(rect.size))
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        if area is not None:
+            area = self._rect(area)
+        return self.surface.blit(self.scaled(source), self._point(dest), area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=True):
+        scaled, point = self.scaled, self._point
+        return self.surface.blits(
+            [(scaled(item[0]), point(item[1])) for item in blit_sequence], doreturn)
+
+    def fill(self, color, rect=None, special_flags=0):
+        if rect is not None:
+            rect = self._rect(rect)
+        return self.surface.fill(color, rect, special_flags)
@@ -0,0 +1,99 @@
+"""
+特效模块：收集礼物时的火花迸发
+粒子池在创建时一次分配：粒子字段保存在定长数组中，火花图片按淡出程度预先生成若干张，
+游戏中生成、更新和绘制粒子都不创建新的表面；池满时新的粒子被丢弃
+"""
+import math
+from array import array
+import pygame
+from constants import *
+
+BURST_PARTICLES = 10        # 每次迸发的粒子数
+BURST_LIFETIME = 30         # 粒子存在的帧数
+BURST_SPEED = 3.0           # 初始速度（像素/帧）
+BURST_GRAVITY = 0.15
+BURST_FADE_STEPS = 6        # 预先生成的淡出图片数量
+BURST_COLORS = (YELLOW, WHITE, (255, 200, 80))
+
+
+def make_spark(radius, color, alpha, size=8):
+    """一颗圆形火花（带透明度），画在 size x size 图片的中心，所有淡出阶段尺寸相同"""
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(image, (*color, alpha), (size // 2, size // 2), radius)
+    return image.convert_alpha()
+
+
+class BurstPool:
+    """
+    粒子池：前 count 个槽为存活的粒子，粒子消失时与最后一个存活粒子交换，保持连续
+    sparks[颜色][淡出阶段] 为预先生成的火花图片，按粒子年龄取用
+    """
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.x = array("d", bytes(8 * capacity))
+        self.y = array("d", bytes(8 * capacity))
+        self.vx = array("d", bytes(8 * capacity))
+        self.vy = array("d", bytes(8 * capacity))
+        self.age = array("H", bytes(2 * capacity))
+        self.color = array("B", bytes(capacity))
+        self.count = 0
+        self.sparks = []
+        for color in BURST_COLORS:
+            steps = []
+            for step in range(BURST_FADE_STEPS):
+                fade = 1 - step / BURST_FADE_STEPS
+                steps.append(make_spark(max(1, round(4 * fade)), color, round(255 * fade)))
+            self.sparks.append(steps)
+        self.half = 4   # 火花图片尺寸的一半，绘制时换算为左上角
+        # 均匀分布的出射方向（每次迸发相同，速度和颜色按迸发次数轮换）
+        self.directions = [(math.cos(2 * math.pi * k / BURST_PARTICLES),
+                            math.sin(2 * math.pi * k / BURST_PARTICLES))
+                           for k in range(BURST_PARTICLES)]
+        self.bursts = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y):
+        """在 (x, y) 生成一次迸发"""
+        self.bursts += 1
+        for k, (dx, dy) in enumerate(self.directions):
+            i = self.count
+            if i >= self.capacity:
+                return
+            speed = BURST_SPEED * (0.6 + 0.4 * ((k + self.bursts) % 3) / 2)
+            self.x[i] = x
+            self.y[i] = y
+            self.vx[i] = dx * speed
+            self.vy[i] = dy * speed - 1.0
+            self.age[i] = 0
+            self.color[i] = (k + self.bursts) % len(BURST_COLORS)
+            self.count = i + 1
+
+    def update(self):
+        x, y, vx, vy, age = self.x, self.y, self.vx, self.vy, self.age
+        i = 0
+        while i < self.count:
+            age[i] += 1
+            if age[i] >= BURST_LIFETIME:
+                # 与最后一个存活粒子交换
+                last = self.count - 1
+                x[i], y[i], vx[i], vy[i] = x[last], y[last], vx[last], vy[last]
+                age[i], self.color[i] = age[last], self.color[last]
+                self.count = last
+                continue
+            x[i] += vx[i]
+            vy[i] += BURST_GRAVITY
+            y[i] += vy[i]
+            i += 1
+
+    def draw(self, target):
+        if not self.count:
+            return
+        half, sparks, color, age = self.half, self.sparks, self.color, self.age
+        target.blits([(sparks[color[i]][age[i] * BURST_FADE_STEPS // BURST_LIFETIME],
+                       (int(self.x[i]) - half, int(self.y[i]) - half))
+                      for i in range(self.count)], doreturn=False)
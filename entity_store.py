@@ -0,0 +1,342 @@
+"""
+实体存储模块：用连续的类型化数组保存关卡中的平台、礼物和尖刺
+代替每个实体一个 pygame.sprite.Sprite 对象 + 多个 Group 的做法，
+迭代、裁剪和碰撞检测都直接在数组上完成
+绑定渲染列表后，实体的增删和移动会同步到渲染列表
+"""
+from array import array
+import pygame
+from constants import *
+from entities import make_platform_image, make_gem_image, make_spike_image
+from render_list import LAYER_PLATFORM, LAYER_GEM, LAYER_SPIKE
+from physics import FP_SHIFT, MOVER_SPEED
+from animation import get_spin_frames, GEM_FRAME_TICKS
+
+# 实体种类
+KIND_PLATFORM = 0
+KIND_GEM = 1
+KIND_SPIKE = 2
+
+# 标志位
+FLAG_COLLECTED = 1   # 礼物已被收集
+FLAG_MOVABLE = 2     # 移动平台
+FLAG_VERTICAL = 4    # 垂直移动（仅对移动平台有效）
+FLAG_REMOVED = 8     # 已移除（热重载时使用，数组中保留空位，索引不变）
+
+# 平台空间索引的列宽（像素）：固定平台按所覆盖的列登记，查询时只检查相关的列
+PLATFORM_CELL = 128
+
+# 各种类实体所在的图层
+KIND_LAYERS = {
+    KIND_PLATFORM: LAYER_PLATFORM,
+    KIND_GEM: LAYER_GEM,
+    KIND_SPIKE: LAYER_SPIKE,
+}
+
+
+class EntityStore:
+    """
+    实体存储：所有字段按列保存在 array.array 中
+    每个实体只占若干个定长数值，图片在相同外观的实体之间共享
+    render_list: 可选的 RenderList，实体以索引为键登记在其中
+    """
+    def __init__(self, render_list=None):
+        self.render_list = render_list
+        # 几何信息
+        self.x = array("i")
+        self.y = array("i")
+        self.w = array("i")
+        self.h = array("i")
+        # 定点坐标（见 physics.py），x/y 为其向下取整后的像素坐标
+        self.fx = array("i")
+        self.fy = array("i")
+        # 种类、标志和图片索引
+        self.kind = array("B")
+        self.flags = array("B")
+        self.image_index = array("H")
+        # 运动参数（仅移动平台使用）
+        self.start_x = array("i")
+        self.start_y = array("i")
+        self.move_range = array("i")
+        self.move_speed = array("i")    # 定点数，每帧
+        self.direction = array("b")
+        # 动画相位（仅礼物使用）：各礼物错开，不会整齐地一起转动
+        self.phase = array("B")
+        self.anim_tick = 0
+
+        # 按种类划分的索引表，循环时只遍历需要的那一类
+        self.platform_ids = array("i")
+        self.spike_ids = array("i")
+        self.gem_ids = array("i")      # 尚未收集的礼物
+        self.mover_ids = array("i")    # 移动平台
+        self.platform_cells = {}       # 列号 -> 该列中的固定平台（见 platforms_near）
+
+        # 共享图片：相同参数的实体只生成一张图片
+        self.images = []
+        self.image_keys = []     # 与 images 一一对应的外观参数
+        self._image_keys = {}
+
+    def __len__(self):
+        return len(self.x)
+
+    def clear(self):
+        """
+        清空所有实体（图片缓存保留，重新加载关卡时可直接复用）
+        绑定的渲染列表也会一并清空
+        """
+        if self.render_list is not None:
+            self.render_list.clear()
+        for column in (self.x, self.y, self.w, self.h, self.fx, self.fy, self.kind, self.flags,
+                       self.image_index, self.start_x, self.start_y,
+                       self.move_range, self.move_speed, self.direction, self.phase,
+                       self.platform_ids, self.spike_ids, self.gem_ids,
+                       self.mover_ids):
+            del column[:]
+        self.platform_cells.clear()
+
+    def _image(self, key, factory):
+        # 按外观参数查找共享图片，不存在时创建
+        index = self._image_keys.get(key)
+        if index is None:
+            index = len(self.images)
+            self.images.append(factory())
+            self.image_keys.append(key)
+            self._image_keys[key] = index
+        return index
+
+    def share_images(self, other):
+        """复用另一个实体存储中已生成的图片（图片只读，直接共享）"""
+        self.images = list(other.images)
+        self.image_keys = list(other.image_keys)
+        self._image_keys = dict(other._image_keys)
+
+    def _register(self, index):
+        # 把实体登记到渲染列表（移动平台标记为动态条目，不参与视口裁剪）
+        if self.render_list is not None:
+            self.render_list.add(
+                index, KIND_LAYERS[self.kind[index]],
+                self.images[self.image_index[index]],
+                pygame.Rect(self.x[index], self.y[index], self.w[index], self.h[index]),
+                dynamic=bool(self.flags[index] & FLAG_MOVABLE))
+
+    def _append(self, kind, x, y, width, height, flags, image_index):
+        index = len(self.x)
+        self.x.append(x)
+        self.y.append(y)
+        self.w.append(width)
+        self.h.append(height)
+        self.fx.append(x << FP_SHIFT)
+        self.fy.append(y << FP_SHIFT)
+        self.kind.append(kind)
+        self.flags.append(flags)
+        self.image_index.append(image_index)
+        self.start_x.append(x)
+        self.start_y.append(y)
+        self.move_range.append(0)
+        self.move_speed.append(0)
+        self.direction.append(0)
+        self.phase.append(0)
+        return index
+
+    def add_platform(self, x, y, width, height, color=GREEN, movable=False, vertical=False):
+        image_index = self._image(
+            ("platform", width, height, color, movable, vertical),
+            lambda: make_platform_image(width, height, color, movable, vertical))
+        flags = (FLAG_MOVABLE if movable else 0) | (FLAG_VERTICAL if movable and vertical else 0)
+        index = self._append(KIND_PLATFORM, x, y, width, height, flags, image_index)
+        self.platform_ids.append(index)
+
+        if movable:
+            self.move_speed[index] = MOVER_SPEED
+            self.move_range[index] = 80    # 移动范围
+            # 移动方向：1=下/右，-1=上/左，垂直平台初始向上
+            self.direction[index] = -1 if vertical else 1
+            self.mover_ids.append(index)
+        else:
+            for cell in range(x // PLATFORM_CELL, (x + width - 1) // PLATFORM_CELL + 1):
+                self.platform_cells.setdefault(cell, array("i")).append(index)
+        self._register(index)
+        return index
+
+    def add_spike(self, x, y, width=25, height=35):
+        image_index = self._image(("spike", width, height),
+                                  lambda: make_spike_image(width, height))
+        index = self._append(KIND_SPIKE, x, y, width, height, 0, image_index)
+        self.spike_ids.append(index)
+        self._register(index)
+        return index
+
+    def add_gem(self, x, y):
+        # 礼物以 (x, y) 为中心点放置
+        image_index = self._image(("gem",), make_gem_image)
+        width, height = self.images[image_index].get_size()
+        index = self._append(KIND_GEM, x - width // 2, y - height // 2,
+                             width, height, 0, image_index)
+        self.gem_ids.append(index)
+        # 旋转帧在构建关卡时生成（可能在后台线程），游戏中只按相位取帧
+        frames = get_spin_frames(self.images[image_index])
+        self.phase[index] = (x // 16 + y // 16) % frames.count
+        self._register(index)
+        if self.render_list is not None:
+            self.render_list.entry(index)[1].size = frames.size
+            self.place_gem(index)
+        return index
+
+    def remove(self, index):
+        """
+        移除一个实体（开发模式热重载使用）
+        数组中的位置保留为空位并标记 FLAG_REMOVED，其它实体的索引保持不变
+        """
+        flags = self.flags[index]
+        if flags & FLAG_REMOVED:
+            return
+        self.flags[index] = flags | FLAG_REMOVED
+        for ids in (self.platform_ids, self.spike_ids, self.gem_ids, self.mover_ids):
+            if index in ids:
+                ids.remove(index)
+        for ids in self.platform_cells.values():
+            if index in ids:
+                ids.remove(index)
+        if self.render_list is not None:
+            self.render_list.remove(index)
+
+    def is_removed(self, index):
+        return bool(self.flags[index] & FLAG_REMOVED)
+
+    def definition_key(self, index):
+        """
+        由数组内容还原实体在关卡定义中的形式（见 levels.py），热重载比较差异时使用
+        平台: ("platform", x, y, 宽, 高, 颜色, 是否移动, 是否垂直)
+        尖刺: ("spike", x, y)；礼物: ("gem", 中心x, 中心y)
+        """
+        kind = self.kind[index]
+        x, y = self.start_x[index], self.start_y[index]
+        if kind == KIND_PLATFORM:
+            _, width, height, color, movable, vertical = self.image_keys[self.image_index[index]]
+            return ("platform", x, y, width, height, color, movable, vertical)
+        if kind == KIND_SPIKE:
+            return ("spike", x, y)
+        return ("gem", x + self.w[index] // 2, y + self.h[index] // 2)
+
+    def has_movers(self):
+        return len(self.mover_ids) > 0
+
+    def is_movable(self, index):
+        return bool(self.flags[index] & FLAG_MOVABLE)
+
+    def is_vertical(self, index):
+        return bool(self.flags[index] & FLAG_VERTICAL)
+
+    def update_movers(self):
+        """
+        更新所有移动平台的位置（每帧调用），只遍历移动平台
+        位移在定点坐标中累加（1.5 像素/帧 往返两个方向一致），像素坐标取整数部分
+        """
+        x, y, fx, fy = self.x, self.y, self.fx, self.fy
+        for i in self.mover_ids:
+            step = self.move_speed[i] * self.direction[i]
+            if self.flags[i] & FLAG_VERTICAL:
+                # 垂直移动：上下往返
+                fy[i] += step
+                y[i] = fy[i] >> FP_SHIFT
+                if self.direction[i] > 0:
+                    if y[i] > self.start_y[i] + self.move_range[i]:
+                        self.direction[i] = -1
+                elif y[i] < self.start_y[i] - self.move_range[i]:
+                    self.direction[i] = 1
+            else:
+                # 水平移动：左右往返
+                fx[i] += step
+                x[i] = fx[i] >> FP_SHIFT
+                if self.direction[i] > 0:
+                    if x[i] > self.start_x[i] + self.move_range[i]:
+                        self.direction[i] = -1
+                elif x[i] < self.start_x[i] - self.move_range[i]:
+                    self.direction[i] = 1
+        if self.render_list is not None:
+            for i in self.mover_ids:
+                self.render_list.move(i, x[i], y[i])
+
+    def place_gem(self, index):
+        """把礼物的渲染条目设置为当前动画帧（图片和位置都只是查表）"""
+        frames = get_spin_frames(self.images[self.image_index[index]])
+        k = (self.anim_tick // GEM_FRAME_TICKS + self.phase[index]) % frames.count
+        entry = self.render_list.entry(index)
+        entry[0] = frames.frames[k]
+        entry[1].topleft = (self.x[index] + frames.offset[0],
+                            self.y[index] + frames.offset[1] + frames.bob[k])
+
+    def animate_gems(self):
+        """每帧调用一次：推进礼物动画，只在换帧时更新尚未收集的礼物的渲染条目"""
+        self.anim_tick += 1
+        if self.render_list is None or self.anim_tick % GEM_FRAME_TICKS:
+            return
+        for i in self.gem_ids:
+            self.place_gem(i)
+
+    def sync_render_list(self, ids=None):
+        """
+        按数组内容同步渲染列表（恢复快照后调用）
+        ids 为空时同步所有实体：已收集的礼物隐藏，其余实体重新显示并更新位置
+        """
+        render_list = self.render_list
+        if render_list is None:
+            return
+        if ids is None:
+            ids = range(len(self.x))
+        for i in ids:
+            if self.flags[i] & FLAG_REMOVED:
+                continue
+            if self.flags[i] & FLAG_COLLECTED:
+                render_list.hide(i)
+            else:
+                render_list.show(i)
+                if self.kind[i] == KIND_GEM:
+                    self.place_gem(i)
+                else:
+                    render_list.move(i, self.x[i], self.y[i])
+
+    def first_collision(self, ids, rect):
+        """返回索引表中第一个与 rect 相交的实体，没有则返回 -1"""
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+        x, y, w, h = self.x, self.y, self.w, self.h
+        for i in ids:
+            if x[i] < right and left < x[i] + w[i] and y[i] < bottom and top < y[i] + h[i]:
+                return i
+        return -1
+
+    def platforms_near(self, left, right):
+        """
+        水平范围 [left, right) 内可能接触的平台索引（升序，与 platform_ids 的检查顺序一致）
+        固定平台只查所覆盖的列，移动平台位置会变，总是包含在内
+        """
+        found = set(self.mover_ids)
+        cells = self.platform_cells
+        for cell in range(left // PLATFORM_CELL, (right - 1) // PLATFORM_CELL + 1):
+            ids = cells.get(cell)
+            if ids:
+                found.update(ids)
+        return sorted(found)
+
+    def hit_spike(self, rect):
+        return self.first_collision(self.spike_ids, rect) >= 0
+
+    def collect_gems(self, rect):
+        """收集与 rect 相交的礼物，返回本次新收集的礼物索引"""
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+        x, y, w, h = self.x, self.y, self.w, self.h
+        hit = [i for i in self.gem_ids
+               if x[i] < right and left < x[i] + w[i] and y[i] < bottom and top < y[i] + h[i]]
+        for i in hit:
+            self.flags[i] |= FLAG_COLLECTED
+            self.gem_ids.remove(i)
+            if self.render_list is not None:
+                self.render_list.hide(i)
+        return hit
+
+    def visible(self, ids, area):
+        """裁剪：返回索引表中与可见区域 area 相交的实体"""
+        left, top, right, bottom = area.left, area.top, area.right, area.bottom
+        x, y, w, h = self.x, self.y, self.w, self.h
+        return [i for i in ids
+                if x[i] < right and left < x[i] + w[i] and y[i] < bottom and top < y[i] + h[i]]
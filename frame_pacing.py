@@ -0,0 +1,66 @@
+"""
+帧率调节模块：按游戏状态设置目标帧率，帧超时时跳过绘制（不跳过逻辑更新）
+"""
+import time
+from constants import *
+
+
+class FrameGovernor:
+    """
+    帧率调节器
+    - 每个游戏状态有自己的目标帧率：游戏中满帧，菜单和暂停降低帧率以节省 CPU
+    - 上一帧的工作时间超过预算时，本帧只更新逻辑不绘制（最多连续跳过 max_skip 帧）
+    - budget_ms / work_ms / frame_ms 对外公开，供其它子系统按负载调整质量
+    """
+    def __init__(self, clock, rates=None, max_skip=2):
+        self.clock = clock
+        self.rates = dict(STATE_FPS)
+        if rates:
+            self.rates.update(rates)
+        self.max_skip = max_skip
+
+        self.state = None
+        self.target_fps = FPS
+        self.budget_ms = 1000.0 / FPS   # 每帧时间预算（毫秒）
+        self.work_ms = 0.0              # 上一帧实际工作时间（不含等待）
+        self.frame_ms = self.budget_ms  # 上一帧总时间（含等待）
+        self.avg_work_ms = 0.0          # 工作时间的滑动平均
+        self.skipped = 0                # 连续跳过绘制的帧数
+        self.skipped_total = 0
+        self._frame_start = time.perf_counter()
+
+    def set_state(self, state):
+        """切换游戏状态时更新目标帧率"""
+        if state == self.state:
+            return
+        self.state = state
+        self.target_fps = self.rates.get(state, FPS)
+        self.budget_ms = 1000.0 / self.target_fps
+        # 状态切换后的第一帧总是绘制
+        self.skipped = 0
+        self.work_ms = 0.0
+
+    @property
+    def load(self):
+        """负载：平均工作时间占预算的比例，大于 1 说明跟不上目标帧率"""
+        return self.avg_work_ms / self.budget_ms
+
+    def should_render(self):
+        """上一帧超时则跳过本帧绘制，但不会连续跳过太多帧"""
+        if self.work_ms > self.budget_ms and self.skipped < self.max_skip:
+            self.skipped += 1
+            self.skipped_total += 1
+            return False
+        self.skipped = 0
+        return True
+
+    def tick(self):
+        """一帧结束：记录工作时间，然后按目标帧率等待"""
+        now = time.perf_counter()
+        self.work_ms = (now - self._frame_start) * 1000.0
+        self.avg_work_ms += (self.work_ms - self.avg_work_ms) * 0.1
+        # clock.tick 使用 SDL_Delay 等待，空闲时不占用 CPU
+        self.clock.tick(self.target_fps)
+        end = time.perf_counter()
+        self.frame_ms = (end - self._frame_start) * 1000.0
+        self._frame_start = end
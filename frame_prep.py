@@ -0,0 +1,140 @@
+"""
+帧准备模块：用一个小的线程池在主线程呈现（display.flip 和等待下一帧）的同时，
+准备下一帧只占用 CPU 的工作，结果通过双缓冲交给主线程：
+- 雪花粒子更新，并把视差背景 + 雪花合成到离屏表面（后缓冲）
+- HUD 文字只在内容变化时重新渲染
+主线程只需要一次 blit 合成层、一次 blits 提交实体和 HUD，然后 flip
+工作线程只在 submit 到 wait 之间运行，此时主线程不绘制也不使用字体
+"""
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from constants import *
+from display import Canvas
+
+
+class LayerBuffers:
+    """双缓冲离屏表面（内部分辨率）：工作线程绘制后缓冲，主线程读取前缓冲，准备完成后交换"""
+    def __init__(self, screen):
+        self.scale = getattr(screen, "scale", 1.0)
+        native = screen.surface if isinstance(screen, Canvas) else screen
+        self.surfaces = [pygame.Surface(native.get_size()).convert(native) for _ in range(2)]
+        # 后缓冲的绘制目标：与屏幕一样使用逻辑坐标
+        self.targets = [Canvas(surface, self.scale) if self.scale != 1.0 else surface
+                        for surface in self.surfaces]
+        self.front = 0
+        self.ready = False      # 前缓冲中是否已有内容
+
+    @property
+    def back(self):
+        return self.targets[self.front ^ 1]
+
+    def swap(self):
+        self.front ^= 1
+        self.ready = True
+
+    def draw(self, screen):
+        """把前缓冲画到屏幕上（已是内部分辨率，不再缩放）"""
+        native = screen.surface if isinstance(screen, Canvas) else screen
+        native.blit(self.surfaces[self.front], (0, 0))
+
+
+class FramePrep:
+    """
+    帧准备工作线程池
+    - submit(state)：本帧绘制完成后调用，提交下一帧的准备工作
+    - wait()：flip 和帧率等待之后调用，等待准备完成并交换缓冲
+    - HUD 使用上一帧结束时的数值，最多比逻辑晚一帧显示
+    - invalidate()：开始新的一局时丢弃上一局准备的内容
+    """
+    def __init__(self, game, workers=2):
+        self.game = game
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame-prep")
+        self.layers = LayerBuffers(game.screen)
+        self.hud = []               # 前缓冲：HUD 的 (图片, 位置) 列表
+        self._hud_key = None
+        self._texts = {}            # (字体, 文字, 颜色) -> 渲染结果
+        self._compose = None
+        self._build_hud = None
+
+    def hud_key(self):
+        game = self.game
+        return (game.lives, game.gems_collected, game.total_gems,
+                game.current_level, game.entities.has_movers())
+
+    def submit(self, state):
+        if state not in (PLAYING, PAUSED):
+            return
+        # 暂停时画面不变，合成层只需准备一次
+        if state == PLAYING or not self.layers.ready:
+            # 视差滚动量在主线程读取，工作线程不访问玩家对象
+            player = self.game.player
+            scroll = player.rect.centerx - SCREEN_WIDTH // 2 if player else 0
+            self._compose = self.pool.submit(self.compose, state == PLAYING, scroll)
+        key = self.hud_key()
+        if key != self._hud_key:
+            self._build_hud = (key, self.pool.submit(self.build_hud, key))
+
+    def wait(self):
+        if self._compose is not None:
+            future, self._compose = self._compose, None
+            future.result()
+            self.layers.swap()
+        if self._build_hud is not None:
+            (key, future), self._build_hud = self._build_hud, None
+            self.hud = future.result()
+            self._hud_key = key
+
+    def invalidate(self):
+        """换入或重新开始关卡时调用：前缓冲和 HUD 还是上一局的内容，下一次 ensure_ready 同步重新准备"""
+        self.layers.ready = False
+        self._hud_key = None
+
+    def ensure_ready(self, state):
+        """进入游戏后的第一帧还没有准备好的内容时，同步准备一次"""
+        if not self.layers.ready or self._hud_key is None:
+            self.submit(state)
+            self.wait()
+
+    def compose(self, advance, scroll):
+        """工作线程：推进雪花，并把视差背景和雪花画到后缓冲"""
+        game = self.game
+        target = self.layers.back
+        if advance:
+            game.snowfall.update()
+        game.parallax.draw(target, scroll)
+        game.snowfall.draw(target)
+
+    def text(self, font, text, color):
+        key = (id(font), text, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) > 64:
+                self._texts.clear()
+            surface = font.render(text, True, color)
+            self._texts[key] = surface
+        return surface
+
+    def build_hud(self, key):
+        """工作线程：按 HUD 数值生成 (图片, 位置) 列表"""
+        lives, gems_collected, total_gems, level, has_movers = key
+        font = self.game.font
+        small = self.game.instructions_font
+        hud = [
+            (self.text(font, f"生命: {lives}", WHITE), (20, 20)),
+            (self.text(font, f"礼物: {gems_collected}/{total_gems}", YELLOW), (20, 60)),
+            (self.text(font, f"关卡: {level}", WHITE), (20, 100)),
+        ]
+        if gems_collected < total_gems:
+            door_text = self.text(small, "收集所有礼物打开圣诞小屋大门", WHITE)
+        else:
+            door_text = self.text(small, "大门已打开！可以通关了", GREEN)
+        hud.append((door_text, door_text.get_rect(center=(SCREEN_WIDTH//2, 30))))
+        if has_movers:
+            platform_text = self.text(small, "橙色平台会移动！可以站在上面一起移动", ORANGE)
+            hud.append((platform_text, platform_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 30))))
+        pause_text = self.text(small, "按ESC键暂停游戏", WHITE)
+        hud.append((pause_text, pause_text.get_rect(center=(SCREEN_WIDTH - 100, 20))))
+        return hud
+
+    def close(self):
+        self.pool.shutdown(wait=True)
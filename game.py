@@ -1,16 +1,40 @@
 import pygame
 import sys
 from constants import *
-from entities import Player, Platform, Gem, Spike, Door
-from ui import Button, load_font
+from entity_store import EntityStore
+from render_list import RenderList, DOOR_KEY, PLAYER_KEY
+from snapshot import LevelSnapshot
+from frame_pacing import FrameGovernor
+from snowfall import Snowfall
+from ui import Button, Label, Screen, get_font, reset_fonts
+from assets import load_image
+from display import create_display, toggle_fullscreen
+from level_loader import build_level, LevelPreloader
+from level_pack import level_count, level_numbers, describe_level
+from level_watcher import LevelWatcher
+from telemetry import Telemetry, EVENT_GEM, EVENT_DOOR_OPEN
+from music import Music, MUSIC_END
+from frame_prep import FramePrep
+from parallax import ParallaxBackground
+from effects import BurstPool
+from memprof import MemoryProfiler
+from jump_arcs import JumpPreview
+from thumbnails import ThumbnailCache, THUMBNAIL_SIZE, THUMBNAIL_DIR
+from records import RecordStore, RunRecord, InputRecorder, format_frames
 
 class Game:
-    def __init__(self):
+    def __init__(self, render_scale=RENDER_SCALE, dev_mode=False, memprof=False,
+                 records_db=RECORDS_DB, telemetry_dir=TELEMETRY_DIR, thumbnails_dir=THUMBNAIL_DIR):
+        # 内存分析（可选，tracemalloc 会降低运行速度）：尽早开始，加载过程也计入
+        self.memprof = MemoryProfiler() if memprof else None
         pygame.init()  # 初始化所有Pygame模块
         pygame.font.init()  # 确保字体模块已初始化
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 绘制目标：所有 draw_* 使用逻辑坐标，内部分辨率由 render_scale 决定
+        self.screen = create_display(render_scale)
         pygame.display.set_caption("圣诞送礼物 - 2D平台跳跃小游戏")
         self.clock = pygame.time.Clock()
+        # 帧率调节：按状态设置目标帧率，超时跳过绘制
+        self.governor = FrameGovernor(self.clock)
         self.state = MENU
         self.current_level = 1
         self.lives = 3
@@ -50,83 +74,71 @@ class Game:
             print(f"音频初始化失败: {e}")
             self.victory_sound = None
 
-        # 添加关卡背景图片
-        try:
-            self.background = pygame.image.load("background.png").convert_alpha()
-            # 缩放背景图片到屏幕尺寸
-            self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        except:
-            print("背景图片加载失败，使用纯色背景")
-            self.background = None
+        # 背景音乐（流式播放，按状态和关卡切换播放列表）
+        self.music = Music()
+
+        # 关卡背景：天空、远山、树三层视差背景（background.png 作为天空层，缺少时程序生成）
+        self.parallax = ParallaxBackground()
 
         # 添加菜单背景图片（用于所有非游戏界面）
         try:
-            menu_bg_image = pygame.image.load("menu_bg.png").convert_alpha()
             # 使用保持比例的方法缩放
-            self.menu_background = self.scale_keep_ratio(menu_bg_image, SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.menu_background = load_image("menu_bg.png", (SCREEN_WIDTH, SCREEN_HEIGHT), "fit")
         except:
             print("菜单背景图片加载失败，使用纯色背景")
             self.menu_background = None
 
-        # 加载字体
-        self.font = load_font(36)
-        self.title_font = load_font(72)
-        self.instructions_font = load_font(28)
+        # 下雪粒子效果（需要 NumPy）
+        self.snowfall = Snowfall()
         
-        # 创建按钮
-        button_width = 200
-        button_height = 60
-        button_x = SCREEN_WIDTH // 2 - button_width // 2
+        # 收集礼物的火花（粒子和图片预先分配）
+        self.bursts = BurstPool()
         
-        self.start_button = Button(button_x, 250, button_width, button_height, "开始游戏", GREEN, LIGHT_GREEN, self.font)
-        self.instructions_button = Button(button_x, 330, button_width, button_height, "游戏说明", BLUE, LIGHT_BLUE, self.font)
-        self.exit_button = Button(button_x, 410, button_width, button_height, "退出游戏", RED, (255, 100, 100), self.font)
+        # 跳跃落点预览（F3 切换，轨迹来自预先计算的查找表）
+        self.jump_preview = JumpPreview()
+
+        # 字体来自共享的字体注册表（字体文件只查找一次）
+        self.font = get_font(36)
+        self.title_font = get_font(72)
+        self.instructions_font = get_font(28)
+        
+        # 所有非游戏界面：控件和布局只创建一次，之后每帧只切换按钮状态图片、一次 blits 绘制
+        self.build_screens()
+        
+        # 游戏实体：平台、礼物、尖刺保存在数组实体存储中，
+        # 绘制时从增量维护的渲染列表一次性提交
+        self.render_list = RenderList()
+        self.entities = EntityStore(self.render_list)
+        self.door = None
+        self.player = None
         
-        self.level1_button = Button(button_x, 250, button_width, button_height, "关卡 1", GREEN, LIGHT_GREEN, self.font)
-        self.level2_button = Button(button_x, 330, button_width, button_height, "关卡 2", BLUE, LIGHT_BLUE, self.font)
-        self.back_button = Button(button_x, 410, button_width, button_height, "返回菜单", GRAY, (150, 150, 150), self.font)
+        # 关卡初始状态快照（重新开始和复活时直接恢复）
+        self.level_start = LevelSnapshot()
+        self.loaded_level = None
         
-        # 暂停菜单按钮
-        self.resume_button = Button(button_x, 300, button_width, button_height, "继续游戏", GREEN, LIGHT_GREEN, self.font)
-        self.pause_menu_button = Button(button_x, 380, button_width, button_height, "返回菜单", BLUE, LIGHT_BLUE, self.font)
-
-        # 游戏说明页面的返回按钮（放在右上角）
-        self.instructions_back_button = Button(SCREEN_WIDTH - 210, 20, 190, 50, "返回菜单", GRAY, (150, 150, 150), self.font)
+        # 游戏数据记录（后台线程写文件）
+        self.telemetry = Telemetry(telemetry_dir)
         
-        self.restart_button = Button(button_x, 350, button_width, button_height, "重新开始", GREEN, LIGHT_GREEN, self.font)
-        self.menu_button = Button(button_x, 430, button_width, button_height, "返回菜单", BLUE, LIGHT_BLUE, self.font)
+        # 本地成绩记录（后台线程写入 SQLite）和本局的按键录像
+        self.records = RecordStore(records_db)
+        self.recorder = InputRecorder()
+        self.last_run = None        # (本局结果, 记录前的关卡汇总)，胜利界面显示
         
-        # 游戏实体
-        self.all_sprites = pygame.sprite.Group()
-        self.platforms = pygame.sprite.Group()
-        self.gems = pygame.sprite.Group()
-        self.spikes = pygame.sprite.Group()
-        self.door = None
-        self.player = None
+        # 关卡缩略图（关卡选择界面按需在后台读取或生成）
+        self.thumbnails = ThumbnailCache(thumbnails_dir)
+        
+        # 后台关卡预加载（胜利界面、关卡选择时提前构建下一关）
+        self.preloader = LevelPreloader()
+        
+        # 开发模式：修改 levels.py 后热重载当前关卡
+        self.level_watcher = LevelWatcher() if dev_mode else None
+        
+        # 帧准备线程池：呈现上一帧时并行准备雪花、背景合成层和 HUD 文字
+        self.frame_prep = FramePrep(self)
         
         # 加载游戏关卡
         self.load_level(self.current_level)
 
-    def scale_keep_ratio(self, image, target_width, target_height):
-        original_width = image.get_width()
-        original_height = image.get_height()
-            
-        width_ratio = target_width / original_width
-        height_ratio = target_height / original_height
-        scale = min(width_ratio, height_ratio)
-            
-        new_width = int(original_width * scale)
-        new_height = int(original_height * scale)
-            
-        scaled_image = pygame.transform.scale(image, (new_width, new_height))
-            
-        result = pygame.Surface((target_width, target_height), pygame.SRCALPHA)
-        x = (target_width - new_width) // 2
-        y = (target_height - new_height) // 2
-        result.blit(scaled_image, (x, y))
-            
-        return result
-
     def play_victory_sound(self):
         """播放胜利音效"""
         if self.victory_sound and not self.victory_sound_played:
@@ -151,231 +163,92 @@ class Game:
                 pass         
 
     def load_level(self, level_num):
-        # 清空现有实体
-        self.all_sprites.empty()
-        self.platforms.empty()
-        self.gems.empty()
-        self.spikes.empty()
-        self.door = None
-        self.player = None
+        """加载关卡：优先使用后台预先构建好的结果，否则立即构建"""
+        built = self.preloader.take(level_num)
+        if built is None:
+            built = build_level(level_num, self.entities)
+        self.install_level(built)
+        if self.memprof:
+            self.memprof.level_loaded()
+    
+    def install_level(self, built):
+        """换入构建好的关卡（见 level_loader.build_level），只做赋值和快照记录"""
+        self.render_list = built.render_list
+        self.entities = built.entities
+        self.door = built.door
+        self.player = built.player
+        self.birth_point = built.birth_point
+        self.total_gems = built.total_gems
         self.gems_collected = 0
         # 重置音频播放状态
         self.victory_sound_played = False
         
-        # 根据关卡创建游戏元素
-        if level_num == 1:
-            self.total_gems = 6
-            
-            # 清空所有边界平台，让所有平台悬空
-            # 第一层平台（底部）
-            birth_platform_y = SCREEN_HEIGHT - 100  # 平台顶部Y坐标
-            birth_platform_width = 150
-            self.create_platform(50, birth_platform_y, birth_platform_width, 20, ICE_BLUE)# 出生平台
-            self.create_platform(400, SCREEN_HEIGHT - 50, 200, 20, ICE_BLUE)  # 长平台
-            self.create_platform(700, SCREEN_HEIGHT - 100, 120, 20, ICE_BLUE)  # 短平台
-
-            # 设置出生点（在出生平台中间偏左）
-            player_height = 40  # 玩家高度
-            self.birth_point = (
-                50 + birth_platform_width // 4,  # 平台1/4位置
-                birth_platform_y - player_height  # 平台顶部减去玩家高度
-            )
-            
-            # 创建玩家 - 直接使用出生点
-            self.player = Player(self.birth_point[0], self.birth_point[1])
-            self.all_sprites.add(self.player)
-
-            
-            # 第二层平台（中间层）
-            self.create_platform(100, SCREEN_HEIGHT - 250, 180, 20, SNOW_WHITE)  # 长平台
-            # 长平台中间带刺
-            self.create_platform(450, SCREEN_HEIGHT - 250, 250, 20, SNOW_WHITE)  # 长平台
-            self.create_spikes(550, SCREEN_HEIGHT - 285, 2)  # 平台中间的尖刺
-            
-            # 第三层平台（上层）
-            self.create_platform(250, SCREEN_HEIGHT - 400, 150, 20, SNOW_WHITE)  # 长平台
-            self.create_platform(600, SCREEN_HEIGHT - 400, 120, 20, SNOW_WHITE)  # 短平台
-            
-            # 垂直移动平台（便于上下移动）
-            self.create_platform(800, SCREEN_HEIGHT - 350, 100, 15, FROST_BLUE, movable=True, vertical=True)
-            
-            # 第四层平台（顶部层）- 大门所在
-            self.create_platform(SCREEN_WIDTH - 250, SCREEN_HEIGHT - 550, 220, 20, GLACIER_BLUE)  # 长平台，右上角
-            
-            # 宝石分布
-            self.create_gem(210, SCREEN_HEIGHT - 120)  # 第一层左平台
-            self.create_gem(500, SCREEN_HEIGHT - 120)  # 第一层中平台
-            self.create_gem(760, SCREEN_HEIGHT - 120)  # 第一层右平台
-            
-            self.create_gem(190, SCREEN_HEIGHT - 270)  # 第二层左平台
-            self.create_gem(650, SCREEN_HEIGHT - 270)  # 第二层右平台（避开尖刺）
-            
-            self.create_gem(850, SCREEN_HEIGHT - 370)  # 垂直移动平台上
-            
-            # 大门 - 放在第四层右上角的长平台上
-            self.door = Door(SCREEN_WIDTH - 150, SCREEN_HEIGHT - 650, 100, 100)
-            self.all_sprites.add(self.door)
-
-        elif level_num == 2:
-            self.total_gems = 8
-            
-            # 第一层平台（底部）- 出生平台
-            birth_platform_y = SCREEN_HEIGHT - 80
-            birth_platform_width = 100
-            self.create_platform(0, birth_platform_y, birth_platform_width, 20, SNOW_WHITE)
-            
-            # 设置出生点
-            player_height = 40
-            self.birth_point = (
-                birth_platform_width // 2,
-                birth_platform_y - player_height
-            )
-            
-            # 创建玩家
-            self.player = Player(self.birth_point[0], self.birth_point[1])
-            self.all_sprites.add(self.player)
-            
-            # 第一层其他平台
-            self.create_platform(200, SCREEN_HEIGHT - 80, 250, 20, ICE_BLUE)  # 长平台
-            self.create_spikes(300, SCREEN_HEIGHT - 115, 2)  # 平台中间的尖刺
-            self.create_platform(650, SCREEN_HEIGHT - 80, 120, 20, ICE_BLUE)  # 短平台
-            
-            # 第一个关键垂直移动平台（必用的，连接第一层到第二层）
-            self.create_platform(250, SCREEN_HEIGHT - 200, 100, 15, FROST_BLUE, movable=True, vertical=True)
-            self.create_platform(850, SCREEN_HEIGHT - 200, 100, 15, FROST_BLUE, movable=True, vertical=True)
-            
-            # 第二层平台（中间层）
-            self.create_platform(50, SCREEN_HEIGHT - 280, 180, 20, SNOW_WHITE)  # 左平台
-            self.create_platform(400, SCREEN_HEIGHT - 280, 200, 20, SNOW_WHITE)  # 中平台，带刺
-            self.create_spikes(480, SCREEN_HEIGHT - 315, 2)  # 平台中间的尖刺
-            self.create_platform(700, SCREEN_HEIGHT - 280, 150, 20, SNOW_WHITE)  # 右平台
-            
-
-        
-            # 第三层平台（上层）
-            self.create_platform(100, SCREEN_HEIGHT - 400, 220, 20, SNOW_WHITE)  # 长平台
-            self.create_platform(550, SCREEN_HEIGHT - 400, 100, 20, SNOW_WHITE)  # 中平台
-  
-            
-            # 第三个垂直移动平台（关键，通往顶部）
-            self.create_platform(550, SCREEN_HEIGHT - 520, 100, 15, FROST_BLUE, movable=True, vertical=True)
-            
-            # 第四层平台（顶层）- 大门平台
-            gate_platform_width = 250
-            gate_platform_x = SCREEN_WIDTH - gate_platform_width - 50
-            gate_platform_y = SCREEN_HEIGHT - 550
-            self.create_platform(gate_platform_x, gate_platform_y, gate_platform_width, 20, GLACIER_BLUE)
-            
-            # 宝石分布（沿着主要路径）
-            self.create_gem(175, SCREEN_HEIGHT - 140)  # 出生平台
-            self.create_gem(450, SCREEN_HEIGHT - 120)  # 第一层中平台
-            self.create_gem(710, SCREEN_HEIGHT - 120)  # 第一层右平台
-            
-            self.create_gem(300, SCREEN_HEIGHT - 220)  # 垂直移动平台1上
-            self.create_gem(200, SCREEN_HEIGHT - 300)  # 第二层左平台
-            self.create_gem(750, SCREEN_HEIGHT - 300)  # 第二层右平台
-            
-            self.create_gem(625, SCREEN_HEIGHT - 420)  # 第三层中平台
-            self.create_gem(500, SCREEN_HEIGHT - 500)  # 垂直移动平台3上
-            
-            # 大门 - 放在右上角的平台上
-            gate_x = gate_platform_x + gate_platform_width // 2 - 30
-            gate_y = gate_platform_y - 100
-            self.door = Door(gate_x, gate_y, 100, 100)
-            self.all_sprites.add(self.door)
-                         
-    def create_platform(self, x, y, width, height, color, movable=False, vertical=False):
-        platform = Platform(x, y, width, height, color, movable, vertical)
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-    def create_spikes(self, x, y, count):
-        for i in range(count):
-            spike = Spike(x + i * 40, y)
-            self.spikes.add(spike)
-            self.all_sprites.add(spike)
-            
-    def create_gem(self, x, y):
-        gem = Gem(x, y)
-        self.gems.add(gem)
-        self.all_sprites.add(gem)
+        # 记录关卡初始状态
+        self.loaded_level = built.level_num
+        self.level_start.capture(self)
+        self.frame_prep.invalidate()
     
+    def preload_level(self, level_num):
+        """下一关可以预知时调用：在后台提前构建（已加载的关卡直接恢复快照，无需构建）"""
+        if level_num != self.loaded_level:
+            self.preloader.request(level_num, self.entities)
     
-    def draw_menu(self):
-        # 绘制菜单背景
-        if self.menu_background:
-            self.screen.blit(self.menu_background, (0, 0))
-        else:
-            self.screen.fill((30, 30, 60))
-
-        # 绘制标题
-        title_text = self.title_font.render("圣诞送礼物", True, BLACK)
-        if title_text:
-            title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-            self.screen.blit(title_text, title_rect)
-        
-        # 绘制副标题
-        subtitle_text = self.font.render("2D横版平台跳跃游戏", True, BLACK)
-        if subtitle_text:
-            subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH//2, 200))
-            self.screen.blit(subtitle_text, subtitle_rect)
-        
-        # 绘制按钮
-        self.start_button.draw(self.screen)
-        self.instructions_button.draw(self.screen)
-        self.exit_button.draw(self.screen)
-        
-        # 绘制操作说明
-        controls_text = self.instructions_font.render("操作说明: 方向键移动, 空格键跳跃", True, BLACK)
-        if controls_text:
-            controls_rect = controls_text.get_rect(center=(SCREEN_WIDTH//2, 520))
-            self.screen.blit(controls_text, controls_rect)
-        
-    def draw_level_select(self):
-        # 绘制菜单背景
-        if self.menu_background:
-            self.screen.blit(self.menu_background, (0, 0))
-        else:
-            self.screen.fill((30, 30, 60))
-        
-        # 绘制标题
-        title_text = self.title_font.render("选择关卡", True, YELLOW)
-        if title_text:
-            title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-            self.screen.blit(title_text, title_rect)
-        
-        # 绘制按钮
-        self.level1_button.draw(self.screen)
-        self.level2_button.draw(self.screen)
-        self.back_button.draw(self.screen)
-        
-        # 绘制关卡描述
-        if self.level1_button.is_hovered():
-            desc_text = "关卡 1: 入门难度，5个礼物，1组尖刺，1个移动平台"
-        elif self.level2_button.is_hovered():
-            desc_text = "关卡 2: 中等难度，8个礼物，2组尖刺，2个移动平台"
+    def restart_level(self, level_num):
+        """开始关卡：已加载的同一关卡直接恢复快照，否则重新加载"""
+        self.current_level = level_num
+        self.lives = 3
+        self.victory_sound_played = False
+        if self.loaded_level == level_num and self.level_start.valid:
+            self.level_start.restore(self)
+            # 背景合成层和 HUD 还是上一局的画面
+            self.frame_prep.invalidate()
         else:
-            desc_text = "选择一个关卡开始游戏"
-            
-        desc_surf = self.instructions_font.render(desc_text, True, BLACK)
-        if desc_surf:
-            desc_rect = desc_surf.get_rect(center=(SCREEN_WIDTH//2, 520))
-            self.screen.blit(desc_surf, desc_rect)
+            self.load_level(level_num)
+        self.telemetry.begin_level(level_num, *self.player.rect.center)
+        self.recorder.begin()
+        self.bursts.clear()
     
-    def draw_instructions(self):
-        # 绘制菜单背景
-        if self.menu_background:
-            self.screen.blit(self.menu_background, (0, 0))
-        else:
-            self.screen.fill((30, 30, 60))
-        
-        # 绘制标题
-        title_text = self.title_font.render("游戏说明", True, YELLOW)
-        if title_text:
-            title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 80))
-            self.screen.blit(title_text, title_rect)
-        
-        # 绘制说明文本
+    def finish_run(self, completed):
+        """一局结束（通关或生命用完）时保存成绩，写入在后台进行"""
+        run = RunRecord(self.current_level, completed, len(self.recorder), 3 - self.lives,
+                        self.gems_collected, self.total_gems,
+                        bytes(self.recorder.inputs) if RECORDS_SAVE_REPLAYS else None)
+        self.last_run = (run, self.records.add(run))
+    
+    def records_text(self, level_num):
+        """关卡成绩汇总文字（从内存缓存读取）"""
+        stats = self.records.stats(level_num)
+        if stats.best_frames is None:
+            return f"还没有通关记录（尝试 {stats.attempts} 次）" if stats.attempts else "还没有记录"
+        return (f"最佳用时 {format_frames(stats.best_frames)}，最少死亡 {stats.fewest_deaths} 次，"
+                f"通关 {stats.completions}/{stats.attempts} 次")
+                         
+    def build_screens(self):
+        """创建菜单、关卡选择、说明、胜利、失败和暂停界面（按钮状态和静态文字在这里渲染好）"""
+        button_width = 200
+        button_height = 60
+        button_spacing = 20
+        button_x = SCREEN_WIDTH // 2 - button_width // 2
+        center_x = SCREEN_WIDTH // 2
+        
+        def button(y, text, color, hover_color, action):
+            return Button(button_x, y, button_width, button_height, text, color, hover_color, self.font, action)
+        
+        # 主菜单
+        self.menu_screen = screen = Screen(self.menu_background, (30, 30, 60))
+        screen.add(Label("圣诞送礼物", self.title_font, BLACK, (center_x, 150)))
+        screen.add(Label("2D横版平台跳跃游戏", self.font, BLACK, (center_x, 200)))
+        screen.add(button(250, "开始游戏", GREEN, LIGHT_GREEN, "start"))
+        screen.add(button(330, "游戏说明", BLUE, LIGHT_BLUE, "instructions"))
+        screen.add(button(410, "退出游戏", RED, (255, 100, 100), "exit"))
+        screen.add(Label("操作说明: 方向键移动, 空格键跳跃", self.instructions_font, BLACK, (center_x, 520)))
+        
+        # 关卡选择（按钮由关卡数量生成）
+        self.build_level_select()
+        
+        # 游戏说明（返回按钮放在右上角）
+        self.instructions_screen = screen = Screen(self.menu_background, (30, 30, 60))
+        screen.add(Label("游戏说明", self.title_font, YELLOW, (center_x, 80)))
         instructions = [
             "游戏目标: 收集关卡中的所有礼物，然后送到小屋中",
             "控制方式:",
@@ -393,385 +266,422 @@ class Game:
             "  - 尖刺: 触碰会失去生命",
             "  - 圣诞小屋: 通关出口（收集所有礼物门会打开）"
         ]
-        
         for i, line in enumerate(instructions):
-            text_surf = self.instructions_font.render(line, True, BLACK)
-            if text_surf:
-                text_rect = text_surf.get_rect(center=(SCREEN_WIDTH//2, 140 + i*28))
-                self.screen.blit(text_surf, text_rect)
-        
-        # 绘制返回按钮（右上角）
-        self.instructions_back_button.draw(self.screen)
+            screen.add(Label(line, self.instructions_font, BLACK, (center_x, 140 + i*28)))
+        screen.add(Button(SCREEN_WIDTH - 210, 20, 190, 50, "返回菜单", GRAY, (150, 150, 150), self.font, "back"))
+        
+        # 胜利界面：还有下一关和已完成所有关卡两种布局，结果文字两者共用
+        self.win_gems_label = Label("", self.font, BLACK, (center_x, 220))
+        self.win_lives_label = Label("", self.font, BLACK, (center_x, 270))
+        self.win_time_label = Label("", self.instructions_font, BLACK, (center_x, 305))
+        win_title = Label("关卡通过！", self.title_font, YELLOW, (center_x, 150))
+        self.win_screen = screen = Screen(self.menu_background, (30, 60, 30))
+        for widget in (win_title, self.win_gems_label, self.win_lives_label, self.win_time_label):
+            screen.add(widget)
+        screen.add(button(330, "下一关", GREEN, LIGHT_GREEN, "next"))
+        screen.add(button(330 + button_height + button_spacing, "重新开始", GREEN, LIGHT_GREEN, "restart"))
+        screen.add(button(330 + 2*(button_height + button_spacing), "返回菜单", BLUE, LIGHT_BLUE, "menu"))
+        
+        self.final_win_screen = screen = Screen(self.menu_background, (30, 60, 30))
+        for widget in (win_title, self.win_gems_label, self.win_lives_label, self.win_time_label):
+            screen.add(widget)
+        screen.add(Label("恭喜你完成了所有关卡！", self.font, YELLOW, (center_x, 320)))
+        screen.add(button(370, "重新开始", GREEN, LIGHT_GREEN, "restart"))
+        screen.add(button(370 + button_height + button_spacing, "返回菜单", BLUE, LIGHT_BLUE, "menu"))
+        
+        # 游戏结束
+        self.game_over_screen = screen = Screen(self.menu_background, (60, 30, 30))
+        screen.add(Label("游戏结束", self.title_font, RED, (center_x, 150)))
+        self.fail_label = screen.add(Label("", self.font, WHITE, (center_x, 220)))
+        self.fail_gems_label = screen.add(Label("", self.font, WHITE, (center_x, 270)))
+        screen.add(button(330, "重新开始", GREEN, LIGHT_GREEN, "restart"))
+        screen.add(button(330 + button_height + button_spacing, "返回菜单", BLUE, LIGHT_BLUE, "menu"))
+        
+        # 暂停界面：半透明覆盖层画在游戏画面上
+        pause_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        pause_overlay.fill((0, 0, 0, 150))  # 黑色半透明
+        self.pause_screen = screen = Screen(pause_overlay)
+        screen.add(Label("游戏暂停", self.title_font, YELLOW, (center_x, 150)))
+        screen.add(Label("游戏已暂停", self.font, WHITE, (center_x, 220)))
+        screen.add(button(300, "继续游戏", GREEN, LIGHT_GREEN, "resume"))
+        screen.add(button(380, "返回菜单", BLUE, LIGHT_BLUE, "menu"))
+        screen.add(Label("按ESC键继续游戏", self.instructions_font, LIGHT_GRAY, (center_x, 500)))
     
-    def draw_playing(self):
-        # 绘制背景
-        if self.background:
-            self.screen.blit(self.background, (0, 0))
-        else:
-            # 如果没有背景图片，使用原来的纯色背景
-            self.screen.fill((100, 150, 200))
+    def build_level_select(self):
+        """
+        关卡选择界面：每个关卡一个按钮，缩略图画在按钮左侧
+        按钮按列排列（每列 LEVEL_SELECT_ROWS 个），一页放不下时分页，用“上一页 / 下一页”切换
+        关卡描述和成绩随悬停的按钮变化（文字变化时才重新渲染）
+        """
+        button_width = 200
+        button_height = 60
+        row_spacing = 80
+        cell_width = THUMBNAIL_SIZE[0] + 15 + button_width     # 缩略图 + 间隔 + 按钮
+        column_spacing = cell_width + 40
+        center_x = SCREEN_WIDTH // 2
+        colors = ((GREEN, LIGHT_GREEN), (BLUE, LIGHT_BLUE))
+        per_page = LEVEL_SELECT_ROWS * LEVEL_SELECT_COLUMNS
+        numbers = level_numbers()
+        
+        self.level_select_screen = screen = Screen(self.menu_background, (30, 30, 60))
+        screen.add(Label("选择关卡", self.title_font, YELLOW, (center_x, 150)))
+        self.level_pages = [numbers[i:i + per_page] for i in range(0, len(numbers), per_page)] or [[]]
+        self.level_buttons = {}
+        self.thumbnail_rects = {}
+        for page in self.level_pages:
+            # 只有一列时按钮与“返回菜单”对齐居中；多列时（缩略图 + 按钮）整体居中
+            columns = (len(page) + LEVEL_SELECT_ROWS - 1) // LEVEL_SELECT_ROWS
+            if columns == 1:
+                first_x = center_x - button_width // 2
+            else:
+                first_x = (center_x - (columns * column_spacing - 40) // 2) + cell_width - button_width
+            for slot, level_num in enumerate(page):
+                column, row = divmod(slot, LEVEL_SELECT_ROWS)
+                x = first_x + column * column_spacing
+                y = 250 + row * row_spacing
+                color, hover_color = colors[(level_num - 1) % len(colors)]
+                self.level_buttons[level_num] = screen.add(Button(
+                    x, y, button_width, button_height, f"关卡 {level_num}",
+                    color, hover_color, self.font, level_num))
+                thumb_rect = pygame.Rect((0, 0), THUMBNAIL_SIZE)
+                thumb_rect.midright = (x - 15, y + button_height // 2)
+                self.thumbnail_rects[level_num] = thumb_rect
+        
+        back_y = 250 + LEVEL_SELECT_ROWS * row_spacing
+        back_x = center_x - button_width // 2
+        screen.add(Button(back_x, back_y, button_width, button_height, "返回菜单",
+                          GRAY, (150, 150, 150), self.font, "back"))
+        self.prev_page_button = screen.add(Button(back_x - 160, back_y, 140, button_height, "上一页",
+                                                  GRAY, (150, 150, 150), self.font, "prev_page"))
+        self.next_page_button = screen.add(Button(back_x + button_width + 20, back_y, 140, button_height,
+                                                  "下一页", GRAY, (150, 150, 150), self.font, "next_page"))
+        self.level_page_label = screen.add(Label("", self.instructions_font, LIGHT_GRAY,
+                                                 (center_x, back_y + button_height + 20)))
+        self.level_desc_label = screen.add(
+            Label("选择一个关卡开始游戏", self.instructions_font, BLACK, (center_x, back_y + 110)))
+        self.level_records_label = screen.add(
+            Label("", self.instructions_font, BLACK, (center_x, back_y + 145)))
+        self.show_level_page(0)
+    
+    def show_level_page(self, page):
+        """显示关卡选择的第 page 页（只有当前页的按钮可见、可点击）"""
+        self.level_page = page = max(0, min(page, len(self.level_pages) - 1))
+        visible = set(self.level_pages[page])
+        for level_num, level_button in self.level_buttons.items():
+            level_button.visible = level_num in visible
+        paged = len(self.level_pages) > 1
+        self.prev_page_button.visible = paged and page > 0
+        self.next_page_button.visible = paged and page < len(self.level_pages) - 1
+        self.level_page_label.visible = paged
+        self.level_page_label.set_text(f"第 {page + 1} / {len(self.level_pages)} 页")
     
+    def current_win_screen(self):
+        """胜利界面：还有下一关时显示“下一关”按钮"""
+        return self.win_screen if self.current_level < level_count() else self.final_win_screen
+    
+    def hovered_level(self):
+        """关卡选择界面中鼠标悬停的关卡，没有时返回 None"""
+        for level_num in self.level_pages[self.level_page]:
+            if self.level_buttons[level_num].is_hovered():
+                return level_num
+        return None
+    
+    def draw_menu(self):
+        self.menu_screen.draw(self.screen)
         
-        # 绘制所有实体
-        for sprite in self.all_sprites:
-            if isinstance(sprite, Gem) and sprite.collected:
-                continue
-            self.screen.blit(sprite.image, sprite.rect)
-        
-        # 绘制宝石（礼物）（单独处理，因为有些可能已被收集）
-        for gem in self.gems:
-            if not gem.collected:
-                self.screen.blit(gem.image, gem.rect)
-        
-        # 绘制UI信息
-        # 生命值显示
-        lives_text = self.font.render(f"生命: {self.lives}", True, WHITE)
-        if lives_text:
-            self.screen.blit(lives_text, (20, 20))
-        
-        # 宝石收集进度
-        gems_text = self.font.render(f"礼物: {self.gems_collected}/{self.total_gems}", True, YELLOW)
-        if gems_text:
-            self.screen.blit(gems_text, (20, 60))
-        
-        # 关卡显示
-        level_text = self.font.render(f"关卡: {self.current_level}", True, WHITE)
-        if level_text:
-            self.screen.blit(level_text, (20, 100))
-        
-        # 大门状态提示
-        if self.gems_collected < self.total_gems:
-            door_text = self.instructions_font.render("收集所有礼物打开圣诞小屋大门", True, WHITE)
+    def draw_level_select(self):
+        # 关卡描述（由关卡数据生成）和该关卡的成绩
+        level_num = self.hovered_level()
+        if level_num is None:
+            self.level_desc_label.set_text("选择一个关卡开始游戏")
+            self.level_records_label.visible = False
         else:
-            door_text = self.instructions_font.render("大门已打开！可以通关了", True, GREEN)
-        
-        if door_text:
-            door_rect = door_text.get_rect(center=(SCREEN_WIDTH//2, 30))
-            self.screen.blit(door_text, door_rect)
-        
-        # 移动平台提示
-        if any(platform.movable for platform in self.platforms):
-            platform_text = self.instructions_font.render("橙色平台会移动！可以站在上面一起移动", True, ORANGE)
-            if platform_text:
-                platform_rect = platform_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 30))
-                self.screen.blit(platform_text, platform_rect)
-        
-        # 暂停提示
-        pause_text = self.instructions_font.render("按ESC键暂停游戏", True, WHITE)
-        if pause_text:
-            pause_rect = pause_text.get_rect(center=(SCREEN_WIDTH - 100, 20))
-            self.screen.blit(pause_text, pause_rect)
+            self.level_desc_label.set_text(describe_level(level_num))
+            self.level_records_label.set_text(self.records_text(level_num))
+            self.level_records_label.visible = True
+        self.level_select_screen.draw(self.screen)
+        
+        # 当前页的关卡缩略图（还没准备好时显示占位框）
+        for level_num in self.level_pages[self.level_page]:
+            thumb_rect = self.thumbnail_rects[level_num]
+            self.screen.fill(DARK_GRAY, thumb_rect.inflate(4, 4))
+            thumbnail = self.thumbnails.get(level_num)
+            if thumbnail:
+                self.screen.blit(thumbnail, thumb_rect)
+    
+    def draw_instructions(self):
+        self.instructions_screen.draw(self.screen)
+    
+    def draw_playing(self):
+        # 视差背景和雪花已由工作线程合成到离屏表面（双缓冲），这里只需一次 blit
+        self.frame_prep.ensure_ready(self.state)
+        self.frame_prep.layers.draw(self.screen)
+        
+        # 绘制所有可见实体：平台、尖刺、礼物、大门、玩家（一次 blits 提交）
+        if self.door:
+            self.render_list.set_surface(DOOR_KEY, self.door.image)
+        if self.player:
+            self.render_list.set_surface(PLAYER_KEY, self.player.image)
+        self.render_list.draw(self.screen)
+        self.bursts.draw(self.screen)
+        self.jump_preview.draw(self.screen)
+        
+        # 绘制UI信息：生命值、礼物进度、关卡、大门状态、移动平台和暂停提示
+        # （文字只在数值变化时由工作线程重新渲染）
+        self.screen.blits(self.frame_prep.hud, doreturn=False)
     
     def draw_win_screen(self):
-        # 绘制菜单背景
-        if self.menu_background:
-            self.screen.blit(self.menu_background, (0, 0))
-        else:
-            self.screen.fill((30, 60, 30))
-        
-        # 绘制胜利文本
-        win_text = self.title_font.render("关卡通过！", True, YELLOW)
-        if win_text:
-            win_rect = win_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-            self.screen.blit(win_text, win_rect)
-        
-        # 绘制收集信息
-        gems_text = self.font.render(f"收集了 {self.gems_collected}/{self.total_gems} 个礼物", True, BLACK)
-        if gems_text:
-            gems_rect = gems_text.get_rect(center=(SCREEN_WIDTH//2, 220))
-            self.screen.blit(gems_text, gems_rect)
-        
-        # 绘制剩余生命
-        lives_text = self.font.render(f"剩余生命: {self.lives}", True, BLACK)
-        if lives_text:
-            lives_rect = lives_text.get_rect(center=(SCREEN_WIDTH//2, 270))
-            self.screen.blit(lives_text, lives_rect)
-        
-        # 绘制按钮 - 重新排列避免重叠
-        button_width = 200
-        button_height = 60
-        button_spacing = 20
-        
-        if self.current_level < 2:
-            # 下一关按钮
-            next_level_button = Button(
-                SCREEN_WIDTH//2 - button_width//2, 
-                330, 
-                button_width, 
-                button_height, 
-                "下一关", 
-                GREEN, 
-                LIGHT_GREEN, 
-                self.font
-            )
-            next_level_button.draw(self.screen)
-            self.next_level_button = next_level_button
-            
-            # 重新开始按钮
-            self.restart_button.rect.x = SCREEN_WIDTH//2 - button_width//2
-            self.restart_button.rect.y = 330 + button_height + button_spacing
-            self.restart_button.draw(self.screen)
-            
-            # 返回菜单按钮
-            self.menu_button.rect.x = SCREEN_WIDTH//2 - button_width//2
-            self.menu_button.rect.y = 330 + 2*(button_height + button_spacing)
-            self.menu_button.draw(self.screen)
-        else:
-            # 所有关卡完成的情况
-            complete_text = self.font.render("恭喜你完成了所有关卡！", True, YELLOW)
-            if complete_text:
-                complete_rect = complete_text.get_rect(center=(SCREEN_WIDTH//2, 320))
-                self.screen.blit(complete_text, complete_rect)
-            
-            self.restart_button.rect.x = SCREEN_WIDTH//2 - button_width//2
-            self.restart_button.rect.y = 370
-            self.restart_button.draw(self.screen)
-            
-            self.menu_button.rect.x = SCREEN_WIDTH//2 - button_width//2
-            self.menu_button.rect.y = 370 + button_height + button_spacing
-            self.menu_button.draw(self.screen)
+        # 收集信息、剩余生命、本局用时和最佳成绩（内容变化时才重新渲染）
+        self.win_gems_label.set_text(f"收集了 {self.gems_collected}/{self.total_gems} 个礼物")
+        self.win_lives_label.set_text(f"剩余生命: {self.lives}")
+        if self.last_run:
+            run, previous = self.last_run
+            if previous.best_frames is None or run.frames < previous.best_frames:
+                time_line = f"用时 {format_frames(run.frames)}  新纪录！"
+            else:
+                time_line = f"用时 {format_frames(run.frames)}  最佳 {format_frames(previous.best_frames)}"
+            self.win_time_label.set_text(time_line)
+        self.win_time_label.visible = self.last_run is not None
+        self.current_win_screen().draw(self.screen)
     
     def draw_game_over(self):
-        # 绘制菜单背景
-        if self.menu_background:
-            self.screen.blit(self.menu_background, (0, 0))
-        else:
-            self.screen.fill((60, 30, 30))
-        
-        # 绘制游戏结束文本
-        game_over_text = self.title_font.render("游戏结束", True, RED)
-        if game_over_text:
-            game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-            self.screen.blit(game_over_text, game_over_rect)
-        
-        # 绘制失败信息
-        fail_text = self.font.render(f"你在关卡 {self.current_level} 失败了", True, WHITE)
-        if fail_text:
-            fail_rect = fail_text.get_rect(center=(SCREEN_WIDTH//2, 220))
-            self.screen.blit(fail_text, fail_rect)
-        
-        # 绘制收集信息
-        gems_text = self.font.render(f"收集了 {self.gems_collected}/{self.total_gems} 个礼物", True, WHITE)
-        if gems_text:
-            gems_rect = gems_text.get_rect(center=(SCREEN_WIDTH//2, 270))
-            self.screen.blit(gems_text, gems_rect)
-        
-        # 绘制按钮
-        button_width = 200
-        button_height = 60
-        button_spacing = 20
-        
-        self.restart_button.rect.x = SCREEN_WIDTH//2 - button_width//2
-        self.restart_button.rect.y = 330
-        self.restart_button.draw(self.screen)
-        
-        self.menu_button.rect.x = SCREEN_WIDTH//2 - button_width//2
-        self.menu_button.rect.y = 330 + button_height + button_spacing
-        self.menu_button.draw(self.screen)
+        self.fail_label.set_text(f"你在关卡 {self.current_level} 失败了")
+        self.fail_gems_label.set_text(f"收集了 {self.gems_collected}/{self.total_gems} 个礼物")
+        self.game_over_screen.draw(self.screen)
     
     def draw_pause_screen(self):
-        # 半透明覆盖层
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))  # 黑色半透明
-        self.screen.blit(overlay, (0, 0))
-        
-        # 暂停标题
-        pause_title = self.title_font.render("游戏暂停", True, YELLOW)
-        if pause_title:
-            title_rect = pause_title.get_rect(center=(SCREEN_WIDTH//2, 150))
-            self.screen.blit(pause_title, title_rect)
-        
-        # 暂停提示
-        pause_text = self.font.render("游戏已暂停", True, WHITE)
-        if pause_text:
-            text_rect = pause_text.get_rect(center=(SCREEN_WIDTH//2, 220))
-            self.screen.blit(pause_text, text_rect)
-        
-        # 绘制按钮
-        self.resume_button.draw(self.screen)
-        self.pause_menu_button.draw(self.screen)
-        
-        # 操作提示
-        hint_text = self.instructions_font.render("按ESC键继续游戏", True, LIGHT_GRAY)
-        if hint_text:
-            hint_rect = hint_text.get_rect(center=(SCREEN_WIDTH//2, 500))
-            self.screen.blit(hint_text, hint_rect)
+        self.pause_screen.draw(self.screen)
 
-    def update_playing(self):
-        # 更新移动平台
-        for platform in self.platforms: 
-            platform.update()
-        
-        # 更新玩家并检查碰撞
-        result = self.player.update(self.platforms, self.spikes, SCREEN_WIDTH, SCREEN_HEIGHT)
+    def update_playing(self, keys=None):
+        # 按帧预算调整雪花数量（雪花在帧准备线程中更新）
+        self.snowfall.adapt(self.governor)
+        
+        # 更新移动平台、礼物动画和火花
+        self.entities.update_movers()
+        self.entities.animate_gems()
+        self.bursts.update()
+        
+        # 更新玩家并检查碰撞（按键同时记入本局录像）
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        self.recorder.record(keys)
+        # 落点预览按本帧开始时的玩家状态预测
+        self.jump_preview.update(self.player, self.entities, keys)
+        result = self.player.update(self.entities, SCREEN_WIDTH, SCREEN_HEIGHT, keys)
         
         if result == "fallen" or result == "spike_hit":
+            self.telemetry.death(result, *self.player.rect.center)
             self.lives -= 1
             if self.lives <= 0:
                 self.state = GAME_OVER
+                self.finish_run(False)
             else:
-                # 使用保存的出生点复活
-                self.player.rect.x = self.birth_point[0]
-                self.player.rect.y = self.birth_point[1]
-                self.player.vel_y = 0
-                self.player.on_moving_platform = None
-                self.player.platform_velocity_x = 0
-        
-        # 检查宝石收集
-        gems_hit = pygame.sprite.spritecollide(self.player, self.gems, False)
-        for gem in gems_hit:
-            if not gem.collected:
-                gem.collected = True
-                self.gems_collected += 1
-                
-                # 如果收集了所有宝石，打开大门
-                if self.gems_collected >= self.total_gems and self.door:
-                    self.door.open()
+                # 使用关卡快照复活：玩家回到出生点并重置跳跃状态，
+                # 移动平台回到初始位置，已收集的礼物保留
+                self.level_start.restore_player(self.player)
+                self.level_start.restore_movers(self.entities)
+        
+        # 检查宝石收集（已收集的礼物不再参与检测）
+        collected = self.entities.collect_gems(self.player.rect)
+        if collected:
+            self.gems_collected += len(collected)
+            for i in collected:
+                self.telemetry.emit(EVENT_GEM, *self.player.rect.center)
+                self.bursts.spawn(self.entities.x[i] + self.entities.w[i] // 2,
+                                  self.entities.y[i] + self.entities.h[i] // 2)
+            
+            # 如果收集了所有宝石，打开大门
+            if self.gems_collected >= self.total_gems and self.door:
+                self.door.open()
+                self.telemetry.emit(EVENT_DOOR_OPEN, *self.door.rect.center)
         
         # 检查是否到达大门
         if self.door and self.door.is_open and self.player.rect.colliderect(self.door.rect):
             self.state = WIN_SCREEN
-            # 检查是否到达大门
+            self.telemetry.win(*self.player.rect.center)
+            self.finish_run(True)
+            # 在后台提前构建下一关，点击“下一关”时直接换入
+            if self.current_level < level_count():
+                self.preload_level(self.current_level + 1)
             # 播放胜利音效
             self.play_victory_sound()
+        
+        # 推进帧计数并按间隔记录玩家位置
+        self.telemetry.tick(self.player)
     
     def run(self):
         running = True
         while running:
+            if self.memprof:
+                self.memprof.frame(self.state)
             for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+                if not self.handle_event(event):
                     running = False
-                
-                # ESC键处理
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        if self.state == PLAYING:
-                            self.state = PAUSED
-                        elif self.state == PAUSED:
-                            self.state = PLAYING
-
-                # 处理菜单状态的事件
-                if self.state == MENU:
-                    self.start_button.update()
-                    self.instructions_button.update()
-                    self.exit_button.update()
-                    
-                    if self.start_button.is_clicked(event):
-                        self.state = LEVEL_SELECT
-                    elif self.instructions_button.is_clicked(event):
-                        self.state = INSTRUCTIONS
-                    elif self.exit_button.is_clicked(event):
-                        running = False
-                
-                # 处理关卡选择状态的事件
-                elif self.state == LEVEL_SELECT:
-                    self.level1_button.update()
-                    self.level2_button.update()
-                    self.back_button.update()
-                    
-                    if self.level1_button.is_clicked(event):
-                        self.current_level = 1
-                        self.lives = 3
-                        self.load_level(self.current_level)
-                        self.state = PLAYING
-                    elif self.level2_button.is_clicked(event):
-                        self.current_level = 2
-                        self.lives = 3
-                        self.load_level(self.current_level)
-                        self.state = PLAYING
-                    elif self.back_button.is_clicked(event):
-                        self.state = MENU
-                
-                # 处理游戏说明状态的事件
-                elif self.state == INSTRUCTIONS:
-                    self.instructions_back_button.update()
-                    
-                    if self.instructions_back_button.is_clicked(event):
-                        self.state = MENU
-                
+            self.step()
+        
+        self.close()
+        sys.exit()
+    
+    def handle_event(self, event):
+        """处理一个事件，返回 False 表示退出游戏"""
+        running = True
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == MUSIC_END:
+            self.music.on_music_end()
 
-                # 新增：处理暂停状态的事件
+        # ESC键处理
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F11:
+                # 切换全屏（无需重新加载资源）
+                toggle_fullscreen()
+            elif event.key == pygame.K_F3:
+                self.jump_preview.toggle()
+            elif event.key == pygame.K_ESCAPE:
+                if self.state == PLAYING:
+                    self.state = PAUSED
                 elif self.state == PAUSED:
-                    self.resume_button.update()
-                    self.pause_menu_button.update()
-                    
-                    if self.resume_button.is_clicked(event):
-                        self.stop_victory_sound()  # 停止音效
-                        self.victory_sound_played = False  # 重置状态
-                        self.lives = 3
-                        self.load_level(self.current_level)
-                        self.state = PLAYING
-                    elif self.pause_menu_button.is_clicked(event):
-                        self.stop_victory_sound()  # 停止音效
-                        self.victory_sound_played = False  # 重置状态
-                        self.state = MENU
+                    self.state = PLAYING
 
-                        # 检查下一关按钮点击
-                    if hasattr(self, 'next_level_button') and self.current_level < 2:
-                        self.next_level_button.update()
-                        if self.next_level_button.is_clicked(event):
-                            self.stop_victory_sound()  # 停止音效
-                            self.victory_sound_played = False  # 重置状态
-                            self.current_level += 1
-                            self.lives = 3
-                            self.load_level(self.current_level)
-                            self.state = PLAYING
+        # 处理菜单状态的事件
+        if self.state == MENU:
+            self.menu_screen.update()
+            action = self.menu_screen.clicked(event)
+            if action == "start":
+                self.state = LEVEL_SELECT
+            elif action == "instructions":
+                self.state = INSTRUCTIONS
+            elif action == "exit":
+                running = False
 
-                # 处理游戏胜利状态的事件
-                elif self.state == WIN_SCREEN:
-                    self.restart_button.update()
-                    self.menu_button.update()
-                    
-                    if self.restart_button.is_clicked(event):
-                        self.lives = 3
-                        self.load_level(self.current_level)
-                        self.state = PLAYING
-                    elif self.menu_button.is_clicked(event):
-                        self.state = MENU
-                    
-                    # 检查下一关按钮点击
-                    if hasattr(self, 'next_level_button') and self.current_level < 2:
-                        self.next_level_button.update()
-                        if self.next_level_button.is_clicked(event):
-                            self.current_level += 1
-                            self.lives = 3
-                            self.load_level(self.current_level)
-                            self.state = PLAYING
-                
-                # 处理游戏结束状态的事件
-                elif self.state == GAME_OVER:
-                    self.restart_button.update()
-                    self.menu_button.update()
-                    
-                    if self.restart_button.is_clicked(event):
-                        self.lives = 3
-                        self.load_level(self.current_level)
-                        self.state = PLAYING
-                    elif self.menu_button.is_clicked(event):
-                        self.state = MENU
-            
-            # 更新游戏状态
-            if self.state == PLAYING:
-                self.update_playing()
-            
-            # 绘制当前状态的界面
-            if self.state == MENU:
-                self.draw_menu()
-            elif self.state == LEVEL_SELECT:
-                self.draw_level_select()
-            elif self.state == INSTRUCTIONS:
-                self.draw_instructions()
-            elif self.state == PLAYING:
-                self.draw_playing()
-            elif self.state == PAUSED:
-                self.draw_playing()  # 先绘制游戏画面
-                self.draw_pause_screen()  # 再绘制暂停界面
-            elif self.state == WIN_SCREEN:
-                self.draw_win_screen()
-            elif self.state == GAME_OVER:
-                self.draw_game_over()
-            pygame.display.flip()
-            self.clock.tick(FPS)
-        
-        pygame.quit()
-        sys.exit()
\ No newline at end of file
+        # 处理关卡选择状态的事件
+        elif self.state == LEVEL_SELECT:
+            self.level_select_screen.update()
+
+            # 悬停在关卡按钮上时在后台提前构建该关卡
+            level_num = self.hovered_level()
+            if level_num is not None:
+                self.preload_level(level_num)
+
+            action = self.level_select_screen.clicked(event)
+            if action in self.level_buttons:
+                self.restart_level(action)
+                self.state = PLAYING
+            elif action == "prev_page":
+                self.show_level_page(self.level_page - 1)
+            elif action == "next_page":
+                self.show_level_page(self.level_page + 1)
+            elif action == "back":
+                self.state = MENU
+
+        # 处理游戏说明状态的事件
+        elif self.state == INSTRUCTIONS:
+            self.instructions_screen.update()
+            if self.instructions_screen.clicked(event) == "back":
+                self.state = MENU
+
+        # 处理暂停状态的事件
+        elif self.state == PAUSED:
+            self.pause_screen.update()
+            action = self.pause_screen.clicked(event)
+            if action == "resume":
+                self.stop_victory_sound()  # 停止音效
+                self.victory_sound_played = False  # 重置状态
+                self.restart_level(self.current_level)
+                self.state = PLAYING
+            elif action == "menu":
+                self.stop_victory_sound()  # 停止音效
+                self.victory_sound_played = False  # 重置状态
+                self.state = MENU
+
+        # 处理游戏胜利状态的事件
+        elif self.state == WIN_SCREEN:
+            screen = self.current_win_screen()
+            screen.update()
+            action = screen.clicked(event)
+            if action == "restart":
+                self.restart_level(self.current_level)
+                self.state = PLAYING
+            elif action == "menu":
+                self.state = MENU
+            elif action == "next":
+                self.restart_level(self.current_level + 1)
+                self.state = PLAYING
+
+        # 处理游戏结束状态的事件
+        elif self.state == GAME_OVER:
+            self.game_over_screen.update()
+            action = self.game_over_screen.clicked(event)
+            if action == "restart":
+                self.restart_level(self.current_level)
+                self.state = PLAYING
+            elif action == "menu":
+                self.state = MENU
+        return running
+    
+    def step(self, keys=None, paced=True):
+        """
+        游戏循环中事件处理之后的一帧：热重载检查、逻辑更新、绘制和呈现
+        keys 代替 pygame.key.get_pressed()（脚本输入）；paced=False 时不等待帧率、
+        也不跳过绘制（基准测试按最快速度运行每一帧）
+        """
+        # 开发模式下检查关卡文件是否修改
+        if self.level_watcher:
+            self.level_watcher.poll(self)
+        
+        # 更新游戏状态（逻辑更新从不跳过）
+        if self.state == PLAYING:
+            self.update_playing(keys)
+        
+        self.governor.set_state(self.state)
+        self.music.set_state(self.state, self.current_level)
+        self.music.update(self.clock.get_time())
+        
+        # 上一帧超时则跳过本帧绘制
+        if paced and not self.governor.should_render():
+            self.frame_prep.submit(self.state)
+            self.governor.tick()
+            self.frame_prep.wait()
+            return
+        
+        # 绘制当前状态的界面
+        self.draw()
+        # 呈现本帧的同时在工作线程中准备下一帧
+        self.frame_prep.submit(self.state)
+        pygame.display.flip()
+        if paced:
+            self.governor.tick()
+        self.frame_prep.wait()
+    
+    def draw(self):
+        """按当前状态绘制界面"""
+        if self.state == MENU:
+            self.draw_menu()
+        elif self.state == LEVEL_SELECT:
+            self.draw_level_select()
+        elif self.state == INSTRUCTIONS:
+            self.draw_instructions()
+        elif self.state == PLAYING:
+            self.draw_playing()
+        elif self.state == PAUSED:
+            self.draw_playing()  # 先绘制游戏画面
+            self.draw_pause_screen()  # 再绘制暂停界面
+        elif self.state == WIN_SCREEN:
+            self.draw_win_screen()
+        elif self.state == GAME_OVER:
+            self.draw_game_over()
+    
+    def close(self):
+        """退出：写完剩余的游戏数据和成绩，停止后台线程和音频"""
+        self.telemetry.close()
+        self.music.stop()
+        self.frame_prep.close()
+        self.preloader.close()
+        self.thumbnails.close()
+        self.records.close()
+        if self.memprof:
+            self.memprof.frame(None)
+            print(self.memprof.report().format())
+            self.memprof.stop()
+        reset_fonts()
+        pygame.quit()
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+热力图工具：流式读取 telemetry 记录的 JSONL 文件，按关卡统计死亡位置和玩家路径，
+在多进程中分别汇总后合并，最后叠加在关卡布局上输出 PNG
+每个关卡只占两张 SCREEN_WIDTH x SCREEN_HEIGHT 的计数数组，内存占用与输入大小无关
+
+用法：python heatmap.py telemetry/*.jsonl [-o heatmaps] [-j 进程数]
+需要 NumPy
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from multiprocessing import Pool
+import numpy as np
+from constants import *
+
+BATCH_SIZE = 65536       # 每批累加的坐标数量，决定解析时的内存上限
+BLUR_RADIUS = 6          # 渲染前的平滑半径（像素）
+
+
+class LevelHistograms:
+    """一个关卡的死亡位置和路径计数（uint32 二维数组，行为 y，列为 x）"""
+    def __init__(self):
+        self.deaths = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint32)
+        self.paths = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint32)
+
+    def merge(self, other):
+        self.deaths += other.deaths
+        self.paths += other.paths
+
+
+class Batch:
+    """按关卡缓存待累加的坐标，满 BATCH_SIZE 后一次性写入直方图"""
+    def __init__(self, target):
+        self.target = target
+        self.x = np.empty(BATCH_SIZE, dtype=np.int32)
+        self.y = np.empty(BATCH_SIZE, dtype=np.int32)
+        self.n = 0
+
+    def add(self, x, y):
+        self.x[self.n] = x
+        self.y[self.n] = y
+        self.n += 1
+        if self.n == BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.n:
+            # 掉出屏幕的坐标归到边缘像素
+            x = np.clip(self.x[:self.n], 0, SCREEN_WIDTH - 1)
+            y = np.clip(self.y[:self.n], 0, SCREEN_HEIGHT - 1)
+            np.add.at(self.target, (y, x), 1)
+            self.n = 0
+
+
+def aggregate_files(paths):
+    """工作进程：流式处理一组文件，返回 {关卡号: LevelHistograms}"""
+    levels = {}
+    batches = {}
+
+    def batch(level, kind):
+        key = (level, kind)
+        if key not in batches:
+            hist = levels.setdefault(level, LevelHistograms())
+            batches[key] = Batch(hist.deaths if kind == "death" else hist.paths)
+        return batches[key]
+
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue    # 跳过写了一半的行
+                    kind = event.get("event")
+                    if kind == "death" or kind == "position":
+                        batch(event["level"], kind).add(event["x"], event["y"])
+        except OSError as e:
+            print(f"无法读取 {path}: {e}", file=sys.stderr)
+
+    for b in batches.values():
+        b.flush()
+    return levels
+
+
+def aggregate(paths, jobs):
+    """把文件分成 jobs 组并行汇总，部分结果逐个合并（同一时刻最多保留一份部分结果）"""
+    groups = [paths[i::jobs] for i in range(jobs) if paths[i::jobs]]
+    totals = {}
+    with Pool(len(groups)) as pool:
+        for partial in pool.imap_unordered(aggregate_files, groups):
+            for level, hist in partial.items():
+                if level in totals:
+                    totals[level].merge(hist)
+                else:
+                    totals[level] = hist
+    return totals
+
+
+def box_blur(data, radius):
+    """可分离的方框模糊（累加和实现），使稀疏的点在图上可见"""
+    if radius <= 0:
+        return data
+    size = radius * 2 + 1
+    for axis in (0, 1):
+        padded = np.pad(data, [(radius + 1, radius) if a == axis else (0, 0) for a in (0, 1)], mode="edge")
+        csum = np.cumsum(padded, axis=axis)
+        if axis == 0:
+            data = (csum[size:] - csum[:-size]) / size
+        else:
+            data = (csum[:, size:] - csum[:, :-size]) / size
+    return data
+
+
+def colorize(counts):
+    """计数 -> RGBA 数组（黑透明 → 红 → 黄 → 白），使用对数刻度"""
+    heat = np.log1p(box_blur(counts.astype(np.float64), BLUR_RADIUS))
+    peak = heat.max()
+    if peak > 0:
+        heat /= peak
+    rgba = np.zeros(heat.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = np.clip(heat * 3, 0, 1) * 255
+    rgba[..., 1] = np.clip(heat * 3 - 1, 0, 1) * 255
+    rgba[..., 2] = np.clip(heat * 3 - 2, 0, 1) * 255
+    rgba[..., 3] = np.clip(heat * 2, 0, 0.85) * 255
+    return rgba
+
+
+def draw_level(level_num):
+    """绘制关卡布局（平台、尖刺、礼物、大门）作为热力图的底图"""
+    import pygame
+    from level_pack import level_definition
+
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface.fill((40, 50, 70))
+    level = level_definition(level_num)
+    if level is None:
+        return surface
+    for x, y, w, h, color, movable, vertical in level["platforms"]:
+        pygame.draw.rect(surface, ORANGE if movable else color, (x, y, w, h))
+        if movable:
+            # 移动范围
+            reach = pygame.Rect(x, y, w, h).inflate(0, 160) if vertical else pygame.Rect(x, y, w, h).inflate(160, 0)
+            pygame.draw.rect(surface, ORANGE, reach, 1)
+    for x, y, count in level["spikes"]:
+        for i in range(count):
+            sx = x + i * 40
+            pygame.draw.polygon(surface, GLACIER_BLUE, [(sx, y + 35), (sx + 12, y), (sx + 25, y + 35)])
+    for x, y in level["gems"]:
+        pygame.draw.circle(surface, YELLOW, (x, y), 8, 2)
+    pygame.draw.rect(surface, PURPLE, level["door"], 3)
+    return surface
+
+
+def render(level_num, counts, path):
+    import pygame
+
+    surface = draw_level(level_num)
+    rgba = colorize(counts)
+    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    # surfarray 的坐标顺序是 (x, y)
+    pygame.surfarray.pixels3d(overlay)[...] = rgba[..., :3].transpose(1, 0, 2)
+    pygame.surfarray.pixels_alpha(overlay)[...] = rgba[..., 3].T
+    surface.blit(overlay, (0, 0))
+    pygame.image.save(surface, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="根据游戏数据生成死亡位置和玩家路径热力图")
+    parser.add_argument("inputs", nargs="+", help="JSONL 文件或通配符，例如 telemetry/*.jsonl")
+    parser.add_argument("-o", "--output", default="heatmaps", help="输出目录")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    args = parser.parse_args(argv)
+
+    paths = sorted({p for pattern in args.inputs for p in glob.glob(pattern)})
+    if not paths:
+        print("没有找到输入文件")
+        return 1
+
+    totals = aggregate(paths, max(1, min(args.jobs, len(paths))))
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.makedirs(args.output, exist_ok=True)
+    for level_num, hist in sorted(totals.items()):
+        for name, counts in (("deaths", hist.deaths), ("paths", hist.paths)):
+            path = os.path.join(args.output, f"level{level_num}-{name}.png")
+            render(level_num, counts, path)
+            print(f"关卡 {level_num} {name}: {int(counts.sum())} 个点 -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
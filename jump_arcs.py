@@ -0,0 +1,204 @@
+"""
+跳跃轨迹查找表：按 physics.py 的定点物理参数，预先计算起跳后每一帧相对起跳点的位移
+按住跳跃键的帧数 0..JUMP_MAX_HOLD 各一张表，水平方向每帧固定移动 PLAYER_SPEED，
+因此任意（按住帧数, 左/不动/右）的轨迹都只是查表，与 Player.update 在空中的结果逐位一致
+- 游戏中：按 F3 显示落点预览（小跳和最大跳两条轨迹，与附近平台求交）
+- AI 和关卡工具：get_jump_arcs() 返回共享的 JumpArcs，可查询顶点高度、可达范围和落点
+表只描述空中无碰撞的运动：移动平台按当前位置计算，起跳时站在垂直移动平台上的额外位移不计入
+"""
+from array import array
+import pygame
+from constants import *
+from physics import (FP_SHIFT, GRAVITY, MAX_FALL_SPEED, PLAYER_SPEED,
+                     JUMP_MIN_SPEED, JUMP_MAX_SPEED, JUMP_MAX_HOLD)
+
+# 落点预测结果
+LANDED = "landed"       # 落在平台上
+BUMPED = "bumped"       # 上升时撞到平台底部
+FALLEN = "fallen"       # 掉出屏幕
+
+_arcs = None
+
+
+class JumpPrediction:
+    """一次跳跃的预测：outcome、经过的帧数、接触的平台索引（没有时为 -1）和此时玩家左上角的像素坐标"""
+    __slots__ = ("outcome", "frames", "platform", "x", "y")
+
+    def __init__(self, outcome, frames, platform, x, y):
+        self.outcome = outcome
+        self.frames = frames
+        self.platform = platform
+        self.x = x
+        self.y = y
+
+
+class JumpArcs:
+    """
+    跳跃轨迹表
+    dy[hold][t]：按住 hold 帧后松开，起跳后第 t+1 帧结束时的竖直位移（定点数，向下为正）
+    vy[hold][t]：该帧的竖直移动量（小于 0 为上升，对应 Player.update 中的 vertical_move）
+    每张表一直计算到比起跳点低两个屏幕高度为止，足够从屏幕顶部落到底部之外
+    """
+    def __init__(self, max_hold=JUMP_MAX_HOLD):
+        self.max_hold = max_hold
+        self.dy = []
+        self.vy = []
+        self.apex = []          # 每张表的 (顶点所在帧, 上升高度像素)
+        limit = (SCREEN_HEIGHT * 2) << FP_SHIFT
+        for hold in range(max_hold + 1):
+            dy, vy = array("i"), array("i")
+            self._simulate(hold, dy, vy, limit)
+            self.dy.append(dy)
+            self.vy.append(vy)
+            top = min(range(len(dy)), key=dy.__getitem__)
+            self.apex.append((top + 1, -(dy[top] >> FP_SHIFT)))
+        self.frames = min(len(dy) for dy in self.dy)
+
+    def _simulate(self, hold, dy, vy, limit):
+        # 与 Player.update 的跳跃部分相同：第一帧起跳，之后按住 hold 帧逐渐加速，然后松开
+        vel = JUMP_MIN_SPEED
+        held = 0
+        jumping = True
+        y = 0
+        t = 0
+        while y < limit:
+            if t > 0:
+                if t <= hold and jumping:
+                    if held < self.max_hold:
+                        held += 1
+                        target = (JUMP_MIN_SPEED + (JUMP_MAX_SPEED - JUMP_MIN_SPEED)
+                                  * held // self.max_hold)
+                        if vel > target:
+                            vel = target
+                else:
+                    jumping = False
+            vel += GRAVITY
+            if vel > MAX_FALL_SPEED:
+                vel = MAX_FALL_SPEED
+            y += vel
+            dy.append(y)
+            vy.append(vel)
+            t += 1
+
+    def offset(self, hold, direction, t):
+        """起跳后第 t 帧（从 1 开始）的定点位移 (dx, dy)；direction 为 -1 / 0 / 1"""
+        return direction * PLAYER_SPEED * t, self.dy[hold][t - 1]
+
+    def height(self, hold):
+        """按住 hold 帧时的最大上升高度（像素）"""
+        return self.apex[hold][1]
+
+    def reach(self, hold, rise):
+        """
+        跳到比起跳点高 rise 像素（负数表示更低）的位置时，下落经过该高度所需的帧数
+        达不到该高度时返回 None；水平距离为 帧数 * PLAYER_SPEED
+        """
+        target = -(rise << FP_SHIFT)
+        dy = self.dy[hold]
+        for t in range(self.apex[hold][0], len(dy)):
+            if dy[t] >= target:
+                return t + 1
+        return None
+
+    def min_hold_for(self, rise):
+        """能跳到 rise 像素高度所需的最少按住帧数，跳不到时返回 None"""
+        for hold in range(self.max_hold + 1):
+            if self.apex[hold][1] >= rise:
+                return hold
+        return None
+
+    def predict(self, entities, fx, fy, width, height, hold, direction, screen_height=SCREEN_HEIGHT):
+        """
+        从定点坐标 (fx, fy)（玩家左上角，站在地面上）起跳，按表逐帧检查与附近平台的接触
+        碰撞判定与 Player.update 相同；候选平台只查询一次（entities.platforms_near）
+        返回 JumpPrediction
+        """
+        dy, vy = self.dy[hold], self.vy[hold]
+        step = direction * PLAYER_SPEED
+        frames = len(dy)
+        x0 = fx >> FP_SHIFT
+        x1 = (fx + step * frames) >> FP_SHIFT
+        candidates = entities.platforms_near(min(x0, x1), max(x0, x1) + width)
+        px, py, pw, ph = entities.x, entities.y, entities.w, entities.h
+        for t in range(frames):
+            left = (fx + step * (t + 1)) >> FP_SHIFT
+            right = left + width
+            top = (fy + dy[t]) >> FP_SHIFT
+            bottom = top + height
+            if vy[t] < 0:
+                for i in candidates:
+                    platform_bottom = py[i] + ph[i]
+                    if (platform_bottom - 10 <= top <= platform_bottom
+                            and right > px[i] + 5 and left < px[i] + pw[i] - 5):
+                        return JumpPrediction(BUMPED, t + 1, i, left, platform_bottom)
+            else:
+                for i in candidates:
+                    platform_top = py[i]
+                    if (platform_top - 5 <= bottom <= platform_top + 15
+                            and right > px[i] + 5 and left < px[i] + pw[i] - 5):
+                        return JumpPrediction(LANDED, t + 1, i, left, platform_top - height)
+            if top > screen_height:
+                return JumpPrediction(FALLEN, t + 1, -1, left, top)
+        return JumpPrediction(FALLEN, frames, -1, left, top)
+
+    def points(self, fx, fy, hold, direction, frames, step=1):
+        """轨迹上每隔 step 帧的像素坐标（玩家左上角），共 frames 帧"""
+        dy = self.dy[hold]
+        speed = direction * PLAYER_SPEED
+        return [((fx + speed * (t + 1)) >> FP_SHIFT, (fy + dy[t]) >> FP_SHIFT)
+                for t in range(step - 1, min(frames, len(dy)), step)]
+
+
+def get_jump_arcs():
+    """共享的跳跃轨迹表（第一次使用时计算）"""
+    global _arcs
+    if _arcs is None:
+        _arcs = JumpArcs()
+    return _arcs
+
+
+class JumpPreview:
+    """
+    游戏中的落点预览：玩家站在地面上时，按当前水平输入显示小跳和最大跳的轨迹和落点
+    轨迹点使用预先生成的小圆点图片，一次 blits 绘制
+    """
+    ARCS = ((0, LIGHT_BLUE), (JUMP_MAX_HOLD, YELLOW))
+
+    def __init__(self, arcs=None, enabled=JUMP_PREVIEW):
+        self.arcs = arcs or get_jump_arcs()
+        self.enabled = enabled
+        self.dots = {}
+        self.markers = {}
+        for _, color in self.ARCS:
+            dot = pygame.Surface((4, 4), pygame.SRCALPHA)
+            pygame.draw.circle(dot, color, (2, 2), 2)
+            self.dots[color] = dot.convert_alpha()
+            marker = pygame.Surface((30, 4))
+            marker.fill(color)
+            self.markers[color] = marker.convert()
+        self.blits = []
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def update(self, player, entities, keys):
+        """每帧调用：只在开启且站在地面上时重新预测"""
+        self.blits = []
+        if not self.enabled or not player.on_ground:
+            return
+        # 与 Player.update 相同：同时按下左右键时向右
+        direction = 1 if keys[pygame.K_RIGHT] else (-1 if keys[pygame.K_LEFT] else 0)
+        width, height = player.rect.size
+        for hold, color in self.ARCS:
+            result = self.arcs.predict(entities, player.fx, player.fy, width, height, hold, direction)
+            dot = self.dots[color]
+            for x, y in self.arcs.points(player.fx, player.fy, hold, direction, result.frames, 2):
+                self.blits.append((dot, (x + width // 2 - 2, y + height - 2)))
+            if result.outcome == LANDED:
+                marker = self.markers[color]
+                self.blits.append((marker, (result.x + width // 2 - 15, result.y + height)))
+
+    def draw(self, target):
+        if self.blits:
+            target.blits(self.blits, doreturn=False)
+
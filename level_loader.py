@@ -0,0 +1,124 @@
+"""
+关卡构建与预加载模块
+build_level 按关卡包（level_pack.py，直接读取映射的数组）或 levels.py 的数据
+创建一整套关卡对象（实体存储、渲染列表、大门、玩家），
+不修改 Game，因此可以在后台线程中执行；Game.install_level 只需把结果换入
+LevelPreloader 在下一关可以预知时（胜利界面、关卡选择按钮悬停）提前在后台构建
+"""
+from concurrent.futures import ThreadPoolExecutor
+from constants import *
+from entities import Player, Door
+from entity_store import EntityStore
+from render_list import RenderList, LAYER_DOOR, LAYER_PLAYER, DOOR_KEY, PLAYER_KEY
+from level_pack import get_pack, has_level, level_definition, SPIKE_FIELDS, GEM_FIELDS
+
+
+class BuiltLevel:
+    """构建好的关卡：换入 Game 后即可开始游戏（只能使用一次）"""
+    __slots__ = ("level_num", "render_list", "entities", "door", "player",
+                 "birth_point", "total_gems")
+
+    def __init__(self, level_num, render_list, entities):
+        self.level_num = level_num
+        self.render_list = render_list
+        self.entities = entities
+        self.door = None
+        self.player = None
+        self.birth_point = (100, SCREEN_HEIGHT - 150)
+        self.total_gems = 0
+
+
+def build_level(level_num, images_from=None):
+    """
+    创建关卡中的所有对象
+    images_from: 可选的 EntityStore，共享其中已生成的平台/礼物/尖刺图片
+    """
+    render_list = RenderList()
+    store = EntityStore(render_list)
+    if images_from is not None:
+        store.share_images(images_from)
+    built = BuiltLevel(level_num, render_list, store)
+
+    # 优先从关卡包的数组直接创建实体
+    pack = get_pack()
+    packed = pack.level(level_num) if pack is not None else None
+    level = None if packed is not None else level_definition(level_num)
+    if packed is not None:
+        for args in packed.platform_args():
+            store.add_platform(*args)
+        spikes = packed.spikes
+        for k in range(0, len(spikes), SPIKE_FIELDS):
+            x, y = spikes[k], spikes[k + 1]
+            for i in range(spikes[k + 2]):
+                store.add_spike(x + i * 40, y)
+        gems = packed.gems
+        for k in range(0, len(gems), GEM_FIELDS):
+            store.add_gem(gems[k], gems[k + 1])
+        built.total_gems = len(gems) // GEM_FIELDS
+        built.birth_point = packed.birth_point
+        built.player = Player(*built.birth_point)
+        built.door = Door(*packed.door)
+    elif level:
+        built.total_gems = len(level["gems"])
+        for platform in level["platforms"]:
+            store.add_platform(*platform)
+        for x, y, count in level["spikes"]:
+            for i in range(count):
+                store.add_spike(x + i * 40, y)
+        for x, y in level["gems"]:
+            store.add_gem(x, y)
+
+        # 设置出生点并创建玩家
+        built.birth_point = level["birth_point"]
+        built.player = Player(*built.birth_point)
+
+        # 大门
+        built.door = Door(*level["door"])
+
+    # 玩家和大门登记到渲染列表（矩形直接共享，移动时无需同步）
+    if built.door:
+        render_list.add(DOOR_KEY, LAYER_DOOR, built.door.image, built.door.rect)
+    if built.player:
+        render_list.add(PLAYER_KEY, LAYER_PLAYER, built.player.image, built.player.rect, dynamic=True)
+    return built
+
+
+class LevelPreloader:
+    """
+    后台关卡构建（单个工作线程）
+    - request(n)：开始在后台构建关卡 n（已在构建或已完成时不重复提交）
+    - take(n)：取出构建结果；还没完成时等待，失败或未请求时返回 None
+    最多保留 max_ready 个结果，较早的请求被丢弃
+    """
+    def __init__(self, max_ready=2):
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preload")
+        self.max_ready = max_ready
+        self._futures = {}
+
+    def request(self, level_num, images_from=None):
+        if level_num in self._futures or not has_level(level_num):
+            return
+        while len(self._futures) >= self.max_ready:
+            oldest = next(iter(self._futures))
+            self._futures.pop(oldest).cancel()
+        self._futures[level_num] = self.pool.submit(build_level, level_num, images_from)
+
+    def take(self, level_num):
+        future = self._futures.pop(level_num, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"后台加载关卡 {level_num} 失败: {e}")
+            return None
+
+    def clear(self):
+        """关卡数据变化（热重载）后丢弃已构建的结果"""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+
+    def close(self):
+        self.clear()
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,337 @@
+"""
+关卡包：把 levels.py 中的所有关卡打包为一个二进制文件（LEVEL_PACK），
+运行时用 mmap 打开，按文件头的索引直接定位到任意关卡，平台/尖刺/礼物数组是文件内容上的
+memoryview（不复制、不解析），build_level 直接按数组创建实体
+运行时的关卡数据都从这里读取（level_count / has_level / level_music / describe_level /
+level_definition）：关卡包可用时不导入 levels.py；关卡包不存在、已损坏或比 levels.py 旧时
+（修改关卡后没有重新打包、开发模式热重载）自动退回读取 levels.py
+
+文件格式（小端序，各段按 4 字节对齐）：
+    文件头    FILE_HEADER：魔数、版本、关卡数、levels.py 的修改时间
+    索引      INDEX_ENTRY x 关卡数：关卡号、记录偏移、记录长度
+    关卡记录  LEVEL_HEADER：平台/尖刺/礼物数量、出生点、大门、元数据长度
+              平台 x 数量：x, y, 宽, 高, 颜色 0xRRGGBB, 标志（1 移动 / 2 垂直）  int32 x 6
+              尖刺 x 数量：x, y, 数量                                           int32 x 3
+              礼物 x 数量：中心 x, 中心 y                                        int32 x 2
+              元数据：UTF-8 字符串，以 \\0 分隔：难度说明、音乐文件...
+
+用法：python level_pack.py            （生成 levels.pack 并校验）
+"""
+import argparse
+import importlib.util
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from constants import *
+
+PACK_MAGIC = b"XLPK"
+PACK_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHd")
+INDEX_ENTRY = struct.Struct("<III")
+LEVEL_HEADER = struct.Struct("<4H6iI")
+
+PLATFORM_FIELDS = 6
+SPIKE_FIELDS = 3
+GEM_FIELDS = 2
+PLATFORM_MOVABLE = 1
+PLATFORM_VERTICAL = 2
+
+_pack = None
+_pack_loaded = False
+_pack_lock = threading.Lock()     # 后台预加载线程也会调用 get_pack
+_generation = 0                   # reset_pack 时加一，缓存关卡数据派生结果的模块用来判断是否过期
+
+
+def _align(size):
+    return (size + 3) & ~3
+
+
+def pack_color(color):
+    r, g, b = color[:3]
+    return (r << 16) | (g << 8) | b
+
+
+def unpack_color(value):
+    return ((value >> 16) & 255, (value >> 8) & 255, value & 255)
+
+
+def encode_level(level):
+    """把一个关卡定义（levels.py 的字典）编码为一条关卡记录"""
+    ints = array("i")
+    for x, y, width, height, color, movable, vertical in level["platforms"]:
+        ints.extend((x, y, width, height, pack_color(color),
+                     (PLATFORM_MOVABLE if movable else 0) | (PLATFORM_VERTICAL if vertical else 0)))
+    for x, y, count in level["spikes"]:
+        ints.extend((x, y, count))
+    for x, y in level["gems"]:
+        ints.extend((x, y))
+    if sys.byteorder != "little":
+        ints.byteswap()
+    meta = "\0".join((level.get("difficulty", ""),) + tuple(level.get("music", ()))).encode("utf-8")
+    header = LEVEL_HEADER.pack(len(level["platforms"]), len(level["spikes"]), len(level["gems"]), 0,
+                               *level["birth_point"], *level["door"], len(meta))
+    record = header + ints.tobytes() + meta
+    return record + bytes(_align(len(record)) - len(record))
+
+
+def write_pack(path, levels, source_mtime):
+    """把 {关卡号: 关卡定义} 写入关卡包"""
+    records = [(level_num, encode_level(levels[level_num])) for level_num in sorted(levels)]
+    offset = FILE_HEADER.size + INDEX_ENTRY.size * len(records)
+    index = []
+    for level_num, record in records:
+        index.append(INDEX_ENTRY.pack(level_num, offset, len(record)))
+        offset += len(record)
+    with open(path, "wb") as f:
+        f.write(FILE_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(records), source_mtime))
+        f.write(b"".join(index))
+        for _, record in records:
+            f.write(record)
+
+
+class PackedLevel:
+    """
+    关卡包中的一个关卡：platforms / spikes / gems 是 int32 的 memoryview（直接指向映射的文件），
+    按 PLATFORM_FIELDS / SPIKE_FIELDS / GEM_FIELDS 个字段一组
+    """
+    __slots__ = ("level_num", "platforms", "spikes", "gems", "birth_point", "door",
+                 "difficulty", "music")
+
+    def __init__(self, level_num, data, ints, offset):
+        self.level_num = level_num
+        (platform_count, spike_count, gem_count, _, birth_x, birth_y,
+         door_x, door_y, door_w, door_h, meta_size) = LEVEL_HEADER.unpack_from(data, offset)
+        self.birth_point = (birth_x, birth_y)
+        self.door = (door_x, door_y, door_w, door_h)
+        start = (offset + LEVEL_HEADER.size) // 4
+        end = start + platform_count * PLATFORM_FIELDS
+        self.platforms = ints[start:end]
+        start, end = end, end + spike_count * SPIKE_FIELDS
+        self.spikes = ints[start:end]
+        start, end = end, end + gem_count * GEM_FIELDS
+        self.gems = ints[start:end]
+        meta = bytes(data[end * 4:end * 4 + meta_size]).decode("utf-8").split("\0")
+        self.difficulty = meta[0]
+        self.music = tuple(meta[1:])
+
+    def movers(self):
+        """移动平台数量"""
+        p = self.platforms
+        return sum(1 for k in range(5, len(p), PLATFORM_FIELDS) if p[k] & PLATFORM_MOVABLE)
+
+    def platform_args(self):
+        """逐个平台返回 EntityStore.add_platform 的参数"""
+        p = self.platforms
+        for k in range(0, len(p), PLATFORM_FIELDS):
+            flags = p[k + 5]
+            yield (p[k], p[k + 1], p[k + 2], p[k + 3], unpack_color(p[k + 4]),
+                   bool(flags & PLATFORM_MOVABLE), bool(flags & PLATFORM_VERTICAL))
+
+    def to_dict(self):
+        """还原为 levels.py 中的关卡定义（校验和工具使用）"""
+        s, g = self.spikes, self.gems
+        return {
+            "difficulty": self.difficulty,
+            "platforms": list(self.platform_args()),
+            "spikes": [(s[k], s[k + 1], s[k + 2]) for k in range(0, len(s), SPIKE_FIELDS)],
+            "gems": [(g[k], g[k + 1]) for k in range(0, len(g), GEM_FIELDS)],
+            "birth_point": self.birth_point,
+            "door": self.door,
+            "music": self.music,
+        }
+
+
+class LevelPack:
+    """
+    只读关卡包：打开时只读取文件头和索引，level(n) 按偏移直接取出关卡记录
+    文件内容由操作系统按需换入，不读取用不到的关卡
+    """
+    def __init__(self, path=LEVEL_PACK):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, self.source_mtime = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} 不是版本 {PACK_VERSION} 的关卡包")
+        self.index = {}
+        for k in range(count):
+            level_num, offset, size = INDEX_ENTRY.unpack_from(
+                self._map, FILE_HEADER.size + k * INDEX_ENTRY.size)
+            self.index[level_num] = (offset, size)
+        if sys.byteorder == "little":
+            self._ints = memoryview(self._map).cast("i")
+        else:
+            # 大端序机器：复制一份并转换字节序（只在打开时进行一次）
+            self._ints = array("i", self._map[:len(self._map) // 4 * 4])
+            self._ints.byteswap()
+
+    def __contains__(self, level_num):
+        return level_num in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def level(self, level_num):
+        entry = self.index.get(level_num)
+        if entry is None:
+            return None
+        return PackedLevel(level_num, self._map, self._ints, entry[0])
+
+    def close(self):
+        if isinstance(self._ints, memoryview):
+            self._ints.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass    # 还有关卡数组在使用，映射在它们释放后由垃圾回收关闭
+
+
+def get_pack():
+    """
+    共享的关卡包：不存在、已损坏或比 levels.py 旧时返回 None（调用方改用 levels.py）
+    只在第一次调用时打开并检查，热重载后由 reset_pack 重新检查
+    """
+    with _pack_lock:
+        if not _pack_loaded:
+            _open_pack()
+        return _pack
+
+
+def _open_pack():
+    global _pack, _pack_loaded
+    _pack_loaded = True
+    if not os.path.exists(LEVEL_PACK):
+        return None
+    try:
+        pack = LevelPack(LEVEL_PACK)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"无法读取关卡包 ({e})，使用 levels.py")
+        return None
+    # 只比较修改时间，不导入 levels.py
+    try:
+        stale = os.stat(_source_path()).st_mtime > pack.source_mtime
+    except (OSError, TypeError):
+        stale = False
+    if stale:
+        print("levels.py 比关卡包更新，使用 levels.py（运行 python level_pack.py 重新打包）")
+        pack.close()
+        return None
+    _pack = pack
+
+
+def reset_pack():
+    """关卡数据变化（热重载）后调用：关闭关卡包，下次使用时重新检查"""
+    global _pack, _pack_loaded, _generation
+    with _pack_lock:
+        if _pack is not None:
+            _pack.close()
+        _pack = None
+        _pack_loaded = False
+        _generation += 1
+
+
+def generation():
+    """关卡数据的版本号：热重载（reset_pack）后变化"""
+    return _generation
+
+
+def _source_path():
+    """levels.py 的路径（不执行该模块）"""
+    spec = importlib.util.find_spec("levels")
+    return spec.origin if spec is not None else None
+
+
+def _levels():
+    # 只在关卡包不可用时导入
+    import levels
+    return levels
+
+
+def level_numbers():
+    """所有关卡号（升序）"""
+    pack = get_pack()
+    if pack is not None:
+        return sorted(pack.index)
+    return sorted(_levels().LEVELS)
+
+
+def level_count():
+    pack = get_pack()
+    if pack is not None:
+        return len(pack)
+    return _levels().level_count()
+
+
+def has_level(level_num):
+    pack = get_pack()
+    if pack is not None:
+        return level_num in pack
+    return _levels().get_level(level_num) is not None
+
+
+def level_definition(level_num):
+    """关卡定义（levels.py 中的字典形式），不存在时返回 None"""
+    pack = get_pack()
+    if pack is not None:
+        packed = pack.level(level_num)
+        return packed.to_dict() if packed is not None else None
+    return _levels().get_level(level_num)
+
+
+def level_music(level_num):
+    """关卡的背景音乐文件名"""
+    pack = get_pack()
+    if pack is not None:
+        packed = pack.level(level_num)
+        return packed.music if packed is not None else ()
+    level = _levels().get_level(level_num)
+    return tuple(level.get("music", ())) if level else ()
+
+
+def describe_level(level_num):
+    """关卡描述：数量从关卡数据统计，修改关卡后不会过时"""
+    pack = get_pack()
+    if pack is not None:
+        packed = pack.level(level_num)
+        if packed is None:
+            return ""
+        difficulty, gems = packed.difficulty, len(packed.gems) // GEM_FIELDS
+        spikes, movers = len(packed.spikes) // SPIKE_FIELDS, packed.movers()
+    else:
+        level = _levels().get_level(level_num)
+        if level is None:
+            return ""
+        difficulty, gems, spikes = level.get("difficulty", ""), len(level["gems"]), len(level["spikes"])
+        movers = sum(1 for platform in level["platforms"] if platform[5])
+    return f"关卡 {level_num}: {difficulty}，{gems}个礼物，{spikes}组尖刺，{movers}个移动平台"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把 levels.py 中的关卡打包为二进制关卡包")
+    parser.add_argument("-o", "--output", default=LEVEL_PACK, help="输出文件")
+    args = parser.parse_args()
+
+    import levels
+    write_pack(args.output, levels.LEVELS, os.stat(levels.__file__).st_mtime)
+    # 读回校验：每个关卡还原后与 levels.py 中的定义一致
+    pack = LevelPack(args.output)
+    for level_num, level in levels.LEVELS.items():
+        packed = pack.level(level_num).to_dict()
+        for key, value in packed.items():
+            expected = level.get(key, () if key == "music" else "")
+            if key in ("platforms", "spikes", "gems"):
+                expected = [tuple(item) for item in expected]
+            else:
+                expected = tuple(expected) if isinstance(expected, (list, tuple)) else expected
+            if value != expected:
+                raise SystemExit(f"关卡 {level_num} 的 {key} 打包后不一致")
+    pack.close()
+    print(f"已打包 {len(levels.LEVELS)} 个关卡 -> {args.output} ({os.path.getsize(args.output)} 字节)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+关卡热重载模块（开发模式）：监视 levels.py，保存后把修改增量应用到正在运行的关卡
+只增删发生变化的平台、尖刺和礼物，玩家位置和已收集的礼物保持不变
+"""
+import importlib
+import os
+from collections import defaultdict
+from constants import *
+from entities import Door
+from entity_store import KIND_GEM, FLAG_COLLECTED
+from render_list import LAYER_DOOR, DOOR_KEY
+from level_pack import reset_pack
+
+
+def definition_keys(level):
+    """把关卡定义展开为实体键列表（与 EntityStore.definition_key 的格式一致）"""
+    keys = [("platform",) + tuple(platform) for platform in level["platforms"]]
+    for x, y, count in level["spikes"]:
+        keys.extend(("spike", x + i * 40, y) for i in range(count))
+    keys.extend(("gem", x, y) for x, y in level["gems"])
+    return keys
+
+
+def live_keys(store):
+    """当前关卡中的实体：键 -> 索引列表（已移除的实体不计入）"""
+    live = defaultdict(list)
+    for i in range(len(store)):
+        if not store.is_removed(i):
+            live[store.definition_key(i)].append(i)
+    return live
+
+
+def add_entity(store, key):
+    kind = key[0]
+    if kind == "platform":
+        store.add_platform(*key[1:])
+    elif kind == "spike":
+        store.add_spike(key[1], key[2])
+    else:
+        store.add_gem(key[1], key[2])
+
+
+def apply_level_diff(game, level):
+    """
+    把新的关卡定义增量应用到游戏中，返回 (新增数量, 移除数量)
+    耗时与实体数量成正比，不重新创建未变化的实体
+    """
+    store = game.entities
+    live = live_keys(store)
+    wanted = defaultdict(int)
+    for key in definition_keys(level):
+        wanted[key] += 1
+
+    removed = 0
+    for key, indices in live.items():
+        for i in indices[wanted.get(key, 0):]:
+            store.remove(i)
+            removed += 1
+            if game.player and game.player.on_moving_platform == i:
+                game.player.on_moving_platform = None
+
+    added = 0
+    for key, count in wanted.items():
+        for _ in range(count - len(live.get(key, ()))):
+            add_entity(store, key)
+            added += 1
+
+    # 出生点和大门
+    game.birth_point = level["birth_point"]
+    door = tuple(level["door"])
+    if game.door is None or tuple(game.door.rect) != door:
+        was_open = game.door.is_open if game.door else False
+        game.door = Door(*door)
+        if was_open:
+            game.door.open()
+        game.render_list.add(DOOR_KEY, LAYER_DOOR, game.door.image, game.door.rect)
+
+    # 重新统计礼物：保留仍存在的已收集礼物
+    game.total_gems = len(level["gems"])
+    game.gems_collected = sum(1 for i in range(len(store))
+                              if store.kind[i] == KIND_GEM and not store.is_removed(i)
+                              and store.flags[i] & FLAG_COLLECTED)
+    if game.door:
+        if game.gems_collected >= game.total_gems:
+            game.door.open()
+        else:
+            game.door.close()
+
+    # 重新开始和复活使用新的关卡布局
+    game.level_start.capture_start(game)
+    return added, removed
+
+
+class LevelWatcher:
+    """
+    每隔 interval 帧检查一次 levels.py 的修改时间（一次 os.stat），
+    发生变化时重新导入并增量更新当前关卡
+    """
+    def __init__(self, path=None, interval=30):
+        # 只在开发模式下导入 levels.py（正常运行时关卡数据来自关卡包）
+        import levels
+        self.levels = levels
+        self.path = path or levels.__file__
+        self.interval = interval
+        self._frame = 0
+        self._mtime = self._stat()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def poll(self, game):
+        """每帧调用；返回是否发生了热重载"""
+        self._frame += 1
+        if self._frame < self.interval:
+            return False
+        self._frame = 0
+
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            self.levels = importlib.reload(self.levels)
+        except Exception as e:
+            # 关卡文件有错误时保留当前关卡，修正后再次保存即可
+            print(f"关卡热重载失败: {e}")
+            return False
+        # 后台预先构建的关卡和关卡包中的是旧数据
+        game.preloader.clear()
+        reset_pack()
+        # 关卡数量可能变化，重新生成关卡选择界面
+        game.build_level_select()
+
+        level = self.levels.get_level(game.loaded_level)
+        if level is None:
+            return False
+        added, removed = apply_level_diff(game, level)
+        print(f"关卡 {game.loaded_level} 已热重载：新增 {added} 个实体，移除 {removed} 个实体")
+        return True
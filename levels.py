@@ -0,0 +1,114 @@
+"""
+关卡定义：每个关卡由平台、尖刺、礼物、出生点和大门的数据组成
+Game.load_level 按这些数据创建实体；开发模式（python main.py --dev）下
+修改并保存本文件，正在运行的关卡会增量热重载
+
+数据格式：
+    difficulty: 难度说明（关卡选择界面的描述由 level_pack.describe_level 按数据生成）
+    platforms: (x, y, 宽, 高, 颜色, 是否移动, 是否垂直移动)
+    spikes:    (x, y, 数量)，每个尖刺间隔 40 像素
+    gems:      (x, y) 礼物中心点
+    birth_point: 玩家出生点（左上角）
+    door:      (x, y, 宽, 高)
+    music:     背景音乐播放列表（constants.MUSIC_DIR 下的文件名，按顺序循环播放）
+"""
+from constants import *
+
+PLAYER_HEIGHT = 40  # 玩家高度，出生点 = 平台顶部减去玩家高度
+
+# 关卡 2 大门平台
+_GATE_PLATFORM_WIDTH = 250
+_GATE_PLATFORM_X = SCREEN_WIDTH - _GATE_PLATFORM_WIDTH - 50
+_GATE_PLATFORM_Y = SCREEN_HEIGHT - 550
+
+LEVELS = {
+    1: {
+        "difficulty": "入门难度",
+        "platforms": [
+            # 第一层平台（底部）
+            (50, SCREEN_HEIGHT - 100, 150, 20, ICE_BLUE, False, False),    # 出生平台
+            (400, SCREEN_HEIGHT - 50, 200, 20, ICE_BLUE, False, False),    # 长平台
+            (700, SCREEN_HEIGHT - 100, 120, 20, ICE_BLUE, False, False),   # 短平台
+            # 第二层平台（中间层）
+            (100, SCREEN_HEIGHT - 250, 180, 20, SNOW_WHITE, False, False), # 长平台
+            (450, SCREEN_HEIGHT - 250, 250, 20, SNOW_WHITE, False, False), # 长平台，中间带刺
+            # 第三层平台（上层）
+            (250, SCREEN_HEIGHT - 400, 150, 20, SNOW_WHITE, False, False), # 长平台
+            (600, SCREEN_HEIGHT - 400, 120, 20, SNOW_WHITE, False, False), # 短平台
+            # 垂直移动平台（便于上下移动）
+            (800, SCREEN_HEIGHT - 350, 100, 15, FROST_BLUE, True, True),
+            # 第四层平台（顶部层）- 大门所在，长平台，右上角
+            (SCREEN_WIDTH - 250, SCREEN_HEIGHT - 550, 220, 20, GLACIER_BLUE, False, False),
+        ],
+        "spikes": [
+            (550, SCREEN_HEIGHT - 285, 2),   # 第二层长平台中间的尖刺
+        ],
+        "gems": [
+            (210, SCREEN_HEIGHT - 120),  # 第一层左平台
+            (500, SCREEN_HEIGHT - 120),  # 第一层中平台
+            (760, SCREEN_HEIGHT - 120),  # 第一层右平台
+            (190, SCREEN_HEIGHT - 270),  # 第二层左平台
+            (650, SCREEN_HEIGHT - 270),  # 第二层右平台（避开尖刺）
+            (850, SCREEN_HEIGHT - 370),  # 垂直移动平台上
+        ],
+        # 出生点在出生平台 1/4 位置
+        "birth_point": (50 + 150 // 4, SCREEN_HEIGHT - 100 - PLAYER_HEIGHT),
+        # 大门 - 放在第四层右上角的长平台上
+        "door": (SCREEN_WIDTH - 150, SCREEN_HEIGHT - 650, 100, 100),
+        "music": ("level1.ogg", "level1_b.ogg"),
+    },
+    2: {
+        "difficulty": "中等难度",
+        "platforms": [
+            # 第一层平台（底部）- 出生平台
+            (0, SCREEN_HEIGHT - 80, 100, 20, SNOW_WHITE, False, False),
+            # 第一层其他平台
+            (200, SCREEN_HEIGHT - 80, 250, 20, ICE_BLUE, False, False),    # 长平台，中间带刺
+            (650, SCREEN_HEIGHT - 80, 120, 20, ICE_BLUE, False, False),    # 短平台
+            # 关键垂直移动平台（连接第一层到第二层）
+            (250, SCREEN_HEIGHT - 200, 100, 15, FROST_BLUE, True, True),
+            (850, SCREEN_HEIGHT - 200, 100, 15, FROST_BLUE, True, True),
+            # 第二层平台（中间层）
+            (50, SCREEN_HEIGHT - 280, 180, 20, SNOW_WHITE, False, False),  # 左平台
+            (400, SCREEN_HEIGHT - 280, 200, 20, SNOW_WHITE, False, False), # 中平台，带刺
+            (700, SCREEN_HEIGHT - 280, 150, 20, SNOW_WHITE, False, False), # 右平台
+            # 第三层平台（上层）
+            (100, SCREEN_HEIGHT - 400, 220, 20, SNOW_WHITE, False, False), # 长平台
+            (550, SCREEN_HEIGHT - 400, 100, 20, SNOW_WHITE, False, False), # 中平台
+            # 第三个垂直移动平台（关键，通往顶部）
+            (550, SCREEN_HEIGHT - 520, 100, 15, FROST_BLUE, True, True),
+            # 第四层平台（顶层）- 大门平台
+            (_GATE_PLATFORM_X, _GATE_PLATFORM_Y, _GATE_PLATFORM_WIDTH, 20, GLACIER_BLUE, False, False),
+        ],
+        "spikes": [
+            (300, SCREEN_HEIGHT - 115, 2),   # 第一层长平台中间的尖刺
+            (480, SCREEN_HEIGHT - 315, 2),   # 第二层中平台中间的尖刺
+        ],
+        "gems": [
+            # 沿着主要路径分布
+            (175, SCREEN_HEIGHT - 140),  # 出生平台
+            (450, SCREEN_HEIGHT - 120),  # 第一层中平台
+            (710, SCREEN_HEIGHT - 120),  # 第一层右平台
+            (300, SCREEN_HEIGHT - 220),  # 垂直移动平台1上
+            (200, SCREEN_HEIGHT - 300),  # 第二层左平台
+            (750, SCREEN_HEIGHT - 300),  # 第二层右平台
+            (625, SCREEN_HEIGHT - 420),  # 第三层中平台
+            (500, SCREEN_HEIGHT - 500),  # 垂直移动平台3上
+        ],
+        # 出生点在出生平台中间
+        "birth_point": (100 // 2, SCREEN_HEIGHT - 80 - PLAYER_HEIGHT),
+        # 大门 - 放在右上角的平台上
+        "door": (_GATE_PLATFORM_X + _GATE_PLATFORM_WIDTH // 2 - 30, _GATE_PLATFORM_Y - 100, 100, 100),
+        "music": ("level2.ogg", "level2_b.ogg"),
+    },
+}
+
+
+def get_level(level_num):
+    """返回关卡定义，不存在时返回 None"""
+    return LEVELS.get(level_num)
+
+
+def level_count():
+    return len(LEVELS)
+
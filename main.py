@@ -1,5 +1,8 @@
+import sys
 from game import Game
 
 if __name__ == "__main__":
-    game = Game()
+    # --dev：开发模式，修改 levels.py 后自动热重载当前关卡
+    # --memprof：内存分析，退出时打印每帧分配、关卡加载后的内存增长和分配最多的位置
+    game = Game(dev_mode="--dev" in sys.argv, memprof="--memprof" in sys.argv)
     game.run()
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+内存分析模块（可选）：用 tracemalloc 统计每帧、每个游戏状态的内存分配，
+列出新增内存最多的代码位置，并检查反复加载关卡后保留的内存是否持续增长（泄漏）
+- 游戏中：python main.py --memprof，退出时打印汇总
+- 命令行：python memprof.py，无窗口依次运行各界面并反复加载关卡，输出报告
+- 测试中：profile_states / check_level_reload 返回报告对象，可直接检查其中的数值
+tracemalloc 只统计 Python 分配器的内存：Surface 等对象本身会被计入，
+SDL 分配的像素缓冲区不会，频繁创建的表面表现为大量小对象的分配
+开启后运行速度明显下降，只在需要时使用
+"""
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from constants import *
+
+STATE_NAMES = {
+    MENU: "MENU",
+    LEVEL_SELECT: "LEVEL_SELECT",
+    PLAYING: "PLAYING",
+    INSTRUCTIONS: "INSTRUCTIONS",
+    WIN_SCREEN: "WIN_SCREEN",
+    GAME_OVER: "GAME_OVER",
+    PAUSED: "PAUSED",
+}
+
+# 统计分配位置时忽略的模块（分析工具自身和导入机制）
+IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, "*linecache.py"),
+)
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024 or unit == "MiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def top_sites(new, old, count=10):
+    """两次快照之间新增内存最多的代码位置：[(位置, 新增字节, 新增块数)]"""
+    new = new.filter_traces(IGNORED_TRACES)
+    old = old.filter_traces(IGNORED_TRACES)
+    sites = []
+    for stat in new.compare_to(old, "lineno")[:count]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        sites.append((f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                      stat.size_diff, stat.count_diff))
+    return sites
+
+
+class StateStats:
+    """一个游戏状态下的逐帧统计"""
+    __slots__ = ("frames", "peak_total", "peak_max", "net_total")
+
+    def __init__(self):
+        self.frames = 0
+        self.peak_total = 0     # 每帧峰值超出帧开始时内存的部分（临时分配）之和
+        self.peak_max = 0
+        self.net_total = 0      # 每帧结束时相对开始时的净增长之和
+
+    def add(self, peak, net):
+        self.frames += 1
+        self.peak_total += peak
+        self.peak_max = max(self.peak_max, peak)
+        self.net_total += net
+
+
+class MemoryReport:
+    """
+    分析结果
+    states：状态名 -> StateStats；sites：新增内存最多的位置；
+    loads：每次加载关卡后（垃圾回收之后）保留的内存
+    """
+    def __init__(self, states, sites, loads, peak):
+        self.states = states
+        self.sites = sites
+        self.loads = loads
+        self.peak = peak
+
+    @property
+    def growth_per_load(self):
+        """加载关卡后保留内存的平均增长（字节/次），忽略第一次加载；明显大于 0 说明有泄漏"""
+        samples = self.loads[1:]
+        if len(samples) < 2:
+            return 0.0
+        return (samples[-1] - samples[0]) / (len(samples) - 1)
+
+    def format(self):
+        lines = ["内存分析汇总（tracemalloc）", f"  最高占用: {format_bytes(self.peak)}"]
+        if self.states:
+            lines.append("  各状态每帧分配（平均临时分配 / 最大临时分配 / 平均净增长）:")
+            for name, stats in self.states.items():
+                lines.append(f"    {name:<13} {stats.frames:6d} 帧  "
+                             f"{format_bytes(stats.peak_total / stats.frames):>10} / "
+                             f"{format_bytes(stats.peak_max):>10} / "
+                             f"{format_bytes(stats.net_total / stats.frames):>10}")
+        if self.loads:
+            lines.append(f"  加载关卡 {len(self.loads)} 次，保留内存 "
+                         f"{format_bytes(self.loads[0])} -> {format_bytes(self.loads[-1])}，"
+                         f"平均每次增长 {format_bytes(self.growth_per_load)}")
+        if self.sites:
+            lines.append("  新增内存最多的位置:")
+            for site, size, count in self.sites:
+                lines.append(f"    {site:<28} {format_bytes(size):>10}  {count:+d} 块")
+        return "\n".join(lines)
+
+
+class MemoryProfiler:
+    """
+    逐帧内存统计
+    - frame(state) 在每帧开始时调用一次：结束上一帧的统计（记入上一帧的状态）并开始新的一帧
+    - level_loaded() 在关卡加载完成后调用：垃圾回收后记录保留的内存
+    - report() 生成汇总，stop() 停止跟踪
+    """
+    def __init__(self, frames=1):
+        self.started_here = not tracemalloc.is_tracing()
+        if self.started_here:
+            tracemalloc.start(frames)
+        self.states = {}
+        self.loads = []
+        self._state = None
+        self._start = 0
+        self.peak = 0
+        self.baseline = tracemalloc.take_snapshot()
+
+    def frame(self, state):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._state is not None:
+            stats = self.states.get(self._state)
+            if stats is None:
+                stats = self.states[self._state] = StateStats()
+            stats.add(peak - self._start, current - self._start)
+        self.peak = max(self.peak, peak)
+        self._state = STATE_NAMES.get(state, str(state))
+        tracemalloc.reset_peak()
+        # 重新读取：统计本身产生的分配不计入下一帧
+        self._start = tracemalloc.get_traced_memory()[0]
+
+    def level_loaded(self):
+        gc.collect()
+        self.loads.append(tracemalloc.get_traced_memory()[0])
+
+    def report(self, count=10):
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        sites = top_sites(tracemalloc.take_snapshot(), self.baseline, count)
+        return MemoryReport(dict(self.states), sites, list(self.loads), self.peak)
+
+    def stop(self):
+        if self.started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def run_frames(game, state, frames, profiler):
+    """无窗口在 state 状态下运行若干帧（Game.step，不处理事件、不等待帧率）"""
+    game.state = state
+    for _ in range(frames):
+        profiler.frame(game.state)
+        game.step(paced=False)
+
+
+def profile_states(game, frames=300, states=(MENU, LEVEL_SELECT, INSTRUCTIONS, PLAYING, PAUSED,
+                                            WIN_SCREEN, GAME_OVER), count=10):
+    """依次在各状态下运行 frames 帧，返回 MemoryReport"""
+    profiler = MemoryProfiler()
+    try:
+        game.restart_level(game.current_level)
+        for state in states:
+            run_frames(game, state, frames, profiler)
+        profiler.frame(None)
+        return profiler.report(count)
+    finally:
+        profiler.stop()
+
+
+def check_level_reload(game, repeats=20, levels=(1, 2), count=10):
+    """
+    反复加载关卡（每次都重新构建），记录每次加载后保留的内存，返回 MemoryReport
+    新增内存最多的位置以第一轮加载之后为基准，只反映重复加载中保留下来的内存
+    """
+    profiler = MemoryProfiler()
+    try:
+        for level_num in levels:
+            game.load_level(level_num)
+        gc.collect()
+        profiler.baseline = tracemalloc.take_snapshot()
+        for i in range(repeats):
+            game.load_level(levels[i % len(levels)])
+            profiler.level_loaded()
+        return profiler.report(count)
+    finally:
+        profiler.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无窗口运行游戏并统计内存分配")
+    parser.add_argument("--frames", type=int, default=300, help="每个状态运行的帧数")
+    parser.add_argument("--reloads", type=int, default=20, help="重复加载关卡的次数")
+    parser.add_argument("--top", type=int, default=10, help="列出的分配位置数量")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from game import Game
+
+    # 成绩、游戏数据和缩略图写入临时目录，不影响本地记录
+    with tempfile.TemporaryDirectory(prefix="memprof-") as data_dir:
+        game = Game(records_db=os.path.join(data_dir, "records.db"),
+                    telemetry_dir=os.path.join(data_dir, "telemetry"),
+                    thumbnails_dir=os.path.join(data_dir, "thumbnails"))
+        try:
+            print(profile_states(game, args.frames, count=args.top).format())
+            print()
+            print(check_level_reload(game, args.reloads, count=args.top).format())
+        finally:
+            game.close()
+
+
+if __name__ == "__main__":
+    main()
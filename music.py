@@ -0,0 +1,136 @@
+"""
+背景音乐模块：使用 pygame.mixer.music 流式播放（边解码边播放），内存占用与曲目长度无关
+- 每个关卡在 levels.py 中有自己的播放列表（"music"，运行时从关卡包读取），其他界面的播放列表见 constants.MUSIC_PLAYLISTS
+- 切换状态时先淡出当前曲目，淡出结束后再淡入新的播放列表，两段依次进行、不重叠
+  （mixer.music 只有一路音乐流；两首同时播放需要把曲目完整解码为 Sound，失去流式播放的意义）
+- PAUSED 时暂停、恢复游戏时继续播放
+- 当前曲目播放时用 mixer.music.queue 预先打开下一首，列表循环播放、曲目之间无停顿
+"""
+import os
+import pygame
+from constants import *
+from level_pack import level_music
+
+# 曲目结束（或排队的下一首开始播放）时发出的事件
+MUSIC_END = pygame.USEREVENT + 1
+
+
+class Music:
+    """
+    背景音乐控制
+    - set_state(state, level)：每帧调用，状态或关卡变化时切换播放列表
+    - update(dt)：每帧调用，推进淡出（dt 为毫秒）
+    - on_music_end()：收到 MUSIC_END 事件时调用
+    音频初始化失败或找不到音乐文件时静默不播放
+    """
+    def __init__(self, directory=MUSIC_DIR, volume=MUSIC_VOLUME, fade_ms=MUSIC_FADE_MS):
+        self.directory = directory
+        self.volume = volume
+        self.fade_ms = fade_ms
+        self.enabled = pygame.mixer.get_init() is not None
+        self.state = None
+        self.level = None
+        self.playlist = ()      # 正在播放的曲目路径
+        self.index = 0          # 正在播放的曲目在列表中的位置
+        self.pending = None     # 淡出结束后要播放的列表
+        self.fade_left = 0      # 剩余淡出时间（毫秒）
+        self.paused = False
+        self._stops = 0         # 主动 stop 产生、需要忽略的结束事件数
+        if self.enabled:
+            pygame.mixer.music.set_endevent(MUSIC_END)
+
+    def resolve(self, names):
+        """文件名 -> 存在的曲目路径（缺少的曲目直接跳过）"""
+        paths = (os.path.join(self.directory, name) for name in names)
+        return tuple(path for path in paths if os.path.isfile(path))
+
+    def playlist_for(self, state, level):
+        if state in (PLAYING, PAUSED):
+            names = level_music(level)
+        else:
+            names = MUSIC_PLAYLISTS.get(state, ())
+        return self.resolve(names)
+
+    def set_state(self, state, level):
+        if not self.enabled or (state, level) == (self.state, self.level):
+            return
+        self.state, self.level = state, level
+        try:
+            if state == PAUSED:
+                if pygame.mixer.music.get_busy():
+                    pygame.mixer.music.pause()
+                    self.paused = True
+                return
+            if self.paused:
+                pygame.mixer.music.unpause()
+                self.paused = False
+            self.switch(self.playlist_for(state, level))
+        except pygame.error as e:
+            print(f"背景音乐播放失败: {e}")
+
+    def switch(self, playlist):
+        """
+        切换播放列表：列表相同时继续播放，否则先淡出当前曲目（fade_ms 的一半），
+        淡出结束后由 _start 淡入新列表（另一半）；没有正在播放的曲目时直接淡入
+        """
+        if playlist == (self.playlist if self.pending is None else self.pending):
+            return
+        if self.pending is None and self.playlist and pygame.mixer.music.get_busy():
+            self.fade_left = self.fade_ms // 2
+        self.pending = playlist
+        if self.fade_left <= 0:
+            self._start()
+
+    def update(self, dt):
+        if self.pending is None or self.paused:
+            return
+        self.fade_left -= dt
+        if self.fade_left > 0:
+            pygame.mixer.music.set_volume(self.volume * self.fade_left / (self.fade_ms // 2))
+            return
+        try:
+            self._start()
+        except pygame.error as e:
+            print(f"背景音乐播放失败: {e}")
+            self.pending = None
+
+    def _stop(self):
+        if pygame.mixer.music.get_busy() or self.paused:
+            pygame.mixer.music.stop()
+            self._stops += 1
+            self.paused = False
+
+    def _start(self):
+        """淡出结束后调用：停止当前曲目，淡入新列表的第一首并预先排入第二首"""
+        playlist, self.pending, self.fade_left = self.pending, None, 0
+        self._stop()
+        self.playlist = playlist
+        self.index = 0
+        if not playlist:
+            return
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.load(playlist[0])
+        if len(playlist) == 1:
+            pygame.mixer.music.play(-1, fade_ms=self.fade_ms // 2)
+        else:
+            pygame.mixer.music.play(0, fade_ms=self.fade_ms // 2)
+            pygame.mixer.music.queue(playlist[1])
+
+    def on_music_end(self):
+        """排队的曲目已开始播放：记录位置并预先排入列表中的下一首"""
+        if self._stops:
+            self._stops -= 1
+            return
+        if len(self.playlist) < 2 or not pygame.mixer.music.get_busy():
+            return
+        self.index = (self.index + 1) % len(self.playlist)
+        try:
+            pygame.mixer.music.queue(self.playlist[(self.index + 1) % len(self.playlist)])
+        except pygame.error as e:
+            print(f"预加载下一首音乐失败: {e}")
+
+    def stop(self):
+        if self.enabled:
+            self.pending = None
+            self._stop()
+            self.playlist = ()
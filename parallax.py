@@ -0,0 +1,118 @@
+"""
+视差背景模块：天空、远山、近处的树三层，随玩家水平位置以不同速度滚动
+每层在加载时预先横向平铺成循环表面，绘制时最多两次 blit（与关卡宽度无关）
+不透明的层转换为不带 alpha 的表面，blit 时不做逐像素混合；带透明的层只占画面底部一条
+图片文件不存在时由程序生成
+"""
+import math
+import random
+import pygame
+from constants import *
+from assets import load_image, is_opaque
+
+# (图片文件, 缩放尺寸, 滚动系数, 生成函数名)：系数 0 表示不滚动，越近的层系数越大
+PARALLAX_LAYERS = [
+    ("background.png", (SCREEN_WIDTH, SCREEN_HEIGHT), 0.0, "sky"),
+    ("bg_hills.png", None, 0.15, "hills"),
+    ("bg_trees.png", None, 0.4, "trees"),
+]
+
+
+def make_sky(width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """从上到下由深蓝渐变到浅蓝的天空（不透明，水平方向一致）"""
+    image = pygame.Surface((1, height))
+    top, bottom = (40, 70, 130), (150, 190, 230)
+    for y in range(height):
+        t = y / (height - 1)
+        image.set_at((0, y), tuple(round(a + (b - a) * t) for a, b in zip(top, bottom)))
+    return pygame.transform.scale(image, (width, height))
+
+
+def make_hills(width=600, height=260, seed=3):
+    """两道起伏的雪山轮廓（左右边缘高度相同，可无缝平铺）"""
+    rng = random.Random(seed)
+    image = pygame.Surface((width, height), pygame.SRCALPHA)
+    for color, base, amplitude in (((170, 190, 220), 120, 60), ((200, 215, 240), 60, 40)):
+        waves = [(rng.randint(1, 3), rng.uniform(0, 2 * math.pi)) for _ in range(2)]
+        points = [(0, height)]
+        for x in range(0, width + 1, 10):
+            y = base - sum(math.sin(2 * math.pi * k * x / width + p) for k, p in waves) * amplitude / 2
+            points.append((x, max(0, min(height, y))))
+        points.append((width, height))
+        pygame.draw.polygon(image, color, points)
+    return image
+
+
+def make_trees(width=400, height=180, seed=7):
+    """一排积雪的松树（树的位置在 width 内循环，可无缝平铺）"""
+    rng = random.Random(seed)
+    image = pygame.Surface((width, height), pygame.SRCALPHA)
+    for _ in range(9):
+        x = rng.randrange(width)
+        tree_height = rng.randint(90, height)
+        half = tree_height // 4
+        for dx in (-width, 0, width):
+            cx = x + dx
+            if cx + half < 0 or cx - half > width:
+                continue
+            top = height - tree_height
+            pygame.draw.rect(image, (70, 50, 40), (cx - 4, height - 20, 8, 20))
+            pygame.draw.polygon(image, (40, 90, 80), [(cx, top), (cx - half, height - 15), (cx + half, height - 15)])
+            pygame.draw.polygon(image, SNOW_WHITE, [(cx, top), (cx - half // 3, top + tree_height // 5),
+                                                    (cx + half // 3, top + tree_height // 5)])
+    return image
+
+
+GENERATORS = {"sky": make_sky, "hills": make_hills, "trees": make_trees}
+
+
+class ParallaxLayer:
+    """
+    一层视差背景：图片横向平铺到不小于屏幕宽度的循环表面，底部与屏幕底部对齐
+    """
+    def __init__(self, image, factor):
+        self.factor = factor
+        self.opaque = is_opaque(image)
+        tile_width, height = image.get_size()
+        repeat = max(1, math.ceil(SCREEN_WIDTH / tile_width))
+        if self.opaque:
+            surface = pygame.Surface((tile_width * repeat, height)).convert()
+        else:
+            surface = pygame.Surface((tile_width * repeat, height), pygame.SRCALPHA).convert_alpha()
+        for i in range(repeat):
+            surface.blit(image, (i * tile_width, 0))
+        self.surface = surface
+        self.width = surface.get_width()
+        self.y = SCREEN_HEIGHT - height
+
+    def draw(self, target, scroll):
+        """按滚动量绘制：循环表面被切成左右两段，最多两次 blit"""
+        offset = int(scroll * self.factor) % self.width
+        scale = getattr(target, "scale", 1.0)
+        surface = self.surface
+        if scale != 1.0:
+            # display.Canvas：在内部分辨率上计算两段的位置，避免分别取整产生缝隙
+            surface = target.scaled(surface)
+            target = target.surface
+        x = -round(offset * scale)
+        y = round(self.y * scale)
+        target.blit(surface, (x, y))
+        if x + surface.get_width() < target.get_width():
+            target.blit(surface, (x + surface.get_width(), y))
+
+
+class ParallaxBackground:
+    """视差背景：按 PARALLAX_LAYERS 从远到近绘制"""
+    def __init__(self, layers=PARALLAX_LAYERS):
+        self.layers = []
+        for name, size, factor, generator in layers:
+            try:
+                image = load_image(name, size)
+            except (pygame.error, FileNotFoundError):
+                image = GENERATORS[generator]()
+            self.layers.append(ParallaxLayer(image, factor))
+
+    def draw(self, target, scroll):
+        """scroll：玩家相对屏幕中心的水平位置（像素）"""
+        for layer in self.layers:
+            layer.draw(target, scroll)
@@ -0,0 +1,62 @@
+"""
+定点数物理核心：位置和速度用整数保存，单位为 1/FP_ONE 像素
+每帧的亚像素位移在定点坐标中累加，不会被 Rect 的整数坐标截断；
+Rect 只在定点坐标变化后按向下取整同步，用于碰撞检测和绘制
+全部运算都是整数加减、乘法、整除和移位，在任何机器上结果逐位一致
+"""
+import struct
+import sys
+import zlib
+from constants import *
+
+FP_SHIFT = 8
+FP_ONE = 1 << FP_SHIFT     # 1 像素 = 256 个定点单位
+
+
+def to_fp(value):
+    """像素值 -> 定点数（只用于初始化常量和关卡数据，四舍五入）"""
+    return int(round(value * FP_ONE))
+
+
+def px_to_fp(px):
+    """整数像素坐标 -> 定点坐标"""
+    return px << FP_SHIFT
+
+
+def fp_to_px(value):
+    """定点坐标 -> 整数像素坐标（向下取整）"""
+    return value >> FP_SHIFT
+
+
+# 物理参数（定点数，每帧）
+GRAVITY = to_fp(0.8)              # 重力加速度
+MAX_FALL_SPEED = to_fp(20)        # 最大下落速度
+PLAYER_SPEED = to_fp(5)           # 水平移动速度
+JUMP_MIN_SPEED = to_fp(-6)        # 小跳初速度
+JUMP_MAX_SPEED = to_fp(-9)        # 大跳最大速度
+JUMP_MAX_HOLD = 20                # 按住跳跃键加速的最大帧数
+MOVER_SPEED = to_fp(1.5)          # 移动平台速度
+
+
+def _array_bytes(column):
+    # 统一按小端序参与校验，不同字节序的机器得到相同结果
+    if sys.byteorder == "little":
+        return column.tobytes()
+    column = column.__copy__()
+    column.byteswap()
+    return column.tobytes()
+
+
+def state_digest(player, entities):
+    """
+    物理状态校验值（CRC32）：玩家定点位置、速度、跳跃状态和所有实体的定点坐标、方向、标志
+    用于无界面批量运行和逐帧对比两次模拟是否一致
+    """
+    on_platform = player.on_moving_platform
+    crc = zlib.crc32(struct.pack(
+        "<qqqqi???i", player.fx, player.fy, player.vel_x, player.vel_y,
+        player.jump_held_time, player.is_jumping, player.on_ground, player.facing_right,
+        -1 if on_platform is None else on_platform))
+    for column in (entities.fx, entities.fy, entities.direction, entities.flags):
+        crc = zlib.crc32(_array_bytes(column), crc)
+    return crc
@@ -0,0 +1,349 @@
+"""
+成绩记录模块：每次通关或失败都保存到本地 SQLite 数据库（records.db）
+- runs 表保存每一局的结果，按 (关卡, 是否通关, 用时/死亡次数/时间) 建索引，
+  前 N 名和单个关卡的历史记录只需按索引读取，与记录总数无关
+- level_stats 表保存每个关卡的汇总（最佳用时、最少死亡、通关次数），写入时同步更新
+- 按键录像压缩后单独存放在 replays 表中，不影响 runs 表的查询
+写入由后台线程批量提交，游戏循环只把记录放入队列；界面显示的汇总在内存中缓存
+
+命令行查看记录：
+    python records.py                  # 各关卡汇总
+    python records.py --level 1 --top 10
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.request import pathname2url
+import pygame
+from constants import *
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    completed INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    deaths INTEGER NOT NULL,
+    gems INTEGER NOT NULL,
+    total_gems INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_best_time ON runs (level, completed, frames);
+CREATE INDEX IF NOT EXISTS runs_fewest_deaths ON runs (level, completed, deaths, frames);
+CREATE INDEX IF NOT EXISTS runs_history ON runs (level, finished_at);
+CREATE TABLE IF NOT EXISTS replays (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (id),
+    frames INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS level_stats (
+    level INTEGER PRIMARY KEY,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    completions INTEGER NOT NULL DEFAULT 0,
+    best_frames INTEGER,
+    fewest_deaths INTEGER,
+    last_played REAL
+);
+"""
+
+# 录像中每帧一个字节，各按键占一位
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+
+
+class ReplayKeys:
+    """录像回放时代替 pygame.key.get_pressed() 传给 Player.update"""
+    __slots__ = ("left", "right", "jump")
+
+    def __init__(self, bits):
+        self.left = bool(bits & INPUT_LEFT)
+        self.right = bool(bits & INPUT_RIGHT)
+        self.jump = bool(bits & INPUT_JUMP)
+
+    def __getitem__(self, key):
+        if key == pygame.K_LEFT:
+            return self.left
+        if key == pygame.K_RIGHT:
+            return self.right
+        if key == pygame.K_SPACE:
+            return self.jump
+        return False
+
+
+# 所有按键组合预先创建，回放时不为每帧创建对象
+REPLAY_KEYS = [ReplayKeys(bits) for bits in range(8)]
+
+
+class InputRecorder:
+    """记录一局中每帧的按键（begin 时清空，record 每次逻辑更新调用一次）"""
+    def __init__(self):
+        self.inputs = bytearray()
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def begin(self):
+        self.inputs = bytearray()
+
+    def record(self, keys):
+        self.inputs.append((INPUT_LEFT if keys[pygame.K_LEFT] else 0)
+                           | (INPUT_RIGHT if keys[pygame.K_RIGHT] else 0)
+                           | (INPUT_JUMP if keys[pygame.K_SPACE] else 0))
+
+
+def replay_keys(inputs):
+    """把解压后的录像转换为每帧的按键状态"""
+    return [REPLAY_KEYS[bits & 7] for bits in inputs]
+
+
+class RunRecord:
+    """一局的结果（replay 为未压缩的按键录像，不保存时为 None）"""
+    __slots__ = ("level", "completed", "frames", "deaths", "gems", "total_gems",
+                 "finished_at", "replay")
+
+    def __init__(self, level, completed, frames, deaths, gems, total_gems, replay=None):
+        self.level = level
+        self.completed = completed
+        self.frames = frames
+        self.deaths = deaths
+        self.gems = gems
+        self.total_gems = total_gems
+        self.finished_at = time.time()
+        self.replay = replay
+
+
+class LevelStats:
+    """单个关卡的汇总（与 level_stats 表的一行对应）"""
+    __slots__ = ("attempts", "completions", "best_frames", "fewest_deaths", "last_played")
+
+    def __init__(self, attempts=0, completions=0, best_frames=None, fewest_deaths=None, last_played=None):
+        self.attempts = attempts
+        self.completions = completions
+        self.best_frames = best_frames
+        self.fewest_deaths = fewest_deaths
+        self.last_played = last_played
+
+    def add(self, run):
+        self.attempts += 1
+        self.last_played = run.finished_at
+        if run.completed:
+            self.completions += 1
+            if self.best_frames is None or run.frames < self.best_frames:
+                self.best_frames = run.frames
+            if self.fewest_deaths is None or run.deaths < self.fewest_deaths:
+                self.fewest_deaths = run.deaths
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=5)
+    # WAL：读取不会被后台写入阻塞
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connect_read_only(path):
+    """只读连接：不创建文件、不修改数据库（命令行查看记录使用）"""
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True, timeout=5)
+
+
+class RecordWriter(threading.Thread):
+    """后台写入线程：取出队列中的所有记录，在一个事务中写入并更新关卡汇总"""
+    def __init__(self, path, save_replays=RECORDS_SAVE_REPLAYS):
+        super().__init__(name="records-writer", daemon=True)
+        self.path = path
+        self.save_replays = save_replays
+        self.queue = queue.Queue()
+
+    def run(self):
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as e:
+            print(f"无法打开成绩记录数据库: {e}")
+            return
+        while True:
+            run = self.queue.get()
+            batch = [run]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            try:
+                with conn:
+                    for run in batch:
+                        if run is not None:
+                            self.write(conn, run)
+            except sqlite3.Error as e:
+                print(f"保存成绩记录失败: {e}")
+            if stopping:
+                break
+        conn.close()
+
+    def write(self, conn, run):
+        cursor = conn.execute(
+            "INSERT INTO runs (level, finished_at, completed, frames, deaths, gems, total_gems)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run.level, run.finished_at, int(run.completed), run.frames, run.deaths,
+             run.gems, run.total_gems))
+        if self.save_replays and run.replay:
+            # 压缩在写入线程中进行；按键长时间不变，压缩率很高
+            conn.execute("INSERT INTO replays (run_id, frames, data) VALUES (?, ?, ?)",
+                         (cursor.lastrowid, len(run.replay), zlib.compress(run.replay, 9)))
+        completed = int(run.completed)
+        conn.execute("INSERT OR IGNORE INTO level_stats (level) VALUES (?)", (run.level,))
+        conn.execute(
+            "UPDATE level_stats SET attempts = attempts + 1, completions = completions + ?,"
+            " best_frames = CASE WHEN ? AND (best_frames IS NULL OR ? < best_frames) THEN ? ELSE best_frames END,"
+            " fewest_deaths = CASE WHEN ? AND (fewest_deaths IS NULL OR ? < fewest_deaths) THEN ? ELSE fewest_deaths END,"
+            " last_played = ? WHERE level = ?",
+            (completed, completed, run.frames, run.frames, completed, run.deaths, run.deaths,
+             run.finished_at, run.level))
+
+
+class RecordStore:
+    """
+    成绩记录入口
+    - add(run) 只更新内存中的汇总并放入写入队列，可以在游戏循环中调用
+    - stats(level) 返回关卡汇总，每个关卡只在第一次使用时查询一次数据库
+    - levels / top_runs / history / load_replay 按索引查询，供命令行工具和界面使用
+    read_only=True 时只打开只读连接：不建表、不启动写入线程，add 只更新内存中的汇总
+    """
+    def __init__(self, path=RECORDS_DB, enabled=RECORDS_ENABLED, read_only=False):
+        self.path = path
+        self.enabled = enabled
+        self._stats = {}
+        self._conn = None
+        self.writer = None
+        if not enabled:
+            return
+        if read_only:
+            self.enabled = False
+            try:
+                self._conn = connect_read_only(path)
+            except sqlite3.Error as e:
+                print(f"无法打开成绩记录数据库 ({e})")
+            return
+        try:
+            conn = connect(path)
+            conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            print(f"无法打开成绩记录数据库 ({e})，不保存成绩")
+            self.enabled = False
+            return
+        self._conn = conn
+        self.writer = RecordWriter(path)
+        self.writer.start()
+
+    def add(self, run):
+        """记录一局结果，返回记录前的关卡汇总（用于判断是否打破纪录）"""
+        stats = self.stats(run.level)
+        previous = LevelStats(stats.attempts, stats.completions, stats.best_frames,
+                              stats.fewest_deaths, stats.last_played)
+        stats.add(run)
+        if self.enabled:
+            self.writer.queue.put(run)
+        return previous
+
+    def stats(self, level):
+        stats = self._stats.get(level)
+        if stats is None:
+            stats = LevelStats()
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT attempts, completions, best_frames, fewest_deaths, last_played"
+                    " FROM level_stats WHERE level = ?", (level,)).fetchone()
+                if row:
+                    stats = LevelStats(*row)
+            self._stats[level] = stats
+        return stats
+
+    def levels(self):
+        """有记录的关卡号（升序）"""
+        if self._conn is None:
+            return []
+        return [row[0] for row in self._conn.execute("SELECT level FROM level_stats ORDER BY level")]
+
+    def top_runs(self, level, count=10, by="frames"):
+        """通关记录的前 count 名：by 为 "frames"（用时最短）或 "deaths"（死亡最少，同数时比用时）"""
+        if self._conn is None:
+            return []
+        order = "deaths, frames" if by == "deaths" else "frames"
+        return self._conn.execute(
+            "SELECT id, finished_at, frames, deaths, gems, total_gems FROM runs"
+            f" WHERE level = ? AND completed = 1 ORDER BY {order} LIMIT ?",
+            (level, count)).fetchall()
+
+    def history(self, level, count=20):
+        """最近 count 局（包括未通关的）"""
+        if self._conn is None:
+            return []
+        return self._conn.execute(
+            "SELECT id, finished_at, completed, frames, deaths, gems, total_gems FROM runs"
+            " WHERE level = ? ORDER BY finished_at DESC LIMIT ?",
+            (level, count)).fetchall()
+
+    def load_replay(self, run_id):
+        """读取并解压一局的按键录像（每帧一个字节，见 INPUT_*），没有时返回 None"""
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT data FROM replays WHERE run_id = ?", (run_id,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def close(self):
+        """退出时调用：写完队列中剩余的记录"""
+        if self.writer is not None:
+            self.writer.queue.put(None)
+            self.writer.join(timeout=2)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def format_frames(frames):
+    """帧数转换为秒数文字"""
+    return f"{frames / FPS:.2f} 秒"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看本地成绩记录")
+    parser.add_argument("--db", default=RECORDS_DB, help="数据库文件")
+    parser.add_argument("--level", type=int, help="只显示这个关卡的排行和最近记录")
+    parser.add_argument("--top", type=int, default=10, help="排行显示的条数")
+    parser.add_argument("--by", choices=("frames", "deaths"), default="frames", help="排行依据")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"没有找到成绩记录 {args.db}")
+        return
+    store = RecordStore(args.db, read_only=True)
+    try:
+        if args.level is None:
+            for level in store.levels():
+                stats = store.stats(level)
+                best = format_frames(stats.best_frames) if stats.best_frames is not None else "-"
+                print(f"关卡 {level}: 通关 {stats.completions}/{stats.attempts} 次，最佳用时 {best}，"
+                      f"最少死亡 {stats.fewest_deaths if stats.fewest_deaths is not None else '-'}")
+            return
+        print(f"关卡 {args.level} 排行：")
+        for rank, (run_id, finished_at, frames, deaths, gems, total_gems) in enumerate(
+                store.top_runs(args.level, args.top, args.by), 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+            print(f"{rank:3d}. {format_frames(frames)}  死亡 {deaths}  礼物 {gems}/{total_gems}  {when}  #{run_id}")
+        print("最近记录：")
+        for run_id, finished_at, completed, frames, deaths, gems, total_gems in store.history(args.level, args.top):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+            result = "通关" if completed else "失败"
+            print(f"  {when}  {result}  {format_frames(frames)}  死亡 {deaths}  礼物 {gems}/{total_gems}  #{run_id}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+渲染列表模块：收集可见实体的 (图片, 矩形) 对，按图层排序后用一次 Surface.blits 提交
+列表按增量方式维护：实体出现、消失或移动时只修改对应的条目，不再每帧从分组重建
+"""
+import pygame
+from constants import *
+
+# 图层（数值小的先绘制）
+LAYER_PLATFORM = 0
+LAYER_SPIKE = 1
+LAYER_GEM = 2
+LAYER_DOOR = 3
+LAYER_PLAYER = 4
+LAYER_COUNT = 5
+
+# 非实体存储中的条目使用的键
+DOOR_KEY = "door"
+PLAYER_KEY = "player"
+
+
+class RenderList:
+    """
+    渲染列表
+    - 每个条目是 [图片, 矩形] 列表，可原地修改：移动只改矩形，换图只改图片
+    - 条目增删时标记为脏，下次绘制前按图层顺序重新拼接一次提交序列
+    - 静态条目在拼接时按视口裁剪；dynamic=True 的条目（移动平台、玩家）总是提交
+    - hide/show 暂时移出/放回条目（如被收集的礼物），条目对象保留复用
+    """
+    def __init__(self, viewport=None):
+        self.viewport = viewport or pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self._layers = [{} for _ in range(LAYER_COUNT)]
+        self._layer_of = {}
+        self._dynamic = set()
+        self._hidden = {}
+        self._sequence = []
+        self._dirty = True
+
+    def __len__(self):
+        return len(self._layer_of)
+
+    def __contains__(self, key):
+        return key in self._layer_of
+
+    def clear(self):
+        for layer in self._layers:
+            layer.clear()
+        self._layer_of.clear()
+        self._dynamic.clear()
+        self._hidden.clear()
+        self._sequence = []
+        self._dirty = False
+
+    def add(self, key, layer, surface, rect, dynamic=False):
+        """添加（或替换）一个条目；rect 会被原样保存，调用方可以直接修改它"""
+        if key in self._layer_of:
+            self.remove(key)
+        self._layers[layer][key] = [surface, rect]
+        self._layer_of[key] = layer
+        if dynamic:
+            self._dynamic.add(key)
+        self._dirty = True
+
+    def remove(self, key):
+        layer = self._layer_of.pop(key, None)
+        if layer is not None:
+            self._layers[layer].pop(key, None)
+            self._hidden.pop(key, None)
+            self._dynamic.discard(key)
+            self._dirty = True
+
+    def hide(self, key):
+        """暂时不绘制该条目，条目本身保留以便 show 时复用"""
+        layer = self._layer_of.get(key)
+        if layer is not None and key in self._layers[layer]:
+            self._hidden[key] = self._layers[layer].pop(key)
+            self._dirty = True
+
+    def show(self, key):
+        entry = self._hidden.pop(key, None)
+        if entry is not None:
+            self._layers[self._layer_of[key]][key] = entry
+            self._dirty = True
+
+    def is_hidden(self, key):
+        return key in self._hidden
+
+    def entry(self, key):
+        entry = self._hidden.get(key)
+        if entry is None:
+            entry = self._layers[self._layer_of[key]][key]
+        return entry
+
+    def move(self, key, x, y):
+        """移动条目（原地修改矩形，不需要重建序列）"""
+        self.entry(key)[1].topleft = (x, y)
+
+    def set_surface(self, key, surface):
+        """更换条目的图片（原地修改，不需要重建序列）"""
+        if key in self._layer_of:
+            self.entry(key)[0] = surface
+
+    def sequence(self):
+        """按图层顺序返回提交序列，只在条目增删后重新拼接"""
+        if self._dirty:
+            viewport = self.viewport
+            dynamic = self._dynamic
+            self._sequence = [
+                entry
+                for layer in self._layers
+                for key, entry in layer.items()
+                if key in dynamic or viewport.colliderect(entry[1])
+            ]
+            self._dirty = False
+        return self._sequence
+
+    def draw(self, screen):
+        """一次 blits 提交所有条目"""
+        screen.blits(self.sequence(), doreturn=False)
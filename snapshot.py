@@ -0,0 +1,156 @@
+"""
+关卡快照模块：保存并恢复关卡中所有可变状态
+重新开始关卡、复活时直接恢复快照，不再重新创建实体和图片
+"""
+from array import array
+from entity_store import KIND_GEM, FLAG_COLLECTED, FLAG_REMOVED, FLAG_VERTICAL
+from physics import FP_SHIFT
+
+
+class LevelSnapshot:
+    """
+    关卡快照：玩家、移动平台位置和方向、礼物收集标志、大门状态、生命和计数
+    数组在捕获时按实体数量预先分配，恢复时只做原地拷贝，耗时 O(实体数) 且不分配内存
+    """
+    def __init__(self):
+        # 实体存储中的可变列
+        self.x = array("i")
+        self.y = array("i")
+        self.fx = array("i")
+        self.fy = array("i")
+        self.flags = array("B")
+        self.direction = array("b")
+        self.gem_ids = array("i")
+        self.valid = False
+
+        # 玩家状态（位置和速度为定点数）
+        self.player_fx = 0
+        self.player_fy = 0
+        self.vel_x = 0
+        self.vel_y = 0
+        self.jump_held_time = 0
+        self.is_jumping = False
+        self.on_ground = False
+        self.facing_right = True
+        self.on_moving_platform = None
+
+        # 大门和游戏计数
+        self.door_open = False
+        self.lives = 3
+        self.gems_collected = 0
+        self.total_gems = 0
+
+    def capture(self, game):
+        """记录当前关卡状态（在关卡加载完成后调用）"""
+        store = game.entities
+        self.x[:] = store.x
+        self.y[:] = store.y
+        self.fx[:] = store.fx
+        self.fy[:] = store.fy
+        self.flags[:] = store.flags
+        self.direction[:] = store.direction
+        self.gem_ids[:] = store.gem_ids
+
+        player = game.player
+        self.player_fx = player.fx
+        self.player_fy = player.fy
+        self.vel_x = player.vel_x
+        self.vel_y = player.vel_y
+        self.jump_held_time = player.jump_held_time
+        self.is_jumping = player.is_jumping
+        self.on_ground = player.on_ground
+        self.facing_right = player.facing_right
+        self.on_moving_platform = player.on_moving_platform
+
+        self.door_open = game.door.is_open if game.door else False
+        self.lives = game.lives
+        self.gems_collected = game.gems_collected
+        self.total_gems = game.total_gems
+        self.valid = True
+
+    def capture_start(self, game):
+        """
+        按实体的起始位置记录关卡初始状态（不依赖当前进度）
+        热重载修改关卡后调用，使重新开始和复活使用新的关卡布局
+        """
+        store = game.entities
+        self.x[:] = store.start_x
+        self.y[:] = store.start_y
+        self.fx[:] = array("i", (x << FP_SHIFT for x in store.start_x))
+        self.fy[:] = array("i", (y << FP_SHIFT for y in store.start_y))
+        self.flags[:] = store.flags
+        self.direction[:] = store.direction
+        del self.gem_ids[:]
+        for i in range(len(store)):
+            flags = store.flags[i]
+            self.flags[i] = flags & ~FLAG_COLLECTED
+            if store.kind[i] == KIND_GEM and not flags & FLAG_REMOVED:
+                self.gem_ids.append(i)
+        for i in store.mover_ids:
+            # 垂直平台初始向上，水平平台初始向右
+            self.direction[i] = -1 if store.flags[i] & FLAG_VERTICAL else 1
+
+        self.player_fx = game.birth_point[0] << FP_SHIFT
+        self.player_fy = game.birth_point[1] << FP_SHIFT
+        self.vel_x = 0
+        self.vel_y = 0
+        self.jump_held_time = 0
+        self.is_jumping = False
+        self.on_ground = False
+        self.facing_right = True
+        self.on_moving_platform = None
+
+        self.door_open = False
+        self.lives = 3
+        self.gems_collected = 0
+        self.total_gems = game.total_gems
+        self.valid = True
+
+    def restore_player(self, player):
+        """只恢复玩家状态（复活时使用）"""
+        player.fx = self.player_fx
+        player.fy = self.player_fy
+        player.rect.x = self.player_fx >> FP_SHIFT
+        player.rect.y = self.player_fy >> FP_SHIFT
+        player.vel_x = self.vel_x
+        player.vel_y = self.vel_y
+        player.jump_held_time = self.jump_held_time
+        player.is_jumping = self.is_jumping
+        player.on_ground = self.on_ground
+        player.facing_right = self.facing_right
+        player.reset_animation()
+        player.on_moving_platform = self.on_moving_platform
+
+    def restore_movers(self, store):
+        """只恢复移动平台的位置和方向（复活时使用，保留已收集的礼物）"""
+        x, y, fx, fy, direction = store.x, store.y, store.fx, store.fy, store.direction
+        for i in store.mover_ids:
+            x[i] = self.x[i]
+            y[i] = self.y[i]
+            fx[i] = self.fx[i]
+            fy[i] = self.fy[i]
+            direction[i] = self.direction[i]
+        store.sync_render_list(store.mover_ids)
+
+    def restore(self, game):
+        """恢复整个关卡到快照时的状态"""
+        store = game.entities
+        store.x[:] = self.x
+        store.y[:] = self.y
+        store.fx[:] = self.fx
+        store.fy[:] = self.fy
+        store.flags[:] = self.flags
+        store.direction[:] = self.direction
+        store.gem_ids[:] = self.gem_ids
+        store.sync_render_list()
+
+        self.restore_player(game.player)
+
+        if game.door:
+            if self.door_open:
+                game.door.open()
+            else:
+                game.door.close()
+        game.lives = self.lives
+        game.gems_collected = self.gems_collected
+        game.total_gems = self.total_gems
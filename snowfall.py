@@ -0,0 +1,150 @@
+"""
+雪花粒子模块：用 NumPy 数组保存成千上万片雪花，每帧一次向量化更新，
+绘制时用一次 Surface.blits 批量提交（少量预先生成的雪花图片共享使用）
+未安装 NumPy 时自动关闭下雪效果
+"""
+import pygame
+from constants import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 画质档位对应的雪花数量
+SNOW_TIERS = [0, 300, 1000, 3000]
+SNOW_TIER_NAMES = ["off", "low", "medium", "high"]
+
+# 雪花图片的半径（像素），每种尺寸只生成一张图片
+FLAKE_RADII = (1, 2, 3, 4)
+
+
+def make_flake_images():
+    """生成几种尺寸的雪花图片：中心不透明、边缘半透明的小圆点"""
+    images = []
+    for radius in FLAKE_RADII:
+        size = radius * 2 + 2
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(image, SNOW_WHITE + (110,), (size // 2, size // 2), radius + 1)
+        pygame.draw.circle(image, SNOW_WHITE + (230,), (size // 2, size // 2), radius)
+        images.append(image)
+    return images
+
+
+class Snowfall:
+    """
+    下雪粒子系统
+    - 位置、速度、尺寸、摆动相位都保存在 NumPy 数组中，按最高档位一次性分配
+    - 当前档位只使用数组的前 count 个元素
+    - adapt(governor) 根据帧预算和负载自动升降档位，但不会超过 set_tier 设置的档位
+    """
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, tier=SNOW_DEFAULT_TIER, seed=None):
+        self.width = width
+        self.height = height
+        self.enabled = np is not None
+        self.tier = tier
+        self.max_tier = tier
+        self.count = 0
+        self._calm_frames = 0
+        if not self.enabled:
+            print("未安装 NumPy，下雪效果已关闭")
+            return
+
+        self.rng = np.random.default_rng(seed)
+        capacity = SNOW_TIERS[-1]
+        self.images = make_flake_images()
+
+        # 雪花数据：尺寸越大下落越快、摆动越明显（近大远小）
+        self.size = self.rng.integers(0, len(FLAKE_RADII), capacity).astype(np.int8)
+        depth = (self.size.astype(np.float32) + 1.0) / len(FLAKE_RADII)
+        self.x = self.rng.uniform(0, width, capacity).astype(np.float32)
+        self.y = self.rng.uniform(-height, height, capacity).astype(np.float32)
+        self.vx = self.rng.uniform(-0.3, 0.3, capacity).astype(np.float32)
+        self.vy = (0.4 + 1.6 * depth).astype(np.float32)
+        self.phase = self.rng.uniform(0, 2 * np.pi, capacity).astype(np.float32)
+        self.wobble_speed = self.rng.uniform(0.01, 0.05, capacity).astype(np.float32)
+        self.wobble_amp = (0.3 + 0.7 * depth).astype(np.float32)
+
+        # 每片雪花对应的图片，顺序固定，档位变化时才重新截取
+        self._flake_images = [self.images[i] for i in self.size.tolist()]
+        self._positions = np.empty((capacity, 2), dtype=np.int32)
+        self._scaled_sources = []
+        self._scaled_count = -1
+        self.set_tier(tier)
+
+    def set_tier(self, tier):
+        """设置画质档位（0 为关闭），同时作为自动调节的上限"""
+        self.max_tier = max(0, min(len(SNOW_TIERS) - 1, tier))
+        self._apply_tier(self.max_tier)
+
+    def _apply_tier(self, tier):
+        self.tier = tier
+        if self.enabled:
+            self.count = SNOW_TIERS[tier]
+            self._sources = self._flake_images[:self.count]
+
+    def adapt(self, governor):
+        """
+        按帧预算调整档位：负载过高时立即降档，
+        连续 2 秒负载较低时升档（不超过 max_tier）
+        """
+        if not self.enabled:
+            return
+        load = governor.load
+        if load > 0.9 and self.tier > 1:
+            self._apply_tier(self.tier - 1)
+            self._calm_frames = 0
+        elif load < 0.5 and self.tier < self.max_tier:
+            self._calm_frames += 1
+            if self._calm_frames > governor.target_fps * 2:
+                self._apply_tier(self.tier + 1)
+                self._calm_frames = 0
+        else:
+            self._calm_frames = 0
+
+    def update(self):
+        """向量化更新所有雪花（每帧调用一次）"""
+        n = self.count
+        if n == 0:
+            return
+        x, y, phase = self.x[:n], self.y[:n], self.phase[:n]
+        phase += self.wobble_speed[:n]
+        x += self.vx[:n] + np.sin(phase) * self.wobble_amp[:n]
+        y += self.vy[:n]
+
+        # 落出屏幕底部的雪花回到顶部，随机水平位置
+        fallen = y > self.height
+        if fallen.any():
+            y[fallen] -= self.height + 10
+            x[fallen] = self.rng.uniform(0, self.width, int(fallen.sum()))
+        # 水平方向循环
+        np.mod(x, self.width, out=x)
+
+    def draw(self, screen):
+        """
+        一次 blits 提交所有雪花
+        screen 为 display.Canvas 时直接绘制到内部分辨率表面，坐标在数组上统一换算
+        """
+        n = self.count
+        if n == 0:
+            return
+        scale = getattr(screen, "scale", 1.0)
+        sources = self._sources
+        if scale != 1.0:
+            # 缩放后的雪花图片序列按档位缓存，只在档位变化时重建
+            if self._scaled_count != n:
+                scaled = {id(image): screen.scaled(image) for image in self.images}
+                self._scaled_sources = [scaled[id(image)] for image in sources]
+                self._scaled_count = n
+            sources = self._scaled_sources
+            screen = screen.surface
+        positions = self._positions[:n]
+        positions[:, 0] = self.x[:n] * scale
+        positions[:, 1] = self.y[:n] * scale
+        blit_sequence = zip(sources, positions.tolist())
+        fblits = getattr(screen, "fblits", None)
+        if fblits:
+            # pygame-ce 提供更快的 fblits
+            fblits(blit_sequence)
+        else:
+            screen.blits(blit_sequence, doreturn=False)
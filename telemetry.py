@@ -0,0 +1,196 @@
+"""
+游戏数据记录模块：游戏循环把事件写入预先分配的环形缓冲区（不为每个事件创建对象），
+后台线程定期批量取出并写入按大小轮换的 JSONL 文件，写文件不会阻塞游戏循环
+记录的事件：关卡开始、死亡（原因和位置）、收集礼物、大门打开、通关、位置采样
+"""
+import os
+import threading
+import time
+import uuid
+from array import array
+from constants import *
+
+# 事件类型
+EVENT_LEVEL_START = 1
+EVENT_DEATH = 2
+EVENT_GEM = 3
+EVENT_DOOR_OPEN = 4
+EVENT_WIN = 5
+EVENT_POSITION = 6
+
+EVENT_NAMES = {
+    EVENT_LEVEL_START: "level_start",
+    EVENT_DEATH: "death",
+    EVENT_GEM: "gem",
+    EVENT_DOOR_OPEN: "door_open",
+    EVENT_WIN: "win",
+    EVENT_POSITION: "position",
+}
+
+# 死亡原因（与 Player.update 的返回值对应）
+DEATH_CAUSES = {"fallen": 1, "spike_hit": 2}
+DEATH_CAUSE_NAMES = {code: name for name, code in DEATH_CAUSES.items()}
+
+
+class EventRing:
+    """
+    单生产者/单消费者环形缓冲区，各字段保存在预先分配的定长数组中
+    写满时丢弃新事件并计数，生产者永远不会等待
+    """
+    def __init__(self, capacity=TELEMETRY_BUFFER_SIZE):
+        self.capacity = capacity
+        self.kind = array("B", bytes(capacity))
+        self.level = array("H", [0]) * capacity
+        self.frame = array("I", [0]) * capacity
+        self.x = array("i", [0]) * capacity
+        self.y = array("i", [0]) * capacity
+        self.value = array("i", [0]) * capacity
+        self.head = 0       # 已写入的事件总数（只由生产者修改）
+        self.tail = 0       # 已取出的事件总数（只由消费者修改）
+        self.dropped = 0
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, kind, level, frame, x, y, value):
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return False
+        i = head % self.capacity
+        self.kind[i] = kind
+        self.level[i] = level
+        self.frame[i] = frame
+        self.x[i] = x
+        self.y[i] = y
+        self.value[i] = value
+        # 字段写完后再移动 head，消费者只会读到完整的事件
+        self.head = head + 1
+        return True
+
+
+class TelemetryWriter(threading.Thread):
+    """后台写入线程：定期取出缓冲区中的事件，转换为 JSONL 写入文件，文件超过大小上限时轮换"""
+    def __init__(self, ring, directory, session, flush_interval=0.5, max_bytes=1 << 20):
+        super().__init__(name="telemetry-writer", daemon=True)
+        self.ring = ring
+        self.directory = directory
+        self.session = session
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.wake = threading.Event()
+        self.stopping = False
+        self.part = 0
+        self.file = None
+        self.written = 0
+
+    def _open(self):
+        path = os.path.join(self.directory, f"session-{self.session}-{self.part:03d}.jsonl")
+        self.part += 1
+        self.file = open(path, "w", encoding="utf-8")
+        self.written = 0
+
+    def drain(self):
+        """取出所有已写入的事件并写入文件"""
+        ring = self.ring
+        head = ring.head
+        if head == ring.tail:
+            return
+        lines = []
+        for n in range(ring.tail, head):
+            i = n % ring.capacity
+            kind = ring.kind[i]
+            frame = ring.frame[i]
+            line = (f'{{"t":{frame / FPS:.3f},"event":"{EVENT_NAMES[kind]}","level":{ring.level[i]},'
+                    f'"frame":{frame},"x":{ring.x[i]},"y":{ring.y[i]}')
+            if kind == EVENT_DEATH:
+                line += f',"cause":"{DEATH_CAUSE_NAMES.get(ring.value[i], "unknown")}"'
+            elif kind == EVENT_WIN:
+                line += f',"frames":{ring.value[i]}'
+            lines.append(line + "}\n")
+        ring.tail = head
+
+        data = "".join(lines)
+        if self.file is None or self.written >= self.max_bytes:
+            if self.file:
+                self.file.close()
+            self._open()
+        self.file.write(data)
+        self.file.flush()
+        self.written += len(data)
+
+    def run(self):
+        while not self.stopping:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.drain()
+            except OSError as e:
+                print(f"写入游戏数据失败: {e}")
+                self.stopping = True
+        self.drain()
+        if self.file:
+            self.file.close()
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+
+
+class Telemetry:
+    """
+    游戏数据记录入口
+    - emit 只向环形缓冲区写入几个整数，可以在每帧调用
+    - tick 每帧调用一次，按 sample_interval 帧记录玩家位置（1 表示每帧都记录）
+    """
+    def __init__(self, directory=TELEMETRY_DIR, sample_interval=FPS, enabled=TELEMETRY_ENABLED):
+        self.enabled = enabled
+        self.ring = EventRing()
+        self.sample_interval = sample_interval
+        self.level = 0
+        self.frame = 0
+        self.level_start_frame = 0
+        self.session = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        if not enabled:
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"无法创建游戏数据目录 ({e})，不记录游戏数据")
+            self.enabled = False
+            return
+        self.writer = TelemetryWriter(self.ring, directory, self.session)
+        self.writer.start()
+
+    def emit(self, kind, x=0, y=0, value=0):
+        if self.enabled:
+            self.ring.push(kind, self.level, self.frame, x, y, value)
+            if len(self.ring) > self.ring.capacity // 2:
+                # 缓冲区过半时提前唤醒写入线程
+                self.writer.wake.set()
+
+    def begin_level(self, level_num, x, y):
+        self.level = level_num
+        self.level_start_frame = self.frame
+        self.emit(EVENT_LEVEL_START, x, y)
+
+    def death(self, cause, x, y):
+        self.emit(EVENT_DEATH, x, y, DEATH_CAUSES.get(cause, 0))
+
+    def win(self, x, y):
+        # 通关用时（帧数）
+        self.emit(EVENT_WIN, x, y, self.frame - self.level_start_frame)
+
+    def tick(self, player):
+        """每帧调用：推进帧计数并按间隔采样玩家位置"""
+        self.frame += 1
+        if self.frame % self.sample_interval == 0:
+            self.emit(EVENT_POSITION, player.rect.centerx, player.rect.centery)
+
+    def close(self):
+        """退出时调用：写完缓冲区中剩余的事件"""
+        if self.enabled:
+            self.writer.stop()
+            self.writer.join(timeout=2)
+            if self.ring.dropped:
+                print(f"游戏数据缓冲区已满，丢弃了 {self.ring.dropped} 个事件")
@@ -0,0 +1,34 @@
+"""
+测试环境：无窗口、无声音（SDL dummy 驱动），以仓库根目录为工作目录（图片等资源按相对路径加载）
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pytest
+
+
+@pytest.fixture
+def display():
+    """只构建关卡、不需要完整 Game 的测试：初始化 pygame 并创建一个很小的窗口（图片 convert 需要）"""
+    import pygame
+
+    pygame.init()
+    yield pygame.display.set_mode((1, 1))
+    pygame.quit()
+
+
+@pytest.fixture
+def game(tmp_path):
+    """完整的 Game（成绩、游戏数据和缩略图写入临时目录），测试结束后关闭"""
+    from game import Game
+
+    game = Game(records_db=str(tmp_path / "records.db"), telemetry_dir=str(tmp_path / "telemetry"),
+                thumbnails_dir=str(tmp_path / "thumbnails"))
+    yield game
+    game.close()
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from bench import (BENCH_VERSION, MIN_DELTA_BYTES, MIN_DELTA_MS, ScenarioError, compare, run_once)
+from constants import *
+
+
+def make_result(total_ms=1000.0, p99=10.0, peak_bytes=1 << 20, signature=None):
+    return {
+        "version": BENCH_VERSION,
+        "signature": signature or {"frames": 100, "states": [0, 1, 2]},
+        "total_ms": total_ms,
+        "startup_ms": 200.0,
+        "frame_ms": {"p50": 5.0, "p90": 8.0, "p99": p99, "max": 30.0},
+        "peak_bytes": peak_bytes,
+        "phases": {"level1": {"total_ms": 500.0, "peak_bytes": peak_bytes}},
+    }
+
+
+def marks(rows):
+    return {name: mark for name, _, _, _, mark, _ in rows}
+
+
+def test_changes_within_tolerance_are_not_flagged():
+    rows = compare(make_result(total_ms=1100.0), make_result(), tolerance=0.15)
+    assert marks(rows)["总耗时"] == ""
+    assert all(mark == "" for mark in marks(rows).values())
+
+
+def test_regressions_and_improvements():
+    rows = marks(compare(make_result(total_ms=1200.0, p99=5.0), make_result(), tolerance=0.15))
+    assert rows["总耗时"] == "回归"
+    assert rows["帧时间 p99"] == "改进"
+
+
+def test_small_absolute_changes_are_ignored():
+    # 相对变化超过容差，但绝对变化小于 MIN_DELTA_MS / MIN_DELTA_BYTES（计时和分配噪声）
+    baseline = make_result(p99=MIN_DELTA_MS * 2, peak_bytes=MIN_DELTA_BYTES * 2)
+    result = make_result(p99=MIN_DELTA_MS * 2.5, peak_bytes=MIN_DELTA_BYTES * 2.5)
+    rows = marks(compare(result, baseline, tolerance=0.15))
+    assert rows["帧时间 p99"] == ""
+    assert rows["Python 内存峰值"] == ""
+
+
+def test_different_scenario_is_refused():
+    baseline = make_result(signature={"frames": 99, "states": [0, 1, 2]})
+    with pytest.raises(ScenarioError):
+        compare(make_result(), baseline)
+    baseline = dict(make_result(), version=BENCH_VERSION + 1)
+    with pytest.raises(ScenarioError):
+        compare(make_result(), baseline)
+
+
+def test_run_once_keeps_generated_files_out_of_the_working_tree():
+    scenario = (("menu", (("click", "start"), ("expect", LEVEL_SELECT), ("frames", 20))),)
+    _, runner = run_once(scenario)
+    game = runner.game
+    assert runner.signature()["frames"] == 21
+    for path in (game.thumbnails.directory, game.records.path):
+        assert not os.path.abspath(path).startswith(os.getcwd() + os.sep)
+        # 临时目录在运行结束后删除
+        assert not os.path.exists(path)
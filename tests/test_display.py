@@ -0,0 +1,43 @@
+import pygame
+import pytest
+
+from constants import *
+from display import create_display, from_logical, render_size, to_logical
+
+
+@pytest.fixture(params=[1.0, 2 / 3, 0.5])
+def scaled(request, display):
+    """(内部分辨率比例, 绘制目标)；测试结束后恢复比例 1"""
+    yield request.param, create_display(request.param)
+    create_display(1.0)
+
+
+def test_physical_to_logical_round_trip(scaled):
+    width, height = render_size(scaled[0])
+    for x in range(0, width, 7):
+        for y in range(0, height, 53):
+            assert from_logical(to_logical((x, y))) == (x, y)
+
+
+def test_logical_to_physical_stays_within_a_pixel(scaled):
+    for x in range(0, SCREEN_WIDTH, 7):
+        for y in range(0, SCREEN_HEIGHT, 53):
+            lx, ly = to_logical(from_logical((x, y)))
+            assert abs(lx - x) <= 1 and abs(ly - y) <= 1
+
+
+def test_click_at_button_centre_hits_button(scaled):
+    # 模拟点击（bench.py 的做法）：逻辑坐标 -> 内部分辨率 -> 事件处理时换算回逻辑坐标
+    rect = pygame.Rect(500, 250, 200, 60)
+    assert rect.collidepoint(to_logical(from_logical(rect.center)))
+
+
+def test_canvas_draws_in_logical_coordinates(scaled):
+    scale, target = scaled
+    assert target.get_size() == (SCREEN_WIDTH, SCREEN_HEIGHT)
+    if scale == 1.0:
+        assert isinstance(target, pygame.Surface)
+        return
+    drawn = target.blit(pygame.Surface((100, 40)), (300, 150))
+    assert drawn.topleft == from_logical((300, 150))
+    assert drawn.size == from_logical((100, 40))
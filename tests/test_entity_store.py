@@ -0,0 +1,61 @@
+import random
+
+import pygame
+
+from constants import *
+from entity_store import EntityStore, FLAG_COLLECTED, PLATFORM_CELL
+
+
+def make_store():
+    store = EntityStore()
+    store.add_platform(0, 600, 300, 20)                              # 0：跨 3 列
+    store.add_platform(400, 500, 100, 20)                            # 1
+    store.add_platform(700, 400, 80, 20, ORANGE, movable=True)       # 2：移动平台
+    store.add_platform(PLATFORM_CELL * 8, 300, 50, 20)               # 3
+    store.add_spike(420, 465)                                        # 4
+    store.add_gem(200, 550)                                          # 5
+    store.add_gem(450, 450)                                          # 6
+    return store
+
+
+def test_first_collision_follows_id_order(display):
+    store = make_store()
+    rect = pygame.Rect(250, 590, 200, 20)
+    assert store.first_collision(store.platform_ids, rect) == 0
+    assert store.first_collision([1, 0], pygame.Rect(0, 0, 10, 10)) == -1
+    # 只是相邻（右边界 == 平台左边界）不算相交
+    assert store.first_collision(store.platform_ids, pygame.Rect(380, 500, 20, 20)) == -1
+    assert store.hit_spike(pygame.Rect(410, 470, 20, 20))
+
+
+def test_platforms_near_only_returns_covered_columns(display):
+    store = make_store()
+    assert store.platforms_near(0, 10) == [0, 2]
+    assert store.platforms_near(290, 410) == [0, 1, 2]
+    # 移动平台位置会变，总是包含在内
+    assert store.platforms_near(PLATFORM_CELL * 8, PLATFORM_CELL * 8 + 10) == [2, 3]
+    store.remove(1)
+    assert store.platforms_near(400, 500) == [2]
+
+
+def test_platforms_near_covers_every_overlapping_platform(display):
+    store = make_store()
+    rng = random.Random(1)
+    for _ in range(500):
+        left = rng.randrange(-50, SCREEN_WIDTH + 50)
+        right = left + rng.randrange(1, 200)
+        near = store.platforms_near(left, right)
+        assert near == sorted(near)
+        for i in store.platform_ids:
+            if store.x[i] < right and left < store.x[i] + store.w[i]:
+                assert i in near
+
+
+def test_collect_gems_marks_each_gem_once(display):
+    store = make_store()
+    rect = pygame.Rect(180, 530, 40, 40)
+    assert store.collect_gems(rect) == [5]
+    assert store.flags[5] & FLAG_COLLECTED
+    assert list(store.gem_ids) == [6]
+    assert store.collect_gems(rect) == []
+    assert not store.flags[6] & FLAG_COLLECTED
@@ -0,0 +1,42 @@
+from constants import *
+from frame_pacing import FrameGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.rates = []
+
+    def tick(self, fps):
+        self.rates.append(fps)
+
+
+def test_state_sets_target_rate():
+    clock = FakeClock()
+    governor = FrameGovernor(clock, rates={PAUSED: 10})
+    governor.set_state(MENU)
+    assert governor.target_fps == MENU_FPS
+    assert governor.budget_ms == 1000.0 / MENU_FPS
+    governor.set_state(PAUSED)
+    governor.tick()
+    assert clock.rates == [10]
+
+
+def test_overrun_skips_at_most_max_skip_frames():
+    governor = FrameGovernor(FakeClock(), max_skip=2)
+    governor.set_state(PLAYING)
+    assert governor.should_render()
+    governor.work_ms = governor.budget_ms * 2
+    assert [governor.should_render() for _ in range(4)] == [False, False, True, False]
+    assert governor.skipped_total == 3
+    # 工作时间回到预算以内后每帧都绘制
+    governor.work_ms = governor.budget_ms / 2
+    assert all(governor.should_render() for _ in range(3))
+
+
+def test_state_change_always_renders_first_frame():
+    governor = FrameGovernor(FakeClock())
+    governor.set_state(PLAYING)
+    governor.work_ms = governor.budget_ms * 2
+    assert not governor.should_render()
+    governor.set_state(PAUSED)
+    assert governor.should_render()
@@ -0,0 +1,39 @@
+from constants import *
+from records import REPLAY_KEYS, INPUT_RIGHT
+
+
+def play(game, frames):
+    for _ in range(frames):
+        game.step(REPLAY_KEYS[INPUT_RIGHT], paced=False)
+
+
+def test_first_frame_of_a_new_level_is_prepared_for_that_level(game):
+    game.restart_level(1)
+    game.state = PLAYING
+    play(game, 5)
+    assert game.frame_prep.layers.ready
+    game.state = MENU
+    play(game, 2)
+
+    game.restart_level(2)
+    assert not game.frame_prep.layers.ready
+    game.state = PLAYING
+    game.draw_playing()
+    # 第一帧绘制前同步准备：HUD 已是第 2 关的数值
+    assert game.frame_prep.layers.ready
+    assert game.frame_prep._hud_key == game.frame_prep.hud_key()
+    assert game.frame_prep._hud_key[3] == 2
+
+
+def test_restart_from_snapshot_discards_old_hud(game):
+    game.restart_level(1)
+    game.state = PLAYING
+    play(game, 5)
+    game.lives = 1
+    play(game, 1)
+    assert game.frame_prep._hud_key[0] == 1
+
+    game.restart_level(1)
+    assert game.frame_prep._hud_key is None
+    game.draw_playing()
+    assert game.frame_prep._hud_key[0] == 3
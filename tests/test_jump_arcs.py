@@ -0,0 +1,57 @@
+from constants import *
+from jump_arcs import JumpArcs, LANDED, FALLEN
+from level_loader import build_level
+from records import REPLAY_KEYS, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+
+def test_apex_grows_with_hold():
+    arcs = JumpArcs()
+    heights = [arcs.height(hold) for hold in range(arcs.max_hold + 1)]
+    assert heights == sorted(heights)
+    assert heights[0] < heights[-1]
+    for hold in range(arcs.max_hold + 1):
+        assert arcs.min_hold_for(heights[hold]) <= hold
+    assert arcs.min_hold_for(heights[-1] + 1) is None
+
+
+def test_predict_matches_player_update(display):
+    """从静止平台上起跳：预测的落点（帧数和坐标）与逐帧运行 Player.update 的结果一致"""
+    arcs = JumpArcs()
+    built = build_level(1)
+    store, player = built.entities, built.player
+    checked = 0
+    for i in store.platform_ids:
+        if store.is_movable(i):
+            continue
+        for hold in (0, 6, 20):
+            for direction, bits in ((-1, INPUT_LEFT), (0, 0), (1, INPUT_RIGHT)):
+                player.set_position(store.x[i] + store.w[i] // 2, store.y[i] - player.rect.height)
+                player.vel_y = 0
+                player.is_jumping = False
+                player.update(store, SCREEN_WIDTH, SCREEN_HEIGHT, REPLAY_KEYS[0])
+                if not player.on_ground:
+                    continue
+                prediction = arcs.predict(store, player.fx, player.fy, player.rect.width,
+                                          player.rect.height, hold, direction)
+                if prediction.outcome not in (LANDED, FALLEN):
+                    continue
+                result = None
+                for t in range(1, 400):
+                    keys = REPLAY_KEYS[bits | (INPUT_JUMP if t <= hold + 1 else 0)]
+                    outcome = player.update(store, SCREEN_WIDTH, SCREEN_HEIGHT, keys)
+                    if outcome == "spike_hit":
+                        break
+                    if outcome == "fallen":
+                        result = (FALLEN, t)
+                        break
+                    if player.on_ground:
+                        result = (LANDED, t, player.rect.x, player.rect.y)
+                        break
+                if result is None:
+                    continue
+                if prediction.outcome == LANDED:
+                    assert result == (LANDED, prediction.frames, prediction.x, prediction.y)
+                else:
+                    assert result == (FALLEN, prediction.frames)
+                checked += 1
+    assert checked > 20
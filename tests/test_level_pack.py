@@ -0,0 +1,28 @@
+import pytest
+
+import levels
+from level_pack import LevelPack, write_pack
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "levels.pack")
+    write_pack(path, levels.LEVELS, 1234.5)
+    pack = LevelPack(path)
+    try:
+        assert len(pack) == len(levels.LEVELS)
+        assert pack.source_mtime == 1234.5
+        for level_num, level in levels.LEVELS.items():
+            assert level_num in pack
+            packed = pack.level(level_num)
+            assert packed.to_dict() == level
+            assert packed.movers() == sum(1 for platform in level["platforms"] if platform[5])
+        assert pack.level(max(levels.LEVELS) + 1) is None
+    finally:
+        pack.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "levels.pack"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        LevelPack(str(path))
@@ -0,0 +1,47 @@
+import copy
+
+import pygame
+
+from constants import *
+from entity_store import KIND_GEM
+from level_watcher import apply_level_diff
+
+
+def live_gems(store):
+    """关卡中的礼物（按关卡定义中的坐标）"""
+    return [store.definition_key(i)[1:] for i in range(len(store))
+            if store.kind[i] == KIND_GEM and not store.is_removed(i)]
+
+
+def test_unchanged_level_is_a_no_op(game):
+    import levels
+
+    game.restart_level(1)
+    count = len(game.entities)
+    assert apply_level_diff(game, levels.get_level(1)) == (0, 0)
+    assert len(game.entities) == count
+
+
+def test_diff_keeps_player_and_collected_gems(game):
+    import levels
+
+    game.restart_level(1)
+    store = game.entities
+    first_gem = store.gem_ids[0]
+    store.collect_gems(pygame.Rect(store.x[first_gem], store.y[first_gem], store.w[first_gem], store.h[first_gem]))
+    game.gems_collected = 1
+    position = (game.player.fx, game.player.fy)
+
+    level = copy.deepcopy(levels.get_level(1))
+    removed_gem = level["gems"].pop()
+    level["gems"].append((300, 300))
+    level["platforms"].append((900, 100, 80, 20, ICE_BLUE, False, False))
+    added, removed = apply_level_diff(game, level)
+
+    assert (added, removed) == (2, 1)
+    assert (game.player.fx, game.player.fy) == position
+    assert game.gems_collected == 1
+    assert game.total_gems == len(level["gems"])
+    assert removed_gem not in live_gems(store)
+    assert (300, 300) in live_gems(store)
+    assert 900 in [store.x[i] for i in store.platforms_near(900, 980)]
@@ -0,0 +1,33 @@
+from constants import *
+from memprof import MemoryProfiler, check_level_reload, profile_states
+
+
+def test_frames_are_attributed_to_their_state():
+    profiler = MemoryProfiler()
+    try:
+        kept = []
+        for state in (MENU, MENU, PLAYING):
+            profiler.frame(state)
+            kept.append([bytearray(1024) for _ in range(16)])
+        profiler.frame(None)
+        report = profiler.report()
+    finally:
+        profiler.stop()
+    assert report.states["MENU"].frames == 2
+    assert report.states["PLAYING"].frames == 1
+    # 每帧保留了 16 KiB，净增长和峰值都应计入
+    assert report.states["MENU"].net_total >= 2 * 16 * 1024
+    assert report.states["PLAYING"].peak_max >= 16 * 1024
+
+
+def test_profile_states_runs_each_state(game):
+    report = profile_states(game, frames=3, states=(MENU, PLAYING))
+    assert report.states["MENU"].frames == 3
+    assert report.states["PLAYING"].frames == 3
+    assert report.peak > 0
+
+
+def test_level_reload_does_not_keep_growing(game):
+    report = check_level_reload(game, repeats=8)
+    assert len(report.loads) == 8
+    assert report.growth_per_load < 16 * 1024
@@ -0,0 +1,89 @@
+import os
+import wave
+
+import pygame
+import pytest
+
+from constants import *
+import music as music_module
+from music import Music
+
+# 测试曲目用 WAV 生成（mixer 按扩展名识别格式，无法生成 OGG）
+MENU_TRACK = "menu.wav"
+LEVEL_TRACKS = ("level1.wav", "level1_b.wav")
+
+
+def write_track(path, seconds=2):
+    with wave.open(path, "wb") as track:
+        track.setnchannels(1)
+        track.setsampwidth(2)
+        track.setframerate(22050)
+        track.writeframes(bytes(2 * 22050 * seconds))     # 静音
+
+
+@pytest.fixture
+def music(tmp_path, monkeypatch):
+    """音乐目录中只有菜单曲目和第 1 关的第一首（第二首缺失）"""
+    monkeypatch.setattr(music_module, "level_music", lambda level: LEVEL_TRACKS)
+    monkeypatch.setattr(music_module, "MUSIC_PLAYLISTS",
+                        {MENU: (MENU_TRACK,), LEVEL_SELECT: (MENU_TRACK,), WIN_SCREEN: ("win.wav",)})
+    pygame.mixer.init()
+    for name in (MENU_TRACK, LEVEL_TRACKS[0]):
+        write_track(str(tmp_path / name))
+    music = Music(directory=str(tmp_path), fade_ms=200)
+    yield music
+    music.stop()
+    pygame.mixer.quit()
+
+
+def names(playlist):
+    return [os.path.basename(path) for path in playlist]
+
+
+def test_missing_tracks_are_skipped(music):
+    assert names(music.playlist_for(PLAYING, 1)) == [LEVEL_TRACKS[0]]
+    assert music.playlist_for(WIN_SCREEN, 1) == ()
+
+
+def test_same_playlist_keeps_playing(music):
+    music.set_state(MENU, 1)
+    assert names(music.playlist) == [MENU_TRACK]
+    assert pygame.mixer.music.get_busy()
+    music.set_state(LEVEL_SELECT, 1)
+    assert music.pending is None
+    assert names(music.playlist) == [MENU_TRACK]
+
+
+def test_switch_fades_out_before_starting_new_playlist(music):
+    music.set_state(MENU, 1)
+    music.set_state(PLAYING, 1)
+    # 先淡出（fade_ms 的一半），期间仍是旧列表
+    assert names(music.pending) == [LEVEL_TRACKS[0]]
+    assert music.fade_left == 100
+    music.update(60)
+    assert names(music.playlist) == [MENU_TRACK]
+    assert pygame.mixer.music.get_volume() < music.volume
+    music.update(60)
+    assert music.pending is None
+    assert names(music.playlist) == [LEVEL_TRACKS[0]]
+    assert pygame.mixer.music.get_busy()
+
+
+def test_switch_during_fade_replaces_pending_playlist(music):
+    music.set_state(MENU, 1)
+    music.set_state(PLAYING, 1)
+    music.set_state(WIN_SCREEN, 1)
+    # 淡出中再次切换只替换待播放的列表，不重新开始淡出
+    assert music.pending == ()
+    assert music.fade_left == 100
+    music.update(200)
+    assert music.playlist == ()
+
+
+def test_pause_and_resume(music):
+    music.set_state(PLAYING, 1)
+    music.set_state(PAUSED, 1)
+    assert music.paused
+    music.set_state(PLAYING, 1)
+    assert not music.paused
+    assert names(music.playlist) == [LEVEL_TRACKS[0]]
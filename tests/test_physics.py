@@ -0,0 +1,51 @@
+from constants import *
+from level_loader import build_level
+from physics import FP_ONE, fp_to_px, px_to_fp, state_digest, to_fp
+from records import REPLAY_KEYS, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+
+def scripted_keys(frame):
+    """右走 60 帧、左走 40 帧，每 30 帧按住跳跃 10 帧"""
+    bits = INPUT_RIGHT if frame % 100 < 60 else INPUT_LEFT
+    if frame % 30 < 10:
+        bits |= INPUT_JUMP
+    return REPLAY_KEYS[bits]
+
+
+def simulate(level_num, frames):
+    built = build_level(level_num)
+    player, entities = built.player, built.entities
+    digests = []
+    for frame in range(frames):
+        entities.update_movers()
+        if player.update(entities, SCREEN_WIDTH, SCREEN_HEIGHT, scripted_keys(frame)):
+            player.set_position(*built.birth_point)
+            player.vel_y = 0
+        entities.collect_gems(player.rect)
+        digests.append(state_digest(player, entities))
+    return digests
+
+
+def test_fixed_point_conversions():
+    assert to_fp(1) == FP_ONE
+    assert to_fp(0.8) == 205
+    assert fp_to_px(px_to_fp(-37)) == -37
+    # 向下取整（负数也一样）
+    assert fp_to_px(-1) == -1
+    assert fp_to_px(FP_ONE - 1) == 0
+
+
+def test_simulation_is_deterministic(display):
+    for level_num in (1, 2):
+        assert simulate(level_num, 2000) == simulate(level_num, 2000)
+
+
+def test_digest_covers_player_and_entities(display):
+    built = build_level(1)
+    player, entities = built.player, built.entities
+    digest = state_digest(player, entities)
+    player.fx += 1
+    assert state_digest(player, entities) != digest
+    player.fx -= 1
+    entities.fy[entities.mover_ids[0]] += 1
+    assert state_digest(player, entities) != digest
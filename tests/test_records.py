@@ -0,0 +1,91 @@
+import pygame
+
+from constants import *
+from level_loader import build_level
+from physics import state_digest
+from records import (InputRecorder, RecordStore, RunRecord, REPLAY_KEYS, INPUT_LEFT, INPUT_RIGHT,
+                     INPUT_JUMP, replay_keys)
+
+
+class Keys:
+    """模拟 pygame.key.get_pressed() 的结果"""
+    def __init__(self, *pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def scripted_keys(frame):
+    pressed = [pygame.K_RIGHT if frame % 90 < 50 else pygame.K_LEFT]
+    if frame % 40 < 12:
+        pressed.append(pygame.K_SPACE)
+    return Keys(*pressed)
+
+
+def run_level(keys_for_frame, frames):
+    built = build_level(1)
+    player, entities = built.player, built.entities
+    for frame in range(frames):
+        keys = keys_for_frame(frame)
+        entities.update_movers()
+        if player.update(entities, SCREEN_WIDTH, SCREEN_HEIGHT, keys):
+            player.set_position(*built.birth_point)
+            player.vel_y = 0
+        entities.collect_gems(player.rect)
+    return state_digest(player, entities)
+
+
+def test_recorder_stores_one_byte_per_frame():
+    recorder = InputRecorder()
+    recorder.record(Keys(pygame.K_LEFT))
+    recorder.record(Keys(pygame.K_RIGHT, pygame.K_SPACE))
+    recorder.record(Keys())
+    assert bytes(recorder.inputs) == bytes([INPUT_LEFT, INPUT_RIGHT | INPUT_JUMP, 0])
+    assert replay_keys(recorder.inputs) == [REPLAY_KEYS[1], REPLAY_KEYS[6], REPLAY_KEYS[0]]
+    recorder.begin()
+    assert len(recorder) == 0
+
+
+def test_replay_reproduces_the_run(display):
+    recorder = InputRecorder()
+
+    def record(frame):
+        keys = scripted_keys(frame)
+        recorder.record(keys)
+        return keys
+    digest = run_level(record, 600)
+    replay = replay_keys(bytes(recorder.inputs))
+    assert run_level(replay.__getitem__, 600) == digest
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "records.db")
+    store = RecordStore(path)
+    replay = bytes([INPUT_RIGHT] * 200 + [INPUT_RIGHT | INPUT_JUMP] * 10)
+    store.add(RunRecord(1, False, 300, 3, 2, 5))
+    previous = store.add(RunRecord(1, True, 900, 1, 5, 5, replay))
+    assert previous.attempts == 1 and previous.best_frames is None
+    store.add(RunRecord(1, True, 700, 2, 5, 5))
+    store.add(RunRecord(2, True, 1200, 0, 6, 6))
+    assert store.stats(1).best_frames == 700
+    store.close()
+
+    reader = RecordStore(path, read_only=True)
+    try:
+        stats = reader.stats(1)
+        assert (stats.attempts, stats.completions, stats.best_frames, stats.fewest_deaths) == (3, 2, 700, 1)
+        assert reader.levels() == [1, 2]
+        assert [row[2] for row in reader.top_runs(1)] == [700, 900]
+        assert [row[3] for row in reader.top_runs(1, by="deaths")] == [1, 2]
+        assert len(reader.history(1)) == 3
+        run_id = reader.top_runs(1)[1][0]
+        assert reader.load_replay(run_id) == replay
+        assert reader.load_replay(reader.top_runs(1)[0][0]) is None
+        # 只读：add 只更新内存中的汇总
+        reader.add(RunRecord(1, True, 100, 0, 5, 5))
+    finally:
+        reader.close()
+    reader = RecordStore(path, read_only=True)
+    assert reader.stats(1).best_frames == 700
+    reader.close()
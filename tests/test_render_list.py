@@ -0,0 +1,74 @@
+import pygame
+
+from render_list import RenderList, LAYER_PLATFORM, LAYER_GEM, LAYER_PLAYER
+
+
+def surface():
+    return pygame.Surface((10, 10))
+
+
+def make_list():
+    render_list = RenderList(pygame.Rect(0, 0, 100, 100))
+    render_list.add("player", LAYER_PLAYER, surface(), pygame.Rect(10, 10, 10, 10), dynamic=True)
+    render_list.add("gem", LAYER_GEM, surface(), pygame.Rect(20, 20, 10, 10))
+    render_list.add("platform", LAYER_PLATFORM, surface(), pygame.Rect(0, 90, 50, 10))
+    render_list.add("far", LAYER_PLATFORM, surface(), pygame.Rect(500, 90, 50, 10))
+    return render_list
+
+
+def keys(render_list):
+    return [next(key for key in ("player", "gem", "platform", "far", "mover")
+                 if key in render_list and render_list.entry(key) is entry)
+            for entry in render_list.sequence()]
+
+
+def test_sequence_is_in_layer_order_and_culled():
+    render_list = make_list()
+    assert len(render_list) == 4
+    # 视口外的静态条目不提交
+    assert keys(render_list) == ["platform", "gem", "player"]
+    render_list.add("mover", LAYER_PLATFORM, surface(), pygame.Rect(500, 50, 10, 10), dynamic=True)
+    assert keys(render_list) == ["platform", "mover", "gem", "player"]
+
+
+def test_move_and_set_surface_do_not_rebuild():
+    render_list = make_list()
+    sequence = render_list.sequence()
+    image = surface()
+    render_list.move("player", 40, 50)
+    render_list.set_surface("player", image)
+    assert render_list.sequence() is sequence
+    assert sequence[-1][0] is image
+    assert sequence[-1][1].topleft == (40, 50)
+
+
+def test_hide_and_show_reuse_the_entry():
+    render_list = make_list()
+    entry = render_list.entry("gem")
+    render_list.hide("gem")
+    assert render_list.is_hidden("gem")
+    assert "gem" in render_list
+    assert keys(render_list) == ["platform", "player"]
+    # 隐藏的条目仍可移动，显示时使用新位置
+    render_list.move("gem", 30, 30)
+    render_list.show("gem")
+    assert not render_list.is_hidden("gem")
+    assert render_list.entry("gem") is entry
+    assert entry[1].topleft == (30, 30)
+    assert keys(render_list) == ["platform", "gem", "player"]
+
+
+def test_remove_and_replace():
+    render_list = make_list()
+    render_list.hide("gem")
+    render_list.remove("gem")
+    assert "gem" not in render_list
+    render_list.show("gem")
+    assert keys(render_list) == ["platform", "player"]
+    # 同一个键再次 add 时替换原条目（图层也可以改变）
+    render_list.add("platform", LAYER_GEM, surface(), pygame.Rect(0, 0, 10, 10))
+    assert len(render_list) == 3
+    assert keys(render_list) == ["platform", "player"]
+    render_list.clear()
+    assert len(render_list) == 0
+    assert render_list.sequence() == []
@@ -0,0 +1,41 @@
+from constants import *
+from records import REPLAY_KEYS, INPUT_RIGHT, INPUT_JUMP
+from snapshot import LevelSnapshot
+
+
+def level_state(game):
+    store, player = game.entities, game.player
+    return (list(store.x), list(store.y), list(store.fx), list(store.fy), list(store.flags),
+            list(store.direction), list(store.gem_ids), player.fx, player.fy, player.vel_y,
+            player.jump_held_time, player.is_jumping, player.on_ground, player.on_moving_platform,
+            game.lives, game.gems_collected, game.door.is_open)
+
+
+def play(game, frames, bits=INPUT_RIGHT | INPUT_JUMP):
+    game.state = PLAYING
+    for _ in range(frames):
+        game.update_playing(REPLAY_KEYS[bits])
+
+
+def test_restart_restores_level_start(game):
+    for level_num in (1, 2):
+        game.restart_level(level_num)
+        start = level_state(game)
+        play(game, 200)
+        game.gems_collected = 5
+        game.door.open()
+        assert level_state(game) != start
+        game.restart_level(level_num)
+        assert level_state(game) == start
+
+
+def test_restore_returns_to_captured_frame(game):
+    game.restart_level(1)
+    play(game, 50)
+    snapshot = LevelSnapshot()
+    snapshot.capture(game)
+    captured = level_state(game)
+    play(game, 120)
+    assert level_state(game) != captured
+    snapshot.restore(game)
+    assert level_state(game) == captured
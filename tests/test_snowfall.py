@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from snowfall import Snowfall, SNOW_TIERS
+
+
+class FakeGovernor:
+    def __init__(self, load, target_fps=60):
+        self.load = load
+        self.target_fps = target_fps
+
+
+def test_high_load_steps_down_but_keeps_some_snow():
+    snow = Snowfall(tier=3, seed=1)
+    busy = FakeGovernor(1.5)
+    snow.adapt(busy)
+    assert snow.tier == 2
+    assert snow.count == SNOW_TIERS[2]
+    for _ in range(5):
+        snow.adapt(busy)
+    assert snow.tier == 1
+
+
+def test_low_load_steps_up_after_two_seconds_up_to_max_tier():
+    snow = Snowfall(tier=2, seed=1)
+    snow.adapt(FakeGovernor(1.5))
+    assert snow.tier == 1
+    calm = FakeGovernor(0.2, target_fps=30)
+    for _ in range(60):
+        snow.adapt(calm)
+    assert snow.tier == 1
+    snow.adapt(calm)
+    assert snow.tier == 2
+    # 不超过 set_tier 设置的档位
+    for _ in range(200):
+        snow.adapt(calm)
+    assert snow.tier == 2
+
+
+def test_medium_load_resets_the_calm_counter():
+    snow = Snowfall(tier=2, seed=1)
+    snow.adapt(FakeGovernor(1.5))
+    calm, medium = FakeGovernor(0.2, target_fps=30), FakeGovernor(0.7, target_fps=30)
+    for _ in range(50):
+        snow.adapt(calm)
+    snow.adapt(medium)
+    for _ in range(50):
+        snow.adapt(calm)
+    assert snow.tier == 1
@@ -0,0 +1,45 @@
+import json
+
+from constants import *
+from telemetry import EventRing, TelemetryWriter, EVENT_DEATH, EVENT_GEM, DEATH_CAUSES
+
+
+def test_full_ring_drops_new_events():
+    ring = EventRing(4)
+    assert all(ring.push(EVENT_GEM, 1, frame, frame, 0, 0) for frame in range(4))
+    assert not ring.push(EVENT_GEM, 1, 4, 4, 0, 0)
+    assert len(ring) == 4
+    assert ring.dropped == 1
+
+
+def test_writer_drains_in_order_across_wraparound(tmp_path):
+    ring = EventRing(4)
+    writer = TelemetryWriter(ring, str(tmp_path), "test")
+    try:
+        for frame in range(3):
+            ring.push(EVENT_GEM, 1, frame, frame, 0, 0)
+        writer.drain()
+        assert len(ring) == 0
+        # 取出后腾出的位置可以再次写入（下标回绕）
+        for frame in range(3, 7):
+            assert ring.push(EVENT_GEM, 1, frame, frame, 0, 0)
+        assert not ring.push(EVENT_DEATH, 1, 7, 7, 0, DEATH_CAUSES["fallen"])
+        writer.drain()
+    finally:
+        writer.file.close()
+    events = [json.loads(line) for line in (tmp_path / "session-test-000.jsonl").read_text().splitlines()]
+    assert [event["frame"] for event in events] == list(range(7))
+    assert ring.dropped == 1
+
+
+def test_time_is_derived_from_the_frame_number(tmp_path):
+    ring = EventRing(4)
+    writer = TelemetryWriter(ring, str(tmp_path), "test")
+    try:
+        ring.push(EVENT_DEATH, 2, FPS * 3 + FPS // 2, 10, 20, DEATH_CAUSES["spike_hit"])
+        writer.drain()
+    finally:
+        writer.file.close()
+    event = json.loads((tmp_path / "session-test-000.jsonl").read_text())
+    assert event == {"t": 3.5, "event": "death", "level": 2, "frame": FPS * 3 + FPS // 2,
+                     "x": 10, "y": 20, "cause": "spike_hit"}
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+import thumbnails
+from level_pack import level_definition
+from thumbnails import ThumbnailCache, THUMBNAIL_SIZE, level_hash
+
+
+@pytest.fixture
+def cache(tmp_path, display):
+    cache = ThumbnailCache(str(tmp_path))
+    yield cache
+    cache.close()
+
+
+def settle(cache):
+    """等待后台线程完成已提交的任务（单个工作线程，按提交顺序执行）"""
+    cache.pool.submit(lambda: None).result()
+
+
+def fetch(cache, level_num):
+    assert cache.get(level_num) is None
+    settle(cache)
+    return cache.get(level_num)
+
+
+def test_generates_once_then_reads_from_disk(cache, tmp_path, monkeypatch):
+    image = fetch(cache, 1)
+    assert image.get_size() == THUMBNAIL_SIZE
+    key = level_hash(level_definition(1))
+    assert os.listdir(tmp_path) == [key + ".png"]
+    assert cache.get(1) is image
+
+    # 新的缓存（重新启动游戏）直接读取磁盘上的文件，不再构建关卡
+    def fail(level_num, size=THUMBNAIL_SIZE):
+        raise AssertionError("不应重新生成")
+    monkeypatch.setattr(thumbnails, "render_thumbnail", fail)
+    other = ThumbnailCache(str(tmp_path))
+    try:
+        assert fetch(other, 1).get_size() == THUMBNAIL_SIZE
+    finally:
+        other.close()
+
+
+def test_changed_level_gets_a_new_thumbnail(cache, tmp_path, monkeypatch):
+    fetch(cache, 1)
+    level = dict(level_definition(1), gems=[(300, 300)])
+    # 热重载后关卡数据版本变化，哈希重新计算
+    monkeypatch.setattr(thumbnails, "level_definition", lambda level_num: level)
+    monkeypatch.setattr(thumbnails, "generation", lambda: -1)
+    assert fetch(cache, 1) is not None
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [level_hash(level_definition(1)) + ".png", level_hash(level) + ".png"])
+
+
+def test_failed_job_is_not_resubmitted(cache, monkeypatch, capsys):
+    calls = []
+
+    def broken(level_num, size=THUMBNAIL_SIZE):
+        calls.append(level_num)
+        raise KeyError(level_num)
+    monkeypatch.setattr(thumbnails, "render_thumbnail", broken)
+    assert fetch(cache, 2) is None
+    for _ in range(5):
+        assert cache.get(2) is None
+    settle(cache)
+    assert calls == [2]
+    assert "缩略图失败" in capsys.readouterr().out
@@ -0,0 +1,112 @@
+"""
+关卡缩略图模块：用正常的关卡构建流程（level_loader.build_level）在离屏表面上绘制关卡，
+缩小后保存到磁盘，文件名为关卡定义的哈希值，关卡修改后才重新生成
+关卡选择界面按需请求可见关卡的缩略图，读取和生成都在后台线程中进行，
+菜单启动时不做任何工作，关卡再多也只处理屏幕上出现的那几个
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from constants import *
+from level_pack import level_definition, generation
+
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_SIZE = (120, 70)
+THUMBNAIL_VERSION = 1       # 绘制方式改变时加一，使旧缩略图失效
+
+
+def level_hash(level):
+    """关卡定义的哈希值（与缩略图尺寸和版本一起计算）"""
+    data = repr((THUMBNAIL_VERSION, THUMBNAIL_SIZE, sorted(level.items())))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def render_thumbnail(level_num, size=THUMBNAIL_SIZE):
+    """构建关卡并绘制到离屏表面，返回缩小后的图片（不需要窗口，可在后台线程调用）"""
+    from level_loader import build_level
+
+    built = build_level(level_num)
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface.fill((100, 150, 200))
+    built.render_list.draw(surface)
+    return pygame.transform.smoothscale(surface, size)
+
+
+class ThumbnailCache:
+    """
+    缩略图缓存：内存（最近使用的 max_loaded 张）→ 磁盘（THUMBNAIL_DIR/<哈希>.png）→ 后台生成
+    get(n) 立即返回已准备好的图片，没有时提交后台任务并返回 None（界面显示占位框）
+    生成失败的关卡记录下来不再重试，直到关卡修改（哈希变化）
+    """
+    def __init__(self, directory=THUMBNAIL_DIR, max_loaded=64):
+        self.directory = directory
+        self.max_loaded = max_loaded
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+        self._loaded = OrderedDict()    # 哈希 -> 图片
+        self._pending = {}              # 哈希 -> Future
+        self._failed = set()            # 生成失败的哈希（关卡修改后哈希变化才会重试）
+        self._hashes = {}               # 关卡号 -> (关卡数据版本, 哈希)
+
+    def _hash(self, level_num):
+        cached = self._hashes.get(level_num)
+        # 热重载后关卡数据版本变化，重新计算哈希
+        if cached is None or cached[0] != generation():
+            level = level_definition(level_num)
+            if level is None:
+                return None
+            cached = (generation(), level_hash(level))
+            self._hashes[level_num] = cached
+        return cached[1]
+
+    def get(self, level_num):
+        key = self._hash(level_num)
+        if key is None:
+            return None
+        image = self._loaded.get(key)
+        if image is not None:
+            self._loaded.move_to_end(key)
+            return image
+        if key in self._failed:
+            return None
+
+        future = self._pending.get(key)
+        if future is None:
+            self._pending[key] = self.pool.submit(self._load, level_num, key)
+            return None
+        if not future.done():
+            return None
+        del self._pending[key]
+        try:
+            image = future.result()
+        except Exception as e:
+            # 不再重复提交同一个失败的任务（界面一直显示占位框）
+            print(f"生成关卡 {level_num} 缩略图失败: {e}")
+            self._failed.add(key)
+            return None
+        image = image.convert()
+        self._loaded[key] = image
+        if len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+        return image
+
+    def _load(self, level_num, key):
+        """后台线程：读取磁盘缓存，没有时生成并保存"""
+        path = os.path.join(self.directory, key + ".png")
+        if os.path.exists(path):
+            try:
+                return pygame.image.load(path)
+            except pygame.error:
+                pass    # 文件损坏时重新生成
+        image = render_thumbnail(level_num)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            pygame.image.save(image, path)
+        except (OSError, pygame.error) as e:
+            print(f"无法保存关卡缩略图 ({e})")
+        return image
+
+    def close(self):
+        # 等待正在生成的缩略图完成：之后 pygame.quit 会释放它使用的字体和表面
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -1,67 +1,184 @@
+"""
+UI 模块：字体注册表和保留模式的界面控件
+- get_font(size)：字体文件只查找一次，同一字号的字体只创建一次，所有界面共享
+- Label / Button：创建时渲染好图片（按钮的普通、悬停、按下三种状态），之后只是切换图片
+- Screen：一个界面的所有控件，布局在创建时确定，绘制时一次 blits
+"""
 import os
 from constants import *
+from display import get_mouse_pos, to_logical
 
-# 加载字体函数
+# 按顺序查找的字体文件（都不存在时使用默认字体）
+FONT_PATHS = [
+    "C:/Windows/Fonts/simhei.ttf",
+    "C:/Windows/Fonts/simsun.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "simhei.ttf",
+]
+
+_font_path = None       # 找到的字体文件（"" 表示使用默认字体）
+_fonts = {}             # 字号 -> 字体
+
+# 按钮状态
+BUTTON_NORMAL = 0
+BUTTON_HOVER = 1
+BUTTON_PRESSED = 2
+
+
+def find_font_path():
+    """查找可用的中文字体文件（只在第一次调用时检查文件）"""
+    global _font_path
+    if _font_path is None:
+        _font_path = ""
+        for font_path in FONT_PATHS:
+            if os.path.exists(font_path):
+                _font_path = font_path
+                break
+    return _font_path
+
+
+def get_font(font_size):
+    """共享的字体（按字号缓存）"""
+    font = _fonts.get(font_size)
+    if font is None:
+        font_path = find_font_path()
+        font = None
+        if font_path:
+            try:
+                font = pygame.font.Font(font_path, font_size)
+            except (OSError, pygame.error):
+                font = None
+        if font is None:
+            # 如果都没找到，直接使用默认字体
+            font = pygame.font.SysFont(None, font_size)
+        _fonts[font_size] = font
+    return font
+
+
+def reset_fonts():
+    """清空字体注册表：pygame.quit 之后旧的字体不能再使用（同一进程中再次创建 Game 时）"""
+    _fonts.clear()
+
+
+# 加载字体函数（保留原来的名称，字体来自注册表）
 def load_font(font_size):
-    # 尝试使用系统字体
-    font_paths = [
-        "C:/Windows/Fonts/simhei.ttf",
-        "C:/Windows/Fonts/simsun.ttc",
-        "/System/Library/Fonts/PingFang.ttc",
-        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
-        "simhei.ttf",
-    ]
-    
-    for font_path in font_paths:
-        try:
-            if font_path and os.path.exists(font_path):
-                return pygame.font.Font(font_path, font_size)
-        except:
-            continue
-    
-    # 如果都没找到，直接使用默认字体
-    return pygame.font.SysFont(None, font_size)
+    return get_font(font_size)
+
+
+class Label:
+    """
+    文字标签：以 center 为中心，文字不变时不重新渲染
+    set_text 每帧调用也只在内容变化时渲染一次
+    """
+    def __init__(self, text, font, color, center):
+        self.font = font
+        self.color = color
+        self.center = center
+        self.text = None
+        self.visible = True
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        self.surface = self.font.render(text, True, self.color)
+        self.rect = self.surface.get_rect(center=self.center)
+
 
 class Button:
-    def __init__(self, x, y, width, height, text, color, hover_color, font=None):
+    def __init__(self, x, y, width, height, text, color, hover_color, font=None, action=None):
         #x : 按钮左上角的 x 坐标；y : 按钮左上角的 y 坐标
         #color : 按钮的默认颜色；hover_color 鼠标悬停时按钮的颜色
-        #font : 按钮文本的字体
+        #font : 按钮文本的字体；action : 在 Screen.clicked 中返回的名称
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
         self.hover_color = hover_color
-        self.current_color = color
-        if font:
-            self.font = font
-        else:
-            self.font = load_font(36)
+        self.action = action
+        self.visible = True
+        self.font = font or get_font(36)
+        # 三种状态的按钮图片在创建时绘制好，之后只切换图片
+        pressed_color = tuple(clamp_color(c - 40) for c in hover_color)
+        self.states = (self.render(color), self.render(hover_color), self.render(pressed_color, 2))
+        self.state = BUTTON_NORMAL
 
-    #绘制按钮到屏幕上    
-    def draw(self, screen):
+    #生成某种颜色下的按钮图片（按下时文字向下偏移）
+    def render(self, color, offset=0):
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        local_rect = surface.get_rect()
         # 绘制按钮的矩形区域
-        pygame.draw.rect(screen, self.current_color, self.rect, border_radius=10)
+        pygame.draw.rect(surface, color, local_rect, border_radius=10)
         # 绘制按钮的边框
-        pygame.draw.rect(screen, WHITE, self.rect, 3, border_radius=10)
+        pygame.draw.rect(surface, WHITE, local_rect, 3, border_radius=10)
         # 绘制按钮上的文本
         text_surf = self.font.render(self.text, True, WHITE)    # 渲染文本
-        text_rect = text_surf.get_rect(center=self.rect.center) # 文本居中对齐
-        screen.blit(text_surf, text_rect)   # 将文本绘制到屏幕上
+        text_rect = text_surf.get_rect(center=(local_rect.centerx, local_rect.centery + offset)) # 文本居中对齐
+        surface.blit(text_surf, text_rect)
+        return surface.convert_alpha()
+
+    @property
+    def surface(self):
+        return self.states[self.state]
+
+    #绘制按钮到屏幕上（screen 可以是显示表面，也可以是 display.Canvas）
+    def draw(self, screen):
+        screen.blit(self.surface, self.rect)
 
-    #检查鼠标是否悬停在按钮上    
+    #检查鼠标是否悬停在按钮上（鼠标坐标换算为逻辑坐标）
     def is_hovered(self):
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = get_mouse_pos()
         return self.rect.collidepoint(mouse_pos)
 
-    #更新按钮的状态（颜色变化）    
+    #更新按钮的状态（普通 / 悬停 / 按下）
     def update(self):
-        if self.is_hovered():
-            self.current_color = self.hover_color
+        if not self.is_hovered():
+            self.state = BUTTON_NORMAL
+        elif pygame.mouse.get_pressed()[0]:
+            self.state = BUTTON_PRESSED
         else:
-            self.current_color = self.color
+            self.state = BUTTON_HOVER
 
-    #检查按钮是否被点击        
+    #检查按钮是否被点击
     def is_clicked(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            return self.rect.collidepoint(event.pos)
-        return False
\ No newline at end of file
+            return self.rect.collidepoint(to_logical(event.pos))
+        return False
+
+
+class Screen:
+    """
+    一个界面：背景（图片或纯色）加上按添加顺序绘制的控件
+    控件位置在创建时确定；draw 只提交一次 blits，update / clicked 只检查其中的按钮
+    """
+    def __init__(self, background=None, fill=None):
+        self.background = background
+        self.fill = fill
+        self.widgets = []
+        self.buttons = []
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        if isinstance(widget, Button):
+            self.buttons.append(widget)
+        return widget
+
+    def update(self):
+        for button in self.buttons:
+            button.update()
+
+    def clicked(self, event):
+        """返回被点击按钮的 action，没有点击时返回 None"""
+        for button in self.buttons:
+            if button.visible and button.is_clicked(event):
+                return button.action
+        return None
+
+    def draw(self, target):
+        if self.background is not None:
+            target.blit(self.background, (0, 0))
+        elif self.fill is not None:
+            target.fill(self.fill)
+        target.blits([(widget.surface, widget.rect) for widget in self.widgets if widget.visible],
+                     doreturn=False)